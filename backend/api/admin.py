@@ -0,0 +1,63 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from backend.core.cache import caches
+from backend.core.config import settings
+from backend.core.memory import allocation_tracer, memory_registry, process_memory
+from backend.services.search import refresh_data_version
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], include_in_schema=False)
+
+
+def _require_bearer(authorization: Optional[str], tokens):
+    tokens = [token for token in tokens if token]
+    if not tokens:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, supplied = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not any(secrets.compare_digest(supplied.encode(), token.encode()) for token in tokens):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Accès réservé : `Authorization: Bearer <ADMIN_TOKEN>`. Sans jeton configuré, les routes d'administration n'existent pas."""
+    _require_bearer(authorization, [settings.ADMIN_TOKEN])
+
+
+def require_metrics_access(authorization: Optional[str] = Header(None)):
+    """`/metrics` : `Authorization: Bearer <METRICS_TOKEN>` (jeton du scraper) ou `<ADMIN_TOKEN>`. Sans jeton configuré, la route n'existe pas."""
+    _require_bearer(authorization, [settings.METRICS_TOKEN, settings.ADMIN_TOKEN])
+
+
+@router.get("/cache", dependencies=[Depends(require_admin)])
+def cache_stats():
+    return {"data_version": refresh_data_version(), "namespaces": caches.stats()}
+
+
+@router.post("/cache/invalidate", dependencies=[Depends(require_admin)])
+def invalidate_cache(namespace: Optional[str] = Query(None)):
+    if namespace and caches.get(namespace) is None:
+        raise HTTPException(status_code=404, detail=f"Cache inconnu : {namespace}")
+    return {"data_version": refresh_data_version(), "invalidated": caches.invalidate(namespace)}
+
+
+@router.get("/memory", dependencies=[Depends(require_admin)])
+def memory_report():
+    """Taille profonde approximative de chaque structure enregistrée du worker qui répond."""
+    return {"process": process_memory(), "structures": memory_registry.report(), "tracemalloc": allocation_tracer.active}
+
+
+@router.post("/memory/tracemalloc", dependencies=[Depends(require_admin)])
+def tracemalloc_diff(top: int = Query(20, ge=1, le=200)):
+    """Premier appel : démarre tracemalloc. Appels suivants : variations depuis l'appel précédent."""
+    if not allocation_tracer.active:
+        allocation_tracer.start()
+        return {"tracing": True, "diff": []}
+    return {"tracing": True, "diff": allocation_tracer.diff(top)}
+
+
+@router.delete("/memory/tracemalloc", dependencies=[Depends(require_admin)])
+def tracemalloc_stop():
+    allocation_tracer.stop()
+    return {"tracing": False}
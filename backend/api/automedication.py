@@ -1,13 +1,19 @@
 from fastapi import APIRouter, Request
 from pydantic import BaseModel, Field, field_validator
-from typing import Dict, Optional, Literal
-from backend.core.schemas import EvaluationResponse
+from typing import Dict, List, Optional, Literal
+from backend.core.schemas import BasketResponse, EvaluationResponse
+from backend.core.config import settings
 from backend.core.limiter import limiter
+from backend.core.memory import memory_registry
+from backend.core.resilience import deadline_scope
+from backend.services.automedication.basket import BasketChecker, MAX_BASKET_SIZE
 from backend.services.automedication.orchestrator import AutomedicationOrchestrator
 
 router = APIRouter(prefix="/api/automedication", tags=["automedication"])
 
 _orchestrator = AutomedicationOrchestrator()
+basket_checker = BasketChecker()
+memory_registry.register("basket.interaction_matrix", lambda: basket_checker.current_matrix)
 
 
 class AnswersRequest(BaseModel):
@@ -25,15 +31,36 @@ class AnswersRequest(BaseModel):
         return v
 
 
+class BasketRequest(BaseModel):
+    cis_list: List[str] = Field(..., min_length=2)
+
+    @field_validator('cis_list')
+    @classmethod
+    def limit_basket_size(cls, v):
+        if len(v) > MAX_BASKET_SIZE:
+            raise ValueError(f"Trop de médicaments dans le panier (max {MAX_BASKET_SIZE})")
+        if any(len(cis) > 50 for cis in v):
+            raise ValueError("Code CIS invalide")
+        return v
+
+
 @router.post("/evaluate", response_model=EvaluationResponse)
 @limiter.limit("10/minute")
 async def evaluate(request: Request, body: AnswersRequest, lang: str = "fr"):
     """Évalue le risque d'automédication pour un médicament donné."""
-    return await _orchestrator.evaluate(
-        cis=body.cis,
-        answers=body.answers,
-        has_other_meds=body.has_other_meds or False,
-        gender=body.gender,
-        age=body.age,
-        lang=lang
-    )
+    with deadline_scope(settings.REQUEST_BUDGET_SECONDS):
+        return await _orchestrator.evaluate(
+            cis=body.cis,
+            answers=body.answers,
+            has_other_meds=body.has_other_meds or False,
+            gender=body.gender,
+            age=body.age,
+            lang=lang
+        )
+
+
+@router.post("/basket", response_model=BasketResponse)
+@limiter.limit("30/minute")
+def check_basket(request: Request, body: BasketRequest, lang: str = "fr"):
+    """Vérifie les associations d'un panier de médicaments (doublons de substance, familles incompatibles)."""
+    return basket_checker.check(body.cis_list, lang)
@@ -1,24 +1,86 @@
-from fastapi import APIRouter, HTTPException, Query, Request
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
+from backend.core.config import settings
+from backend.core.http_cache import cache_headers, data_etag, etag_matches
 from backend.core.limiter import limiter
+from backend.core.metrics import not_modified
+from backend.core.timing import phase
 
-from backend.core.schemas import SearchResult
+from backend.core.schemas import SearchResult, SearchPage, BrandPage
 from backend.core.models import Brand
-from backend.services.search import search_medication, get_drug_details
+from backend.services.search import search_medication, search_page, get_drug_details, get_data_version, list_substance_brands, drug_exists
 
 router = APIRouter(prefix="/api", tags=["drugs"])
 
+# Handlers synchrones : FastAPI les exécute dans son pool de threads, les lectures SQLite
+# ne bloquent pas la boucle d'événements
+
 @router.get("/search", response_model=List[SearchResult])
 @limiter.limit("30/minute")
 
-async def search(request: Request, q: str = Query(..., min_length=2), lang: str = Query("fr")):
-    return search_medication(q, lang)
+def search(
+    request: Request,
+    q: str = Query(..., min_length=2),
+    lang: str = Query("fr"),
+    limit: int = Query(20, ge=1, le=50)
+):
+    with phase("search"):
+        return search_medication(q, lang, limit)
+
+@router.get("/search/version")
+@limiter.limit("30/minute")
+
+def search_data_version(request: Request):
+    """Version des données servie : le navigateur écarte son index local s'il en diffère."""
+    return {"data_version": get_data_version()}
+
+@router.get("/search/page", response_model=SearchPage)
+@limiter.limit("30/minute")
+
+def search_paginated(
+    request: Request,
+    q: str = Query(..., min_length=2),
+    lang: str = Query("fr"),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, max_length=500)
+):
+    try:
+        return search_page(q, lang, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
 
 @router.get("/drugs/{cis}", response_model=Brand)
 @limiter.limit("30/minute")
 
-async def get_details(request: Request, cis: str):
-    drug = get_drug_details(cis)
+def get_details(request: Request, response: Response, cis: str):
+    # Les détails ne changent qu'avec un nouveau build : l'ETag porte la version des données
+    etag = data_etag(get_data_version(), cis)
+    # `*` ou un ETag forgé correspondent aussi à un CIS inconnu : 304 seulement s'il existe
+    if etag and etag_matches(request.headers.get("if-none-match"), etag) and drug_exists(cis):
+        not_modified.inc(route="/api/drugs/{cis}")
+        return Response(status_code=304, headers=cache_headers(etag, settings.DRUG_DETAILS_MAX_AGE))
+
+    with phase("db"):
+        drug = get_drug_details(cis)
     if not drug:
         raise HTTPException(status_code=404, detail="Médicament non trouvé")
+    if etag:
+        response.headers.update(cache_headers(etag, settings.DRUG_DETAILS_MAX_AGE))
     return drug
+
+@router.get("/substances/{substance_id}/brands", response_model=BrandPage)
+@limiter.limit("30/minute")
+
+def get_substance_brands(
+    request: Request,
+    substance_id: int,
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100)
+):
+    try:
+        page = list_substance_brands(substance_id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if page is None:
+        raise HTTPException(status_code=404, detail="Substance non trouvée")
+    return page
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Request, Query
 from typing import List, Optional, Dict, Any
 from backend.core.limiter import limiter
+from backend.core.cache import cached
 
 from backend.core.schemas import FlowQuestion, FlowOption
 from ..services.automedication.db_repository import AutomedicationRepository
 from backend.core.i18n import i18n
 from backend.core.models import Rule
+from backend.core.timing import phase
 
 router = APIRouter(prefix="/api/automedication", tags=["automedication-flow"])
 
-_repository = AutomedicationRepository()
+flow_repository = AutomedicationRepository()
 
 
 def _build_profile_questions(has_gender_questions: bool, has_age_questions: bool, lang: str = "fr") -> List[FlowQuestion]:
@@ -83,10 +85,11 @@ def _convert_rules_to_questions(rules: List[Rule], route: str = None, lang: str
     return list(flow_questions_dict.values())
 
 
-@router.get("/flow/{identifier}", response_model=List[FlowQuestion])
-@limiter.limit("30/minute")
-async def get_flow(request: Request, identifier: str, lang: str = Query("fr")):
-    rules = _repository.get_rules_for_brand(identifier)
+@cached("flow")
+def build_flow(repository: AutomedicationRepository, identifier: str, lang: str = "fr") -> List[FlowQuestion]:
+    """Questionnaire d'un médicament ou d'une substance : fonction pure du catalogue et de la langue."""
+    with phase("rules"):
+        rules = repository.get_rules_for_brand(identifier)
     
     if not rules:
         return _build_profile_questions(False, False, lang)
@@ -95,9 +98,11 @@ async def get_flow(request: Request, identifier: str, lang: str = Query("fr")):
         if r.question_code == "GENERAL" and r.risk_level.value == 4:
             return []
     
-    route = _repository.get_drug_route(identifier) or "orale"
+    with phase("route"):
+        route = repository.get_drug_route(identifier) or "orale"
     
-    medical_flow = _convert_rules_to_questions(rules, route, lang)
+    with phase("flow"):
+        medical_flow = _convert_rules_to_questions(rules, route, lang)
     
     has_gender_questions = any(r.filter_gender is not None for r in rules)
     has_age_questions = any(r.age_min is not None for r in rules)
@@ -105,3 +110,9 @@ async def get_flow(request: Request, identifier: str, lang: str = Query("fr")):
     profile_flow = _build_profile_questions(has_gender_questions, has_age_questions, lang)
     
     return profile_flow + medical_flow
+
+
+@router.get("/flow/{identifier}", response_model=List[FlowQuestion])
+@limiter.limit("30/minute")
+def get_flow(request: Request, identifier: str, lang: str = Query("fr")):
+    return build_flow(flow_repository, identifier, lang)
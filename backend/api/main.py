@@ -1,19 +1,51 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+import asyncio
+import json
 import logging
+import time
 
+from backend.core.blocking import BlockingDetector
 from backend.core.config import settings
 from backend.core.limiter import limiter
+from backend.core.load_shedding import load_shedder
+from backend.core.metrics import registry, http_requests, http_request_seconds, rate_limit_rejections
+from backend.core.timing import start_timer, current_timer, stop_timer
 from backend.api.drugs import router as drugs_router
 from backend.api.automedication import router as automedication_router
 from backend.api.flow_endpoint import router as flow_router
+from backend.api.admin import router as admin_router, require_metrics_access
+from backend.api.warmup import warm_up, warmup_state
+from backend.services.search import get_data_version
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("safepills")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Préchauffage en arrière-plan : /healthz répond tout de suite, /readyz attend la fin
+    if settings.WARMUP_ENABLED:
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    else:
+        warmup_state.ready = warmup_state.finished = True
+    load_shedder.start()
+    # Mode debug : signale (avec la pile) tout code qui bloque la boucle au-delà du seuil
+    detector = BlockingDetector(settings.BLOCKING_THRESHOLD_MS / 1000) if settings.BLOCKING_DETECTOR else None
+    if detector:
+        detector.start()
+    yield
+    if detector:
+        detector.stop()
+    await load_shedder.stop()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     description="API pour l'automédication sécurisée",
     version=settings.VERSION,
@@ -23,7 +55,19 @@ app = FastAPI(
 )
 
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+def _route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    rate_limit_rejections.inc(route=_route_label(request))
+    return _rate_limit_exceeded_handler(request, exc)
+
+
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +78,18 @@ app.add_middleware(
     allow_headers=["Content-Type", "Accept", "Accept-Language"],
 )
 
+@app.middleware("http")
+async def shed_load(request: Request, call_next):
+    # Middleware le plus interne : les 503 de délestage passent par les métriques et les en-têtes
+    if load_shedder.should_reject(request.url.path):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service temporairement surchargé, veuillez réessayer."},
+            headers={"Retry-After": str(settings.SHED_RETRY_AFTER_SECONDS)}
+        )
+    with load_shedder.track():
+        return await call_next(request)
+
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
         
@@ -45,9 +101,59 @@ async def add_security_headers(request: Request, call_next):
     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
     return response
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    route = _route_label(request)
+    http_request_seconds.observe(elapsed, route=route, method=request.method)
+    http_requests.inc(route=route, method=request.method, status=response.status_code)
+    registry.maybe_flush()
+    return response
+
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next):
+    token = start_timer()
+    try:
+        response = await call_next(request)
+        timer = current_timer()
+    finally:
+        stop_timer(token)
+
+    response.headers["Server-Timing"] = timer.header_value()
+    response.headers["Timing-Allow-Origin"] = ", ".join(settings.allowed_origins_list)
+    if settings.TIMING_LOG:
+        logger.info(json.dumps({
+            "event": "request_timing",
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "phases_ms": timer.as_dict(),
+        }))
+    return response
+
 app.include_router(drugs_router)
 app.include_router(automedication_router)
 app.include_router(flow_router)
+app.include_router(admin_router)
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    if not warmup_state.ready:
+        # Préchauffage en cours, ou terminé sans base utilisable : pas de trafic pour ce worker
+        status = "failed" if warmup_state.finished else "warming_up"
+        return JSONResponse(status_code=503, content={"status": status, "warmup": warmup_state.as_dict()})
+    return {"status": "ready", "data_version": get_data_version(), "warmup": warmup_state.as_dict()}
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,145 @@
+"""
+Préchauffage d'un worker au démarrage (hook lifespan de `main.py`) et état de disponibilité
+exposé par `/readyz` : tant qu'il n'est pas terminé, le load balancer n'envoie pas de trafic.
+
+Étapes :
+    db_pages  lecture séquentielle de la base et de l'instantané (cache de pages de l'OS)
+    indexes   instantané projeté en mémoire, matrice d'interactions, version des données
+    flows     questionnaires et détails des médicaments les plus demandés, dans chaque langue
+              (remplit les caches `flow`, `rules`, `drug_details` et résout les traductions)
+
+Un échec de `db_pages` ou `indexes` (base absente ou illisible) laisse le worker non prêt ;
+un échec de `flows` ne coûte que des caches froids.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from backend.api.automedication import basket_checker
+from backend.api.flow_endpoint import build_flow, flow_repository
+from backend.core.config import settings
+from backend.core.db import connect
+from backend.core.i18n import i18n
+from backend.core.snapshot import default_snapshot_path, get_snapshot
+from backend.services.search import search_service
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 1 << 20
+CRITICAL_STEPS = ("db_pages", "indexes")
+
+
+class WarmupState:
+    def __init__(self):
+        self.ready = False
+        self.finished = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.primed = 0
+        self._lock = threading.Lock()
+
+    def as_dict(self) -> dict:
+        duration = self.finished_at - self.started_at if self.finished_at and self.started_at else None
+        return {
+            "ready": self.ready,
+            "finished": self.finished,
+            "duration_ms": round(duration * 1000, 1) if duration is not None else None,
+            "steps_ms": dict(self.steps),
+            "primed": self.primed,
+            "errors": dict(self.errors),
+        }
+
+
+warmup_state = WarmupState()
+
+
+def read_file_pages(path: str) -> int:
+    """Lit le fichier en entier pour le charger dans le cache de pages de l'OS. Retourne le nombre d'octets lus."""
+    if not path or not os.path.exists(path):
+        return 0
+    total = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_BYTES)
+            if not chunk:
+                return total
+            total += len(chunk)
+
+
+def warmup_cis(limit: int) -> List[str]:
+    """Médicaments à préchauffer : `WARMUP_CIS_PATH` (un CIS par ligne, ex. extrait des logs d'accès), sinon OTC d'abord."""
+    if settings.WARMUP_CIS_PATH and os.path.exists(settings.WARMUP_CIS_PATH):
+        with open(settings.WARMUP_CIS_PATH, "r", encoding="utf-8") as f:
+            codes = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        return list(dict.fromkeys(codes))[:limit]
+    return search_service.repository.get_warmup_cis(limit)
+
+
+def _require_database():
+    # Vérifié avant toute connexion, pour un message explicite dans `/readyz`
+    if not os.path.exists(settings.DB_PATH):
+        raise FileNotFoundError(f"Base de données introuvable : {settings.DB_PATH}")
+
+
+def _db_pages():
+    _require_database()
+    read_file_pages(settings.DB_PATH)
+    read_file_pages(default_snapshot_path())
+
+
+def _indexes():
+    _require_database()
+    with connect(settings.DB_PATH, read_only=True) as conn:
+        if conn.execute("SELECT 1 FROM brands LIMIT 1").fetchone() is None:
+            raise RuntimeError(f"Catalogue vide : {settings.DB_PATH}")
+    get_snapshot()
+    _ = basket_checker.matrix
+    search_service.refresh_data_version()
+
+
+def _flows(state: WarmupState, limit: int):
+    langs = i18n.languages() or ["fr"]
+    for cis in warmup_cis(limit):
+        search_service.get_details(cis)
+        for lang in langs:
+            build_flow(flow_repository, cis, lang)
+        state.primed += 1
+
+
+def warm_up(state: WarmupState = None, limit: int = None) -> WarmupState:
+    """Exécute les étapes de préchauffage puis marque le worker prêt si aucune étape critique n'a échoué.
+
+    Une étape en échec est journalisée sans bloquer les suivantes.
+    """
+    state = state or warmup_state
+    limit = settings.WARMUP_TOP_CIS if limit is None else limit
+    with state._lock:
+        if state.finished:
+            return state
+        state.started_at = time.perf_counter()
+        steps = (
+            ("db_pages", _db_pages),
+            ("indexes", _indexes),
+            ("flows", lambda: _flows(state, limit)),
+        )
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Erreur préchauffage ({name}): {e}", exc_info=True)
+                state.errors[name] = str(e)
+            state.steps[name] = round((time.perf_counter() - start) * 1000, 1)
+        state.finished_at = time.perf_counter()
+        state.ready = not any(name in state.errors for name in CRITICAL_STEPS)
+        state.finished = True
+
+    if not state.ready:
+        logger.error(f"Préchauffage en échec, worker non prêt : {state.errors}")
+        return state
+    logger.info(f"Préchauffage terminé en {(state.finished_at - state.started_at) * 1000:.0f} ms : {state.primed} médicaments, étapes {state.steps}")
+    return state
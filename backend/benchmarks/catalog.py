@@ -0,0 +1,67 @@
+"""
+Générateur de catalogues synthétiques pour les benchmarks.
+Multiplie `pharma_data.json` par un facteur d'échelle (1×, 10×, 100×...) en
+conservant la structure (familles, compositions, OTC), puis construit une base
+SQLite avec `build_db.build_database`.
+"""
+import os
+import json
+import contextlib
+import io
+
+from backend.scripts.build_db import build_database, PHARMA_DATA_PATH, MED_KNOWLEDGE_PATH
+
+SYNTHETIC_CIS_BASE = 90_000_000
+
+
+def scale_catalog(pharma_data: dict, scale: int) -> dict:
+    """Retourne un catalogue `scale` fois plus grand que `pharma_data`.
+
+    La copie 0 est le catalogue d'origine. Les copies suivantes suffixent les noms
+    (« DOLIPRANE 3 (Orale) », « PARACÉTAMOL 3 ») : les correspondances substance →
+    famille, qui reposent sur l'inclusion de sous-chaînes, restent donc valides.
+    """
+    if scale <= 1:
+        return pharma_data
+
+    substances = list(pharma_data.get("substances", []))
+    brands = list(pharma_data.get("brands", []))
+    next_cis = SYNTHETIC_CIS_BASE
+
+    for copy in range(1, scale):
+        renamed = {name: f"{name} {copy}" for name in pharma_data.get("substances", [])}
+        substances.extend(renamed.values())
+
+        for brand in pharma_data.get("brands", []):
+            base_name, _, route = brand["name"].partition(" (")
+            brands.append({
+                **brand,
+                "cis": str(next_cis),
+                "name": f"{base_name} {copy} ({route}" if route else f"{base_name} {copy}",
+                "composition": [
+                    {**compo, "substance": renamed.get(compo["substance"], compo["substance"])}
+                    for compo in brand.get("composition", [])
+                ],
+            })
+            next_cis += 1
+
+    return {**pharma_data, "substances": substances, "brands": brands}
+
+
+def build_catalog_db(scale: int, workdir: str, quiet: bool = True) -> str:
+    """Construit `workdir/catalog_x{scale}.db` et retourne son chemin."""
+    with open(PHARMA_DATA_PATH, "r", encoding="utf-8") as f:
+        pharma_data = json.load(f)
+
+    os.makedirs(workdir, exist_ok=True)
+    data_path = os.path.join(workdir, f"pharma_data_x{scale}.json")
+    db_path = os.path.join(workdir, f"catalog_x{scale}.db")
+
+    with open(data_path, "w", encoding="utf-8") as f:
+        json.dump(scale_catalog(pharma_data, scale), f, ensure_ascii=False)
+
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        build_database(db_path=db_path, pharma_data_path=data_path, med_knowledge_path=MED_KNOWLEDGE_PATH)
+
+    return db_path
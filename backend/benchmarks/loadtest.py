@@ -0,0 +1,302 @@
+"""
+Test de charge en processus de l'API SafePills.
+Pilote `backend.api.main:app` via un client HTTP asynchrone (transport ASGI, sans
+réseau) avec un mélange configurable de recherches, flows, fiches et évaluations.
+Le client Gemini est remplacé par un faux client à latence et taux d'erreur réglables.
+
+Usage :
+    python -m backend.benchmarks.loadtest --duration 30 --concurrency 32 \\
+        --mix search=5 flow=3 detail=2 evaluate=1 --ai-latency 0.8 --ai-error-rate 0.05
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import argparse
+import statistics
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.api.main import app
+from backend.core.limiter import limiter
+from backend.services import ai_service
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.search.repository import DrugRepository
+
+DEFAULT_MIX = {"search": 5, "flow": 3, "detail": 2, "evaluate": 1}
+SEARCH_QUERIES = ["dol", "doli", "para", "parac", "ibup", "ibupro", "aspi", "spasf", "smecta", "tramad"]
+
+
+class FakeGeminiError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"{code} UNAVAILABLE (faux client Gemini)")
+        self.code = code
+
+
+class FakeGeminiClient:
+    """Remplaçant de `genai.Client` : même forme (`client.aio.models.generate_content`)."""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, error_rate: float = 0.0, error_code: int = 503, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.calls = 0
+        self._random = random.Random(seed)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self.generate_content))
+
+    async def generate_content(self, model: str, contents: str, config=None):
+        self.calls += 1
+        delay = max(0.0, self._random.gauss(self.latency, self.latency * self.jitter))
+        await asyncio.sleep(delay)
+        if self._random.random() < self.error_rate:
+            raise FakeGeminiError(self.error_code)
+        return SimpleNamespace(text="Explication simulée pour le test de charge.")
+
+
+@contextmanager
+def fake_gemini(client: FakeGeminiClient):
+    """Installe le faux client dans `ai_service` et désactive le rate limiter."""
+    previous_client, previous_enabled = ai_service.client, limiter.enabled
+    ai_service.client = client
+    limiter.enabled = False
+    try:
+        yield client
+    finally:
+        ai_service.client = previous_client
+        limiter.enabled = previous_enabled
+
+
+def load_fixtures(db_path: Optional[str] = None, max_drugs: int = 200) -> dict:
+    """CIS et réponses « à risque » tirés de la base, pour des évaluations qui appellent l'IA."""
+    drug_repo = DrugRepository(db_path)
+    auto_repo = AutomedicationRepository(db_path)
+    with drug_repo._get_connection() as conn:
+        cis_list = [row[0] for row in conn.execute("SELECT cis FROM brands ORDER BY cis LIMIT ?", (max_drugs,))]
+
+    evaluations = []
+    for cis in cis_list:
+        codes = sorted({rule.question_code for rule in auto_repo.get_rules_for_brand(cis)})
+        if codes:
+            evaluations.append({"cis": cis, "answers": {code: True for code in codes[:3]}, "gender": "F", "age": 35})
+
+    return {"cis": cis_list, "evaluations": evaluations}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile par rang le plus proche (`q` entre 0 et 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+class LoopLagMonitor:
+    """Mesure le retard de la boucle d'événements : écart entre le réveil prévu et le réveil réel."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+def _build_request(kind: str, fixtures: dict, rng: random.Random) -> tuple:
+    lang = rng.choice(("fr", "es"))
+    if kind == "search":
+        return "GET", f"/api/search?q={rng.choice(SEARCH_QUERIES)}&lang={lang}", None
+    if kind == "flow":
+        return "GET", f"/api/automedication/flow/{rng.choice(fixtures['cis'])}?lang={lang}", None
+    if kind == "detail":
+        return "GET", f"/api/drugs/{rng.choice(fixtures['cis'])}", None
+    if kind == "evaluate":
+        return "POST", f"/api/automedication/evaluate?lang={lang}", rng.choice(fixtures["evaluations"])
+    raise ValueError(f"Type de requête inconnu : {kind}")
+
+
+async def run_load(
+    mix: Dict[str, int] = None,
+    duration: float = 10.0,
+    concurrency: int = 16,
+    max_requests: Optional[int] = None,
+    fixtures: Optional[dict] = None,
+    base_url: Optional[str] = None,
+    seed: int = 42,
+) -> dict:
+    """Lance `concurrency` clients pendant `duration` secondes (ou jusqu'à `max_requests`)."""
+    mix = mix or DEFAULT_MIX
+    fixtures = fixtures or load_fixtures()
+    if not fixtures["evaluations"]:
+        mix = {kind: weight for kind, weight in mix.items() if kind != "evaluate"}
+    kinds, weights = list(mix), list(mix.values())
+
+    latencies: Dict[str, List[float]] = {kind: [] for kind in kinds}
+    statuses: Dict[str, int] = {}
+    sent = 0
+
+    transport = httpx.ASGITransport(app=app) if base_url is None else None
+    monitor = LoopLagMonitor()
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url or "http://loadtest", timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(worker_id: int):
+            nonlocal sent
+            rng = random.Random(seed + worker_id)
+            while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+                sent += 1
+                kind = rng.choices(kinds, weights)[0]
+                method, url, payload = _build_request(kind, fixtures, rng)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, json=payload)
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies[kind].append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        monitor.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    total = len(all_latencies)
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3", "4")))
+    return {
+        "duration_s": round(elapsed, 3),
+        "concurrency": concurrency,
+        "requests": total,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "statuses": statuses,
+        "latency": summarize(all_latencies),
+        "by_kind": {kind: summarize(values) for kind, values in latencies.items()},
+        "loop_lag": {
+            "mean_ms": round(statistics.fmean(monitor.samples) * 1000, 2) if monitor.samples else 0.0,
+            **{key: value for key, value in summarize(monitor.samples).items() if key != "count"},
+        },
+    }
+
+
+def print_report(report: dict):
+    print(f"📈 {report['requests']} requêtes en {report['duration_s']} s — {report['rps']} req/s "
+          f"(concurrence {report['concurrency']}, erreurs {report['error_rate']:.2%})")
+    print(f"   {'type':<10} {'n':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    rows = list(report["by_kind"].items()) + [("total", report["latency"])]
+    for kind, stats in rows:
+        print(f"   {kind:<10} {stats['count']:>7} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+    lag = report["loop_lag"]
+    print(f"⏱️ Retard de boucle : moyen {lag['mean_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms")
+    print(f"   Statuts : {report['statuses']}")
+
+
+def _parse_mix(items: List[str]) -> Dict[str, int]:
+    mix = {}
+    for item in items:
+        kind, _, weight = item.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Type inconnu : {kind} (attendu : {', '.join(DEFAULT_MIX)})")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de l'API SafePills")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée en secondes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Nombre de clients simultanés")
+    parser.add_argument("--requests", type=int, help="Nombre maximal de requêtes")
+    parser.add_argument("--mix", nargs="+", default=[f"{k}={v}" for k, v in DEFAULT_MIX.items()], help="Pondérations type=poids")
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="Latence moyenne du faux Gemini (s)")
+    parser.add_argument("--ai-error-rate", type=float, default=0.0, help="Proportion d'erreurs du faux Gemini")
+    parser.add_argument("--base-url", help="Cibler un serveur déjà lancé au lieu de l'application en processus")
+    parser.add_argument("--allow-real-ai", action="store_true",
+                        help="Avec --base-url : accepter que les évaluations appellent le vrai Gemini du serveur ciblé")
+    parser.add_argument("--output", help="Écrire le rapport JSON dans ce fichier")
+    parser.add_argument("--max-p99-ms", type=float, help="Échec si le p99 global dépasse ce seuil")
+    parser.add_argument("--max-error-rate", type=float, help="Échec si le taux d'erreurs 5xx dépasse ce seuil")
+    args = parser.parse_args(argv)
+
+    mix = _parse_mix(args.mix)
+    if args.base_url and mix.get("evaluate"):
+        # Le faux Gemini n'est installé que dans ce processus : le serveur ciblé garde son vrai client
+        if not args.allow_real_ai:
+            print("❌ --base-url : le faux Gemini ne peut pas être installé dans le serveur ciblé, les évaluations "
+                  "appelleraient le vrai Gemini. Retirez evaluate du --mix ou passez --allow-real-ai.")
+            return 2
+        print("⚠️ --base-url : les évaluations appellent le vrai Gemini du serveur ciblé (quota et coûts réels).")
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    fake = FakeGeminiClient(latency=args.ai_latency, error_rate=args.ai_error_rate)
+    with fake_gemini(fake):
+        report = asyncio.run(run_load(
+            mix=mix,
+            duration=args.duration,
+            concurrency=args.concurrency,
+            max_requests=args.requests,
+            base_url=args.base_url,
+        ))
+    report["ai_calls"] = fake.calls
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Rapport écrit dans {args.output}")
+
+    failed = False
+    if args.max_p99_ms is not None and report["latency"]["p99_ms"] > args.max_p99_ms:
+        print(f"❌ p99 {report['latency']['p99_ms']} ms > {args.max_p99_ms} ms")
+        failed = True
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        print(f"❌ Taux d'erreurs {report['error_rate']:.2%} > {args.max_error_rate:.2%}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Micro-benchmarks des chemins chauds (scoring, flow, normalisation, repositories).
+Chaque cible est mesurée sur des catalogues synthétiques 1×, 10× et 100×.
+
+Usage :
+    python -m backend.benchmarks.run [--scales 1 10 100] [--repeat 5] [--compare results/bench-xxx.json]
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import tempfile
+import statistics
+from typing import Callable, Dict, List, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+RESULTS_DIR = os.path.join(BASE_DIR, 'results')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.benchmarks.catalog import build_catalog_db
+from backend.api.flow_endpoint import _convert_rules_to_questions
+from backend.core.cache import caching_disabled
+from backend.core.i18n import i18n
+from backend.core.snapshot import CatalogSnapshot, default_snapshot_path
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.automedication.risk_calculator import RiskCalculator
+from backend.services.automedication.rule_engine import default_rules_path, load_compiled_rules
+from backend.services.search.repository import DrugRepository
+from backend.services.search.utils import normalize_text
+
+DEFAULT_SCALES = (1, 10, 100)
+REGRESSION_THRESHOLD = 1.10
+
+
+def pick_fixtures(drug_repo: DrugRepository, auto_repo: AutomedicationRepository) -> dict:
+    """Choisit le médicament du catalogue d'origine qui porte le plus de règles."""
+    with drug_repo._get_connection() as conn:
+        rows = conn.execute("SELECT cis FROM brands ORDER BY cis LIMIT 200").fetchall()
+        substance_id = conn.execute("SELECT substance_id FROM substance_brands LIMIT 1").fetchone()[0]
+
+    cis, rules = max(((row[0], auto_repo.get_rules_for_brand(row[0])) for row in rows), key=lambda item: len(item[1]))
+    return {
+        "cis": cis,
+        "rules": rules,
+        "route": auto_repo.get_drug_route(cis),
+        "answers": {rule.question_code: True for rule in rules[::2]},
+        "codes": sorted({rule.question_code for rule in rules}),
+        "substance_id": substance_id,
+    }
+
+
+def build_targets(db_path: str) -> Dict[str, Callable[[], object]]:
+    drug_repo = DrugRepository(db_path)
+    auto_repo = AutomedicationRepository(db_path)
+    f = pick_fixtures(drug_repo, auto_repo)
+
+    snapshot_path = default_snapshot_path(db_path)
+    snapshot = CatalogSnapshot(snapshot_path)
+    snap_drug_repo = DrugRepository(db_path, snapshot=snapshot)
+    snap_auto_repo = AutomedicationRepository(db_path, snapshot=snapshot)
+    decide = load_compiled_rules(default_rules_path(db_path)).DECISIONS[f["cis"]]
+
+    return {
+        "risk.compute_score": lambda: RiskCalculator.compute_score(f["rules"], f["answers"], f["route"]),
+        "risk.evaluate_interpreted": lambda: RiskCalculator.compute_score(
+            auto_repo.get_rules_for_brand(f["cis"]), dict(f["answers"]), auto_repo.get_drug_route(f["cis"]) or "orale"
+        ),
+        "risk.evaluate_compiled": lambda: decide(f["answers"], False),
+        "flow.convert_rules_to_questions": lambda: _convert_rules_to_questions(f["rules"], f["route"], "es"),
+        "search.normalize_text": lambda: normalize_text("Chlorhydrate de PSEUDO-ÉPHÉDRINE"),
+        "i18n.translate_question": lambda: i18n.translate_question("Q_PREGNANCY_RED_F", "Texte par défaut", "es"),
+        "drugs.search_ranked": lambda: drug_repo.search_ranked("para", 20),
+        "drugs.search_phonetic": lambda: drug_repo.search_phonetic("parasetamol", 20),
+        "drugs.substance_exists": lambda: drug_repo.substance_exists(f["substance_id"]),
+        "drugs.get_brands_for_substance": lambda: drug_repo.get_brands_for_substance(f["substance_id"], 0, 20),
+        "drugs.get_drug_details": lambda: drug_repo.get_drug_details(f["cis"]),
+        "automedication.get_rules_by_codes": lambda: auto_repo.get_rules_by_codes(f["codes"]),
+        "automedication.get_rules_for_brand": lambda: auto_repo.get_rules_for_brand(f["cis"]),
+        "automedication.get_drug_route": lambda: auto_repo.get_drug_route(f["cis"]),
+        "snapshot.open": lambda: CatalogSnapshot(snapshot_path).close(),
+        "snapshot.get_drug_details": lambda: snap_drug_repo.get_drug_details(f["cis"]),
+        "snapshot.get_rules_for_brand": lambda: snap_auto_repo.get_rules_for_brand(f["cis"]),
+        "snapshot.get_drug_route": lambda: snap_auto_repo.get_drug_route(f["cis"]),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Durée par appel (µs) : `autorange` calibre le nombre d'appels, puis `repeat` mesures."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "stdev_us": round(statistics.stdev(per_call), 3) if len(per_call) > 1 else 0.0,
+        "loops": number,
+    }
+
+
+def run(scales=DEFAULT_SCALES, repeat: int = 5, only: str = None) -> dict:
+    results = {}
+    with caching_disabled(), tempfile.TemporaryDirectory(prefix="safepills-bench-") as workdir:
+        for scale in scales:
+            print(f"🏗️ Catalogue synthétique x{scale}...")
+            targets = build_targets(build_catalog_db(scale, workdir))
+            for name, func in targets.items():
+                if only and only not in name:
+                    continue
+                stats = measure(func, repeat)
+                results[f"{name}@x{scale}"] = stats
+                print(f"   {name:<40} {stats['median_us']:>12.2f} µs")
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> List[Tuple[str, float]]:
+    """Retourne les cibles dont la médiane dépasse `threshold` × la référence."""
+    regressions = []
+    for name, stats in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["median_us"]:
+            continue
+        ratio = stats["median_us"] / previous["median_us"]
+        marker = "⚠️" if ratio > threshold else "  "
+        print(f"{marker} {name:<48} {ratio:>6.2f}×")
+        if ratio > threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks SafePills")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Ne mesurer que les cibles contenant cette chaîne")
+    parser.add_argument("--compare", help="Fichier de résultats de référence")
+    args = parser.parse_args(argv)
+
+    report = run(args.scales, args.repeat, args.only)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Résultats écrits dans {output_path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print(f"❌ {len(regressions)} régression(s) au-delà de {REGRESSION_THRESHOLD:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Détecteur d'appels bloquants (mode debug) : une pulsation programmée sur la boucle d'événements
+est surveillée par un thread ; si elle prend plus de `threshold` secondes de retard, la pile du
+thread de la boucle est capturée (`sys._current_frames`) pour désigner le code bloquant.
+
+Activation dans l'API : `BLOCKING_DETECTOR=true` (seuil `BLOCKING_THRESHOLD_MS`).
+Dans les tests :
+    async with assert_no_blocking(0.1):
+        await client.get("/api/search?q=doli")
+"""
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from contextlib import asynccontextmanager
+from typing import List, NamedTuple, Optional
+
+from backend.core.metrics import registry
+
+logger = logging.getLogger("safepills.blocking")
+
+event_loop_blocks = registry.counter(
+    "safepills_event_loop_blocks_total", "Blocages de la boucle d'événements au-delà du seuil (mode debug)", ()
+)
+
+
+class BlockingReport(NamedTuple):
+    duration: float
+    location: str
+    stack: str
+
+    def describe(self) -> str:
+        return f"Boucle bloquée {self.duration * 1000:.0f} ms dans {self.location}\n{self.stack}"
+
+
+class BlockingDetector:
+    def __init__(self, threshold: float = 0.1, interval: float = None):
+        self.threshold = threshold
+        self.interval = interval or threshold / 4
+        self.reports: List[BlockingReport] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._pending: Optional[tuple] = None
+
+    def start(self):
+        """Démarre la surveillance de la boucle courante (à appeler depuis la boucle d'événements)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._heartbeat()
+        self._thread = threading.Thread(target=self._watch, name="blocking-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._finish_pending(time.monotonic())
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        self._finish_pending(now)
+        self._beat = now
+        self._handle = self._loop.call_later(self.interval, self._heartbeat)
+
+    def _watch(self):
+        while not self._stopping.wait(self.interval / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or (self._pending is not None and self._pending[0] == beat):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            location = f"{frame.f_code.co_filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+            stack = "".join(traceback.format_stack(frame))
+            if self._beat == beat:
+                self._pending = (beat, location, stack)
+
+    def _finish_pending(self, now: float):
+        """Clôt le blocage en cours à la reprise de la boucle : sa durée totale est alors connue."""
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        beat, location, stack = pending
+        report = BlockingReport(max(0.0, now - beat - self.interval), location, stack)
+        self.reports.append(report)
+        event_loop_blocks.inc()
+        logger.warning(report.describe())
+
+    async def __aenter__(self) -> "BlockingDetector":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # Laisse la boucle reprendre une fois pour clore un blocage survenu juste avant la sortie
+        await asyncio.sleep(0)
+        self.stop()
+
+
+@asynccontextmanager
+async def assert_no_blocking(threshold: float = 0.1):
+    """Échoue (`AssertionError`, avec la pile du code bloquant) si la boucle est bloquée plus de `threshold` secondes."""
+    async with BlockingDetector(threshold) as detector:
+        yield detector
+    if detector.reports:
+        raise AssertionError("\n\n".join(report.describe() for report in detector.reports))
@@ -0,0 +1,277 @@
+"""
+Cache en mémoire unifié : espaces de noms bornés (LRU + TTL), clés rattachées à la
+version des données, statistiques par espace de noms et invalidation.
+
+Usage :
+    @cached("drug_details")
+    def get_drug_details(self, cis): ...
+
+Les valeurs mises en cache sont partagées entre requêtes : elles doivent être
+traitées en lecture seule par les appelants.
+"""
+import time
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.core.config import settings
+from backend.core.memory import memory_registry
+from backend.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: Optional[float]):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class CacheNamespace:
+    """Espace de noms borné : éviction LRU au-delà de `max_entries`, expiration après `ttl` secondes (0 = jamais).
+
+    Les entrées sont associées à la version des données courante : au premier accès
+    après un changement de version, l'espace de noms est vidé.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl: float = 0.0, version_provider: Callable[[], Optional[str]] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._version_provider = version_provider
+        self._version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.counters: Dict[str, int] = {}
+
+    def _current_version(self) -> Optional[str]:
+        """Lue hors verrou : le fournisseur peut interroger SQLite (`get_data_version`)."""
+        return self._version_provider() if self._version_provider is not None else None
+
+    def _check_version(self, version: Optional[str]):
+        """À appeler sous verrou avec la version lue par `_current_version` : vide l'espace de noms si elle a changé."""
+        if self._version_provider is None:
+            return
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Cache {self.name} : version des données {self._version} → {version}, {len(self._entries)} entrées invalidées")
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            self._version = version
+
+    def _lookup(self, key: Hashable, version: Optional[str]) -> Any:
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        version = self._current_version()
+        with self._lock:
+            value = self._lookup(key, version)
+            if value is MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Comme `get`, sans compter de hit ni de miss."""
+        version = self._current_version()
+        with self._lock:
+            value = self._lookup(key, version)
+            return default if value is MISSING else value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+        version = self._current_version()
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = _Entry(value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def record(self, event: str = None, hit: Optional[bool] = None):
+        """Compte un hit, un miss ou un événement propre à l'appelant (ex. `refinements`) après un `peek`."""
+        with self._lock:
+            if event:
+                self.counters[event] = self.counters.get(event, 0) + 1
+            if hit is True:
+                self.hits += 1
+            elif hit is False:
+                self.misses += 1
+
+    def invalidate(self, key: Hashable = MISSING) -> int:
+        """Supprime une clé, ou tout l'espace de noms sans argument. Retourne le nombre d'entrées supprimées."""
+        with self._lock:
+            if key is MISSING:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(key, None) is not None else 0
+            self.invalidations += removed
+            return removed
+
+    def clear(self):
+        self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[Tuple[Hashable, Any]]:
+        """Copie des entrées prise sous le verrou (mesure mémoire pendant que les requêtes écrivent)."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "data_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                **self.counters,
+            }
+
+
+class CacheRegistry:
+    """Espaces de noms du processus, tous rattachés au même fournisseur de version des données."""
+
+    def __init__(self):
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._version_provider: Optional[Callable[[], Optional[str]]] = None
+        self._lock = threading.Lock()
+
+    def set_version_provider(self, provider: Callable[[], Optional[str]]):
+        self._version_provider = provider
+
+    def _current_version(self) -> Optional[str]:
+        return self._version_provider() if self._version_provider is not None else None
+
+    def namespace(self, name: str, max_entries: int = None, ttl: float = None) -> CacheNamespace:
+        with self._lock:
+            namespace = self._namespaces.get(name)
+            if namespace is None:
+                namespace = CacheNamespace(
+                    name,
+                    max_entries if max_entries is not None else settings.CACHE_MAX_ENTRIES,
+                    ttl if ttl is not None else settings.CACHE_TTL_SECONDS,
+                    version_provider=self._current_version
+                )
+                self._namespaces[name] = namespace
+                memory_registry.register(f"cache.{name}", namespace.entries)
+            return namespace
+
+    def get(self, name: str) -> Optional[CacheNamespace]:
+        return self._namespaces.get(name)
+
+    def names(self):
+        return sorted(self._namespaces)
+
+    def invalidate(self, name: str = None) -> Dict[str, int]:
+        """Vide un espace de noms (ou tous) ; retourne le nombre d'entrées supprimées par espace."""
+        targets = [name] if name else self.names()
+        return {target: self._namespaces[target].invalidate() for target in targets if target in self._namespaces}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self._namespaces[name].stats() for name in self.names()}
+
+
+caches = CacheRegistry()
+
+
+def _default_key(args: tuple, kwargs: dict) -> Hashable:
+    return (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+
+def cached(namespace: str, key: Callable[..., Hashable] = None, max_entries: int = None, ttl: float = None):
+    """Met en cache le résultat d'une fonction (ou méthode) dans l'espace de noms `namespace`.
+
+    La clé par défaut est l'ensemble des arguments (y compris `self`) ; les appels dont
+    les arguments ne sont pas hachables, ou avec `CACHE_ENABLED=false`, ne passent pas par le cache.
+    """
+    def decorator(func):
+        store = caches.namespace(namespace, max_entries, ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.CACHE_ENABLED:
+                return func(*args, **kwargs)
+            cache_key = key(*args, **kwargs) if key else _default_key(args, kwargs)
+            try:
+                value = store.get(cache_key, MISSING)
+            except TypeError:
+                return func(*args, **kwargs)
+            if value is MISSING:
+                value = store.put(cache_key, func(*args, **kwargs))
+            return value
+
+        wrapper.cache = store
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def caching_disabled():
+    """Désactive le décorateur `cached` (benchmarks, audit des requêtes : mesurer le coût réel)."""
+    previous = settings.CACHE_ENABLED
+    settings.CACHE_ENABLED = False
+    try:
+        yield
+    finally:
+        settings.CACHE_ENABLED = previous
+
+
+registry.callback(
+    "safepills_cache_lookups_total", "Consultations des caches par résultat (hit, refinement, miss)",
+    ("cache", "result"),
+    lambda: {
+        (name, result): stats.get(key, 0)
+        for name, stats in caches.stats().items()
+        for result, key in (("hit", "hits"), ("refinement", "refinements"), ("miss", "misses"))
+        if key in stats
+    },
+    metric_type="counter"
+)
+registry.callback(
+    "safepills_cache_entries", "Nombre d'entrées par cache", ("cache",),
+    lambda: {(name,): stats["size"] for name, stats in caches.stats().items()}
+)
+registry.callback(
+    "safepills_cache_evictions_total", "Évictions par cache et motif (LRU, expiration, invalidation)", ("cache", "reason"),
+    lambda: {
+        (name, reason): stats[key]
+        for name, stats in caches.stats().items()
+        for reason, key in (("lru", "evictions"), ("ttl", "expirations"), ("invalidation", "invalidations"))
+    },
+    metric_type="counter"
+)
@@ -14,6 +14,58 @@ class Settings(BaseSettings):
     
     ALLOWED_ORIGINS: str = "http://localhost:4321,http://127.0.0.1:4321,https://safe-pills-ten.vercel.app"
 
+    SEARCH_CACHE_SIZE: int = 512
+    SEARCH_CACHE_PREFETCH: int = 200
+
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5.0
+    METRICS_TOKEN: str = ""
+
+    TIMING_LOG: bool = False
+    SLOW_QUERY_MS: float = 50.0
+
+    REQUEST_BUDGET_SECONDS: float = 10.0
+    AI_TIMEOUT_SECONDS: float = 8.0
+    AI_HEDGE_AFTER_SECONDS: float = 0.0
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    AI_CIRCUIT_RESET_SECONDS: float = 30.0
+    AI_MIN_BUDGET_SECONDS: float = 1.0
+    AI_MAX_CONCURRENCY: int = 8
+    AI_MAX_QUEUE: int = 32
+    AI_TEMPLATE_RATIO: float = 0.0
+
+    EXPLANATION_DB_PATH: str = ""
+
+    DRUG_DETAILS_MAX_AGE: int = 86400
+    DATA_VERSION_CHECK_SECONDS: float = 60.0
+
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: float = 300.0
+
+    ADMIN_TOKEN: str = ""
+
+    WARMUP_ENABLED: bool = True
+    WARMUP_TOP_CIS: int = 200
+    WARMUP_CIS_PATH: str = ""
+
+    SHED_ENABLED: bool = True
+    SHED_LAG_SAMPLE_SECONDS: float = 0.1
+    SHED_LAG_SKIP_AI_MS: float = 100.0
+    SHED_LAG_REJECT_MS: float = 500.0
+    SHED_IN_FLIGHT_SKIP_AI: int = 64
+    SHED_IN_FLIGHT_REJECT: int = 256
+    SHED_RETRY_AFTER_SECONDS: int = 5
+
+    BLOCKING_DETECTOR: bool = False
+    BLOCKING_THRESHOLD_MS: float = 100.0
+
+    USE_SNAPSHOT: bool = True
+    SNAPSHOT_PATH: str = ""
+
+    USE_COMPILED_RULES: bool = True
+    COMPILED_RULES_PATH: str = ""
+
     @property
     def allowed_origins_list(self) -> list:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import pathlib
+import sqlite3
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+from backend.core.config import settings
+from backend.core.metrics import slow_queries
+
+logger = logging.getLogger("safepills.sql")
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_MAX_PARAMS_REPR = 200
+
+# Requêtes exécutées pendant un bloc `capture_statements()` (audit des plans d'exécution)
+_captured: ContextVar[Optional[List[Tuple[str, Any]]]] = ContextVar("captured_statements", default=None)
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL sur une ligne, listes de paramètres `?, ?, ?` réduites à `?…` (une forme par requête)."""
+    return _PLACEHOLDER_LIST.sub("?…", _WHITESPACE.sub(" ", sql).strip())
+
+
+def _format_params(params) -> str:
+    text = repr(params)
+    return text if len(text) <= _MAX_PARAMS_REPR else text[:_MAX_PARAMS_REPR] + "…"
+
+
+def _capture(sql: str, params):
+    captured = _captured.get()
+    if captured is not None:
+        captured.append((sql, params))
+
+
+def _observe(sql: str, params, elapsed: float):
+    threshold = settings.SLOW_QUERY_MS
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        normalized = normalize_sql(sql)
+        slow_queries.inc()
+        logger.warning(f"Requête lente ({elapsed * 1000:.1f} ms) : {normalized} | paramètres : {_format_params(params)}")
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Curseur qui chronomètre chaque instruction et journalise celles au-delà de `SLOW_QUERY_MS`.
+
+    SQLite produit les lignes à la demande : la durée d'une instruction cumule `execute` et
+    les lectures (`fetchone`, `fetchmany`, `fetchall`, itération). Elle est observée quand le
+    résultat est épuisé, à l'instruction suivante, ou à la fermeture du curseur.
+    """
+
+    _statement: Optional[Tuple[str, Any]] = None
+    _elapsed = 0.0
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            _observe(statement[0], statement[1], self._elapsed)
+
+    def _begin(self, sql, parameters):
+        self._finish()
+        _capture(sql, parameters)
+        self._statement = (sql, parameters)
+        self._elapsed = 0.0
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        self._timed(super().execute, sql, parameters)
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, "<executemany>")
+        try:
+            return self._timed(super().executemany, sql, seq_of_parameters)
+        finally:
+            self._finish()
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        try:
+            return self._timed(super().fetchall)
+        finally:
+            self._finish()
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Résultat abandonné avant épuisement (ex. `fetchone()` d'une seule ligne)
+        self._finish()
+
+
+class TimedConnection(sqlite3.Connection):
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(db_path: str, row_factory=sqlite3.Row, read_only: bool = False) -> sqlite3.Connection:
+    """Connexion SQLite instrumentée, utilisée par les repositories.
+
+    En lecture seule, une base absente lève `sqlite3.OperationalError` au lieu d'être créée vide.
+    """
+    if read_only:
+        conn = sqlite3.connect(f"{pathlib.Path(os.path.abspath(db_path)).as_uri()}?mode=ro", uri=True, factory=TimedConnection)
+    else:
+        conn = sqlite3.connect(db_path, factory=TimedConnection)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    return conn
+
+
+@contextmanager
+def capture_statements():
+    """Collecte les (SQL, paramètres) exécutés dans le bloc, pour `scripts/audit_query_plans.py`."""
+    statements: List[Tuple[str, Any]] = []
+    token = _captured.set(statements)
+    try:
+        yield statements
+    finally:
+        _captured.reset(token)
@@ -0,0 +1,26 @@
+"""
+Requêtes conditionnelles (ETag / If-None-Match) pour les réponses qui ne dépendent que des données du build.
+"""
+from typing import Dict, Optional
+
+
+def data_etag(data_version: Optional[str], resource_id: str) -> Optional[str]:
+    """ETag fort dérivé de (version des données, identifiant), None si l'un des deux est inutilisable."""
+    if not data_version or not resource_id.isalnum():
+        return None
+    return f'"{data_version}-{resource_id}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible de RFC 9110 (§13.1.2) : préfixe `W/` ignoré, `*` accepte tout."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
@@ -3,6 +3,8 @@ import os
 import logging
 from typing import Dict, Any, Optional
 
+from backend.core.memory import memory_registry
+
 logger = logging.getLogger(__name__)
 
 class I18nService:
@@ -24,6 +26,9 @@ class I18nService:
                 except Exception as e:
                     logger.error(f"Erreur chargement locale {lang}: {e}")
 
+    def languages(self) -> list:
+        return sorted(self._translations)
+
     def get(self, key: str, lang: str = "fr", section: str = "questions") -> Optional[str]:
         lang = lang if lang in self._translations else self._default_lang
         
@@ -71,3 +76,4 @@ class I18nService:
         return []
 
 i18n = I18nService()
+memory_registry.register("i18n.translations", lambda: i18n._translations)
@@ -1,4 +1,12 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from backend.core.memory import memory_registry
+
 limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
+
+memory_registry.register(
+    "limiter.storage",
+    # Copies : le stockage en mémoire de `limits` n'a pas de verrou global
+    lambda: tuple(dict(getattr(limiter._storage, name, None) or {}) for name in ("storage", "expirations", "events"))
+)
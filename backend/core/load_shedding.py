@@ -0,0 +1,136 @@
+"""
+Délestage adaptatif : le retard de la boucle d'événements et le nombre de requêtes en cours
+déterminent un niveau de charge, appliqué par priorité.
+
+    NORMAL      tout est servi
+    DEGRADED    `/evaluate` utilise l'explication locale au lieu de Gemini (motif `overload`)
+    SHEDDING    les routes non critiques répondent 503 avec `Retry-After`
+
+La recherche, les questionnaires et le score d'évaluation restent servis à tous les niveaux.
+"""
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+from backend.core.config import settings
+from backend.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+NORMAL = 0
+DEGRADED = 1
+SHEDDING = 2
+
+LEVEL_NAMES = {NORMAL: "normal", DEGRADED: "degraded", SHEDDING: "shedding"}
+
+# Routes jamais rejetées, ainsi que leurs sous-chemins : parcours d'automédication et sondes
+CRITICAL_PATHS = (
+    "/api/search",
+    "/api/automedication/flow",
+    "/api/automedication/evaluate",
+    "/api/admin",
+    "/healthz",
+    "/readyz",
+    "/metrics",
+)
+
+
+def is_critical_path(path: str) -> bool:
+    """Chemin critique, ou sous-chemin par segment (« /api/search/page », pas « /api/searchXYZ »)."""
+    return any(path == critical or path.startswith(critical + "/") for critical in CRITICAL_PATHS)
+
+
+# Décroissance du retard mesuré : hausse immédiate, baisse lissée pour éviter les oscillations
+LAG_DECAY = 0.2
+
+
+class LoadShedder:
+    def __init__(self, sample_interval: float = 0.1):
+        self.sample_interval = sample_interval
+        self.lag = 0.0
+        self.in_flight = 0
+        self.rejections = 0
+        self._last_level = NORMAL
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Lance la mesure du retard de boucle (à appeler depuis la boucle d'événements)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._monitor())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            self.observe_lag(max(0.0, loop.time() - start - self.sample_interval))
+
+    def observe_lag(self, lag: float):
+        self.lag = lag if lag >= self.lag else self.lag + (lag - self.lag) * LAG_DECAY
+
+    def level(self) -> int:
+        level = self._compute_level()
+        if level != self._last_level:
+            logger.warning(
+                f"Délestage : {LEVEL_NAMES[self._last_level]} → {LEVEL_NAMES[level]} "
+                f"(retard {self.lag * 1000:.0f} ms, {self.in_flight} requêtes en cours)"
+            )
+            self._last_level = level
+        return level
+
+    def _compute_level(self) -> int:
+        if not settings.SHED_ENABLED:
+            return NORMAL
+        lag_ms = self.lag * 1000
+        if lag_ms >= settings.SHED_LAG_REJECT_MS or self.in_flight >= settings.SHED_IN_FLIGHT_REJECT:
+            return SHEDDING
+        if lag_ms >= settings.SHED_LAG_SKIP_AI_MS or self.in_flight >= settings.SHED_IN_FLIGHT_SKIP_AI:
+            return DEGRADED
+        return NORMAL
+
+    def skip_ai(self) -> bool:
+        return self.level() >= DEGRADED
+
+    def should_reject(self, path: str) -> bool:
+        if is_critical_path(path) or self.level() < SHEDDING:
+            return False
+        self.rejections += 1
+        return True
+
+    @contextmanager
+    def track(self):
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+load_shedder = LoadShedder(settings.SHED_LAG_SAMPLE_SECONDS)
+
+registry.callback(
+    "safepills_event_loop_lag_seconds", "Retard de la boucle d'événements (lissé)", (),
+    lambda: {(): load_shedder.lag},
+)
+registry.callback(
+    "safepills_requests_in_flight", "Requêtes HTTP en cours", (),
+    lambda: {(): load_shedder.in_flight},
+)
+registry.callback(
+    "safepills_load_level", "Niveau de délestage (0 normal, 1 sans IA, 2 rejet des routes non critiques)", (),
+    lambda: {(): load_shedder.level()},
+)
+registry.callback(
+    "safepills_shed_requests_total", "Requêtes rejetées (503) par délestage", (),
+    lambda: {(): load_shedder.rejections}, metric_type="counter",
+)
@@ -0,0 +1,180 @@
+"""
+Mémoire par worker : taille profonde approximative des structures enregistrées (caches, index,
+tables i18n, état du rate limiter...) et comparaison d'instantanés `tracemalloc`.
+
+Chaque module enregistre ses structures à l'import, comme ses métriques :
+    memory_registry.register("i18n.translations", lambda: i18n._translations)
+
+Les tailles sont approximatives : un objet partagé entre deux structures est compté dans
+chacune ; les instantanés projetés (`mmap`) sont comptés pour leur taille projetée,
+partagée entre les workers.
+"""
+import gc
+import sys
+import mmap
+import types
+import logging
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_OPAQUE_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType,
+)
+
+
+def _slot_values(obj: Any):
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name == "__dict__":
+                continue
+            try:
+                yield getattr(obj, name)
+            except AttributeError:
+                continue
+
+
+def deep_size(obj: Any) -> Dict[str, int]:
+    """Taille profonde (octets) et nombre d'objets atteignables depuis `obj`, sans suivre classes, modules ni fonctions."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    count = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _OPAQUE_TYPES):
+            continue
+        seen.add(id(current))
+        count += 1
+        total += sys.getsizeof(current)
+
+        if isinstance(current, mmap.mmap):
+            total += len(current)
+        elif isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            stack.extend(_slot_values(current))
+    return {"bytes": total, "objects": count}
+
+
+class MemoryRegistry:
+    """Structures mesurables du processus : nom → fonction qui retourne l'objet à mesurer (`None` si pas encore construit).
+
+    `deep_size` parcourt l'objet sans verrou : une structure modifiée par les requêtes doit
+    fournir une copie prise sous son propre verrou.
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, provider: Callable[[], Any]):
+        with self._lock:
+            self._providers[name] = provider
+
+    def names(self) -> List[str]:
+        return sorted(self._providers)
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        report = {}
+        for name in self.names():
+            try:
+                target = self._providers[name]()
+                if target is not None:
+                    report[name] = deep_size(target)
+            except Exception as e:
+                logger.error(f"Erreur mesure mémoire {name}: {e}", exc_info=True)
+        return report
+
+
+memory_registry = MemoryRegistry()
+memory_registry.register("metrics.registry", lambda: registry.snapshot())
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS courante (Linux, `/proc/self/statm`), None ailleurs."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """RSS courante et pic de RSS du processus (octets), nombre d'objets suivis par le GC."""
+    max_rss = None
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        max_rss *= 1 if sys.platform == "darwin" else 1024
+    except ImportError:
+        pass
+    return {"rss_bytes": rss_bytes(), "max_rss_bytes": max_rss, "gc_objects": len(gc.get_objects())}
+
+
+class AllocationTracer:
+    """Comparaison d'instantanés `tracemalloc` entre deux instants (fuites, caches surdimensionnés).
+
+    `tracemalloc` ralentit les allocations : il n'est actif qu'entre `start()` et `stop()`.
+    """
+
+    def __init__(self, frames: int = 5):
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._baseline = tracemalloc.take_snapshot()
+
+    def diff(self, top: int = 20, reset: bool = True) -> List[Dict[str, Any]]:
+        """Plus fortes variations d'allocation par ligne depuis l'instantané de référence (`start()` ou dernier `diff()`)."""
+        with self._lock:
+            if self._baseline is None or not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc n'est pas démarré")
+            current = tracemalloc.take_snapshot()
+            filters = (tracemalloc.Filter(False, tracemalloc.__file__),)
+            stats = current.filter_traces(filters).compare_to(self._baseline.filter_traces(filters), "lineno")
+            if reset:
+                self._baseline = current
+        return [
+            {
+                "location": str(stat.traceback[0]),
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size": stat.size,
+            }
+            for stat in stats[:top]
+        ]
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+allocation_tracer = AllocationTracer()
+
+registry.callback(
+    "safepills_process_rss_bytes", "Mémoire résidente du worker", (),
+    lambda: {(): rss_bytes() or 0},
+)
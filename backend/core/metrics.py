@@ -0,0 +1,362 @@
+import os
+import json
+import time
+import glob
+import asyncio
+import logging
+import threading
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.core.config import settings
+from backend.core.resilience import CircuitOpenError, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, object] = {}
+
+    def _key(self, labels: dict) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Dict[LabelValues, object]:
+        with self._lock:
+            return {key: (list(value) if isinstance(value, list) else value) for key, value in self._values.items()}
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+        }
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Compteurs par bucket (non cumulés, dernier = +Inf) puis somme des valeurs
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def time_calls(self, **labels) -> Callable:
+        """Décorateur : chronomètre chaque appel de la fonction (synchrone ou coroutine)."""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.time(**labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def describe(self) -> dict:
+        description = super().describe()
+        description["buckets"] = list(self.buckets)
+        return description
+
+
+class _CallbackMetric:
+    """Métrique dont les valeurs sont lues à la collecte (ex. statistiques d'un cache)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], callback: Callable[[], Dict[LabelValues, float]], metric_type: str = "gauge"):
+        self.name = name
+        self.type = metric_type
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def samples(self) -> Dict[LabelValues, float]:
+        try:
+            return {tuple(key): float(value) for key, value in self.callback().items()}
+        except Exception as e:
+            logger.error(f"Erreur collecte métrique {self.name}: {e}", exc_info=True)
+            return {}
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+        }
+
+
+class MetricsRegistry:
+    """Registre de métriques en mémoire, exposé au format texte Prometheus.
+
+    Avec plusieurs workers, chaque processus écrit périodiquement un instantané
+    dans `multiprocess_dir` ; le rendu additionne les compteurs et histogrammes des workers
+    vivants (les instantanés des processus disparus sont supprimés) et conserve les jauges
+    de chaque worker sous un label `pid` : une jauge (RSS, requêtes en cours) ne s'additionne pas.
+    """
+
+    def __init__(self, multiprocess_dir: Optional[str] = None, flush_interval: float = 5.0):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: Sequence[str], callback: Callable[[], Dict[LabelValues, float]], metric_type: str = "gauge"):
+        return self._register(_CallbackMetric(name, documentation, labelnames, callback, metric_type))
+
+    def snapshot(self, pid: Optional[int] = None) -> List[dict]:
+        """Instantané des métriques ; avec `pid`, les jauges reçoivent un label `pid`."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = []
+        for metric in metrics:
+            description = metric.describe()
+            samples = metric.samples().items()
+            if pid is not None and description["type"] == "gauge":
+                description["labelnames"] = description["labelnames"] + ["pid"]
+                description["samples"] = [[list(key) + [str(pid)], value] for key, value in samples]
+            else:
+                description["samples"] = [[list(key), value] for key, value in samples]
+            snapshot.append(description)
+        return snapshot
+
+    def maybe_flush(self):
+        """Écrit l'instantané du worker si le mode multi-processus est actif et l'intervalle écoulé."""
+        if not self.multiprocess_dir:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self):
+        if not self.multiprocess_dir:
+            return
+        try:
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            path = os.path.join(self.multiprocess_dir, f"metrics-{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(pid=os.getpid()), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Erreur écriture des métriques: {e}", exc_info=True)
+
+    def _collect_snapshots(self) -> List[List[dict]]:
+        if not self.multiprocess_dir:
+            return [self.snapshot()]
+
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiprocess_dir, "metrics-*.json")):
+            pid = os.path.basename(path)[len("metrics-"):-len(".json")]
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                _remove_stale_snapshot(path)
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Instantané de métriques illisible {path}: {e}")
+        return snapshots
+
+    def render(self) -> str:
+        return render_snapshots(self._collect_snapshots())
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_stale_snapshot(path: str):
+    """Instantané d'un worker arrêté ou recyclé : ses compteurs ne doivent plus être additionnés."""
+    try:
+        os.remove(path)
+        logger.info(f"Instantané de métriques d'un worker disparu supprimé : {path}")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Suppression impossible de l'instantané {path}: {e}")
+
+
+def _merge(snapshots: Iterable[List[dict]]) -> Dict[str, dict]:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for metric in snapshot:
+            target = merged.setdefault(metric["name"], {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    return merged
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_snapshots(snapshots: Iterable[List[dict]]) -> str:
+    lines = []
+    for name, metric in sorted(_merge(snapshots).items()):
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(list(metric["buckets"]) + [float("inf")], value[:-1]):
+                cumulative += count
+                bucket_labels = _format_labels(labelnames, labels, ("le", _format_value(bound)))
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(settings.METRICS_MULTIPROC_DIR or None, settings.METRICS_FLUSH_INTERVAL)
+
+http_requests = registry.counter(
+    "safepills_http_requests_total", "Requêtes HTTP traitées", ("route", "method", "status")
+)
+http_request_seconds = registry.histogram(
+    "safepills_http_request_seconds", "Latence des requêtes HTTP par route", ("route", "method")
+)
+db_query_seconds = registry.histogram(
+    "safepills_db_query_seconds", "Latence des méthodes de repository SQLite", ("repository", "method")
+)
+slow_queries = registry.counter(
+    "safepills_slow_queries_total", "Instructions SQL au-delà de SLOW_QUERY_MS"
+)
+risk_score_seconds = registry.histogram(
+    "safepills_risk_score_seconds", "Durée de RiskCalculator.compute_score",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01)
+)
+ai_request_seconds = registry.histogram(
+    "safepills_ai_request_seconds", "Latence des appels Gemini", ("outcome",)
+)
+ai_queue_wait_seconds = registry.histogram(
+    "safepills_ai_queue_wait_seconds", "Attente en file avant l'appel Gemini", ("lang",)
+)
+ai_errors = registry.counter(
+    "safepills_ai_errors_total", "Erreurs des appels Gemini par classe", ("error_class",)
+)
+explanations = registry.counter(
+    "safepills_explanations_total", "Explications produites par source et motif", ("source", "reason")
+)
+not_modified = registry.counter(
+    "safepills_not_modified_total", "Réponses 304 à un If-None-Match", ("route",)
+)
+rate_limit_rejections = registry.counter(
+    "safepills_rate_limit_rejections_total", "Requêtes rejetées par le rate limiter", ("route",)
+)
+
+
+def classify_ai_error(error: Exception) -> str:
+    """Classe une erreur Gemini : "429" (quota), "503" (surcharge), "timeout", "circuit_open", "queue_full" ou "other"."""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, QueueFullError):
+        return "queue_full"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in (429, 503):
+        return str(code)
+    message = str(error)
+    for status in ("429", "503"):
+        if status in message:
+            return status
+    return "other"
@@ -42,4 +42,12 @@ class Rule(BaseModel):
     filter_route: Optional[str] = None
     filter_polymedication: bool = False
     filter_gender: Optional[str] = None
-    age_min: Optional[int] = None
\ No newline at end of file
+    age_min: Optional[int] = None
+
+class FamilyInteraction(BaseModel):
+    family_a: int
+    family_b: int
+    family_a_name: str
+    family_b_name: str
+    risk_level: RiskLevel
+    advice: str
\ No newline at end of file
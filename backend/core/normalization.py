@@ -0,0 +1,54 @@
+"""
+Normalisation des noms (substances, marques) et des requêtes de recherche.
+Module unique partagé par l'API et les scripts ETL : les clés calculées au build
+(`name_norm`) et les requêtes normalisées à l'exécution sont ainsi identiques.
+"""
+import unicodedata
+
+from backend.core.memory import memory_registry
+
+
+# Ligatures sans décomposition NFD, écrites en toutes lettres (« œstradiol » = « oestradiol ») ;
+# même table que `normalizeQuery` côté navigateur (src/lib/searchIndex.ts)
+LIGATURES = {"œ": "oe", "æ": "ae", "Œ": "oe", "Æ": "ae"}
+
+
+class _StripMarksTable(dict):
+    """Table de `str.translate` construite à la demande : caractère → forme sans diacritiques.
+
+    Chaque caractère non ASCII rencontré est décomposé (NFD) une seule fois,
+    puis le résultat est mémorisé dans la table.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        if chr(codepoint) in LIGATURES:
+            self[codepoint] = LIGATURES[chr(codepoint)]
+            return self[codepoint]
+        decomposed = unicodedata.normalize('NFD', chr(codepoint))
+        stripped = ''.join(c for c in decomposed if unicodedata.category(c) != 'Mn')
+        self[codepoint] = stripped
+        return stripped
+
+
+_STRIP_MARKS = _StripMarksTable()
+memory_registry.register("normalization.strip_marks", lambda: _STRIP_MARKS)
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules sans accents, ligatures œ/æ dépliées : clé de recherche (`name_norm`) et requêtes utilisateur.
+
+    Chemin rapide pour le texte ASCII (cas le plus courant des requêtes).
+    """
+    if not text:
+        return ""
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered
+    return lowered.translate(_STRIP_MARKS)
+
+
+def normalize_name(name: str) -> str:
+    """Clé de rapprochement des noms au build (familles, règles) : `normalize_text` sans espaces de bord ni tirets."""
+    if not isinstance(name, str):
+        return ""
+    return normalize_text(name).strip().replace('-', '')
@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Optional, Sequence
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode la clé de tri du dernier élément d'une page en curseur opaque."""
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list]:
+    """Décode un curseur produit par `encode_cursor`. Lève ValueError s'il est invalide."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Curseur invalide: {cursor}")
+    return values
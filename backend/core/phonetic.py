@@ -0,0 +1,64 @@
+import re
+import string
+import unicodedata
+
+# Règles de réécriture appliquées dans l'ordre (graphie française → son).
+_RULES = [
+    (re.compile(r"[^A-Z]+"), " "),
+    (re.compile(r"X(?= |$)"), ""),
+    (re.compile(r"X"), "KS"),
+    (re.compile(r"CH(?=[LR])"), "K"),
+    (re.compile(r"S?CH|SH"), "S"),
+    (re.compile(r"PH"), "F"),
+    (re.compile(r"H"), ""),
+    (re.compile(r"QU|Q|CK"), "K"),
+    (re.compile(r"C(?=[EIY])"), "S"),
+    (re.compile(r"C"), "K"),
+    (re.compile(r"GU(?=[EIY])"), "G"),
+    (re.compile(r"G(?=[EIY])"), "J"),
+    (re.compile(r"GN"), "N"),
+    (re.compile(r"Z"), "S"),
+    (re.compile(r"W"), "V"),
+    (re.compile(r"Y"), "I"),
+    (re.compile(r"EAU|AU"), "O"),
+    (re.compile(r"OU"), "U"),
+    (re.compile(r"AI|EI"), "E"),
+    (re.compile(r"([A-Z])\1+"), r"\1"),
+    (re.compile(r"\B[ESTD]+\b"), ""),
+    (re.compile(r"[AE][NM](?=[^AEIOUNM]|$)"), "AN"),
+]
+
+
+def phonetic_key(text: str) -> str:
+    """Encode un nom (marque ou substance) en clé phonétique française.
+
+    Deux graphies prononcées de la même façon (« dolipranne », « doliprane »)
+    produisent la même clé. Plusieurs règles dépendent de la lettre suivante ou de
+    la fin du mot : la clé d'un début de mot n'est donc pas toujours un préfixe de
+    celle du mot complet (« parac » → PARAK, « paracetamol » → PARASETAMOL) ;
+    pour une saisie en cours, utiliser `phonetic_prefix`.
+    """
+    if not text:
+        return ""
+    key = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii').upper()
+    for pattern, replacement in _RULES:
+        key = pattern.sub(replacement, key)
+    return " ".join(key.split())
+
+
+def phonetic_prefix(text: str) -> str:
+    """Préfixe de clé phonétique commun à toutes les suites possibles d'une saisie en cours.
+
+    Les règles ne regardent qu'une lettre plus loin : le préfixe commun aux clés de la
+    saisie seule et de la saisie suivie de chaque lettre est stable quelle que soit la
+    fin du mot (« parac » → PARA, « kardeg » → KARD). La recherche peut donc se faire
+    par plage d'index sur les clés des noms complets.
+    """
+    if not text:
+        return ""
+    keys = [phonetic_key(text)] + [phonetic_key(text + letter) for letter in string.ascii_uppercase]
+    low, high = min(keys), max(keys)
+    length = 0
+    while length < len(low) and low[length] == high[length]:
+        length += 1
+    return low[:length].rstrip()
@@ -0,0 +1,269 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Le budget de temps de la requête est épuisé avant (ou pendant) l'appel."""
+
+
+class CircuitOpenError(Exception):
+    """Le disjoncteur est ouvert : l'appel est refusé sans solliciter le service."""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Fixe l'échéance de la requête courante (le budget le plus court l'emporte si imbriqué)."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Secondes restantes avant l'échéance, `None` hors budget."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class CircuitBreaker:
+    """Disjoncteur à trois états.
+
+    - fermé : les appels passent, les échecs consécutifs sont comptés ;
+    - ouvert : après `failure_threshold` échecs, les appels sont refusés pendant `reset_timeout` ;
+    - semi-ouvert : un seul appel d'essai est autorisé, son résultat referme ou rouvre le circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Disjoncteur ouvert après {self._failures} échec(s)")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def release(self):
+        """Libère l'appel d'essai sans verdict (appel annulé par l'appelant)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+async def _hedged(call: Callable[[], Awaitable[T]], hedge_after: float) -> T:
+    """Lance un second appel si le premier n'a pas répondu après `hedge_after` ; le premier succès gagne."""
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            tasks.append(asyncio.ensure_future(call()))
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def call_with_resilience(
+    call: Callable[[], Awaitable[T]],
+    timeout: float,
+    breaker: Optional[CircuitBreaker] = None,
+    hedge_after: float = 0.0,
+) -> T:
+    """Exécute `call` dans la limite de `timeout` et du budget restant de la requête.
+
+    Lève `CircuitOpenError` si le disjoncteur refuse l'appel, `DeadlineExceeded` si le
+    budget est épuisé, `asyncio.TimeoutError` si l'appel dépasse son délai (il est alors annulé).
+    """
+    remaining = remaining_time()
+    if remaining is not None:
+        if remaining <= 0:
+            raise DeadlineExceeded("Budget de la requête épuisé")
+        timeout = min(timeout, remaining)
+
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError("Disjoncteur ouvert")
+
+    try:
+        if 0 < hedge_after < timeout:
+            result = await asyncio.wait_for(_hedged(call, hedge_after), timeout)
+        else:
+            result = await asyncio.wait_for(call(), timeout)
+    except asyncio.CancelledError:
+        if breaker is not None:
+            breaker.release()
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+
+    if breaker is not None:
+        breaker.record_success()
+    return result
+
+
+class QueueFullError(Exception):
+    """La file d'attente du répartiteur est pleine : l'appel est rejeté immédiatement."""
+
+
+class Dispatcher:
+    """Limite le nombre d'appels simultanés vers un service externe.
+
+    Au-delà de `max_concurrency`, les appels attendent dans une file bornée à
+    `max_queue` (rejet immédiat au-delà). Les places libérées sont attribuées
+    à tour de rôle entre les clés (ex. la langue), pour qu'un afflux sur une
+    clé n'affame pas les autres. L'attente est bornée par le budget de la requête.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.rejections = 0
+        self._active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        return self._active
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def depth_by_key(self) -> Dict[str, int]:
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    def is_saturated(self) -> bool:
+        """Vrai si un nouvel appel serait rejeté."""
+        return self._active >= self.max_concurrency and self.depth >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self, key: str = "default"):
+        await self._acquire(key)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, key: str):
+        if self._active < self.max_concurrency and self.depth == 0:
+            self._active += 1
+            return
+
+        if self.depth >= self.max_queue:
+            self.rejections += 1
+            raise QueueFullError(f"File d'attente pleine ({self.max_queue})")
+
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Budget de la requête épuisé")
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(key, deque())
+        if not queue:
+            self._turns.append(key)
+        queue.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, remaining)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # La place a été attribuée au moment de l'annulation : la rendre
+                self._release()
+            else:
+                self._discard(key, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded("Budget épuisé en file d'attente") from e
+            raise
+
+    def _discard(self, key: str, waiter: asyncio.Future):
+        queue = self._queues.get(key)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[key]
+                self._turns.remove(key)
+
+    def _release(self):
+        while self._turns:
+            key = self._turns.popleft()
+            queue = self._queues[key]
+            waiter = queue.popleft()
+            if queue:
+                self._turns.append(key)
+            else:
+                del self._queues[key]
+            if not waiter.done():
+                # Transmission directe de la place : `_active` reste inchangé
+                waiter.set_result(None)
+                return
+        self._active -= 1
@@ -8,6 +8,20 @@ class SearchResult(BaseModel):
     name: str
     description: Optional[str] = None
 
+class SearchPage(BaseModel):
+    results: List[SearchResult]
+    next_cursor: Optional[str] = None
+
+class BrandSummary(BaseModel):
+    cis: str
+    name: str
+    administration_route: Optional[str] = None
+    is_otc: bool
+
+class BrandPage(BaseModel):
+    items: List[BrandSummary]
+    next_cursor: Optional[str] = None
+
 class FlowOption(BaseModel):
     value: str
     label: str
@@ -37,3 +51,22 @@ class EvaluationResponse(BaseModel):
         kwargs.setdefault("exclude", set())
         kwargs["exclude"] = set(kwargs["exclude"]) | {"answered_questions_context"}
         return super().model_dump(**kwargs)
+
+class BasketDuplicate(BaseModel):
+    substance: str
+    cis: List[str]
+    advice: str
+
+class BasketInteraction(BaseModel):
+    cis: List[str]
+    families: List[str]
+    risk_level: int
+    advice: str
+
+class BasketResponse(BaseModel):
+    score: str
+    duplicates: List[BasketDuplicate] = []
+    interactions: List[BasketInteraction] = []
+    unknown_cis: List[str] = []
+    # False tant qu'aucune interaction sourcée n'est en base : seuls les doublons de substance sont contrôlés
+    has_interaction_coverage: bool = True
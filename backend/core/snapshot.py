@@ -0,0 +1,456 @@
+"""
+Instantané binaire du catalogue, projeté en mémoire (mmap) en lecture seule.
+
+`build_db.py` écrit `safepills.snap` à côté de `safepills.db`. Chaque worker le
+projette sans rien décoder au démarrage : les enregistrements sont lus à la demande
+(`struct.unpack_from`) et les pages sont partagées entre processus via le cache du
+système de fichiers. `get_snapshot()` rouvre le fichier quand la version des données
+change (mise à jour des règles à chaud) et ne le sert que s'il porte cette version.
+
+Format (entiers little-endian) :
+    en-tête     MAGIC, version du format, nombre de sections, empreinte BLAKE2b (16 octets),
+                `data_version` de la base source (ASCII, 16 octets complétés par des zéros)
+    sections    table (nom, offset, taille, nombre d'éléments) puis données alignées sur 8 octets
+      STRO/STRB   table des chaînes : offsets u32 (n + 1) et blob UTF-8
+      BRND        marques (enregistrements fixes, triées par id)
+      HASH        index CIS → marque (adressage ouvert, sondage linéaire, crc32)
+      COMP / SUBS / SFAM / FAMI   composition, substances, familles des substances, familles
+      RULE / BRUL règles et, par marque, indices des règles applicables
+"""
+import os
+import mmap
+import zlib
+import struct
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from backend.core.config import settings
+from backend.core.memory import memory_registry
+from backend.core.models import Brand, BrandSubstance, Family, Rule, RiskLevel, Substance
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SPSNAP\x00\x00"
+FORMAT_VERSION = 2
+
+NO_STRING = 0xFFFFFFFF
+NO_INT = -2 ** 31
+
+_HEADER = struct.Struct("<8sHH16s16s")
+_SECTION = struct.Struct("<4sQQI")
+_BRAND = struct.Struct("<IIIIBxHIIH2x")        # id, cis, nom, voie, otc, nb compo, début compo, début règles, nb règles
+_COMPOSITION = struct.Struct("<II")            # substance (indice), dosage
+_SUBSTANCE = struct.Struct("<IIIH2x")          # id, nom, début familles, nb familles
+_FAMILY = struct.Struct("<II")                 # id, nom
+_RULE = struct.Struct("<IIIBBxxiiIIi")         # id, code, conseil, niveau, polymédication, famille, substance, voie, sexe, âge min
+_U32 = struct.Struct("<I")
+
+_SECTIONS = ("STRO", "STRB", "BRND", "HASH", "COMP", "SUBS", "SFAM", "FAMI", "RULE", "BRUL")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def default_snapshot_path(db_path: str = None) -> str:
+    if db_path is None and settings.SNAPSHOT_PATH:
+        return settings.SNAPSHOT_PATH
+    return os.path.splitext(db_path or settings.DB_PATH)[0] + ".snap"
+
+
+def _cis_hash(cis: bytes) -> int:
+    return zlib.crc32(cis)
+
+
+class _StringTable:
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.encoded: List[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.encoded)
+            self.index[value] = position
+            self.encoded.append(value.encode("utf-8"))
+        return position
+
+    def sections(self):
+        offsets, total = [0], 0
+        for data in self.encoded:
+            total += len(data)
+            offsets.append(total)
+        return struct.pack(f"<{len(offsets)}I", *offsets), len(offsets), b"".join(self.encoded), total
+
+
+def _int_or_none(value: Optional[int]) -> int:
+    return NO_INT if value is None else value
+
+
+def write_snapshot(db_path: str, snapshot_path: str = None) -> dict:
+    """Écrit l'instantané de `db_path` (remplacement atomique) et retourne le nombre d'éléments par section."""
+    snapshot_path = snapshot_path or default_snapshot_path(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        families = conn.execute("SELECT id, name FROM families ORDER BY id").fetchall()
+        substances = conn.execute("SELECT id, name FROM substances ORDER BY id").fetchall()
+        substance_families = conn.execute("SELECT substance_id, family_id FROM substance_families ORDER BY id").fetchall()
+        brands = conn.execute("SELECT id, cis, name, administration_route, is_otc FROM brands ORDER BY id").fetchall()
+        compositions = conn.execute("SELECT brand_id, substance_id, dosage FROM brand_substances ORDER BY id").fetchall()
+        rules = conn.execute("""
+            SELECT id, question_code, risk_level, advice, family_id, substance_id,
+                   filter_route, filter_polymedication, filter_gender, age_min
+            FROM rules ORDER BY id
+        """).fetchall()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+            data_version = row[0] if row else None
+        except sqlite3.OperationalError:
+            data_version = None
+    finally:
+        conn.close()
+
+    strings = _StringTable()
+    family_row = {family_id: row for row, (family_id, _) in enumerate(families)}
+    family_data = b"".join(_FAMILY.pack(family_id, strings.add(name)) for family_id, name in families)
+
+    families_by_substance: Dict[int, List[int]] = {}
+    for substance_id, family_id in substance_families:
+        families_by_substance.setdefault(substance_id, []).append(family_id)
+
+    substance_row, substance_data, sfam = {}, [], []
+    for row, (substance_id, name) in enumerate(substances):
+        substance_row[substance_id] = row
+        fam_ids = [family_id for family_id in families_by_substance.get(substance_id, []) if family_id in family_row]
+        substance_data.append(_SUBSTANCE.pack(substance_id, strings.add(name), len(sfam), len(fam_ids)))
+        sfam.extend(family_row[family_id] for family_id in fam_ids)
+
+    rules_by_substance: Dict[int, List[int]] = {}
+    rules_by_family: Dict[int, List[int]] = {}
+    rule_data = []
+    for row, rule in enumerate(rules):
+        rule_id, code, level, advice, family_id, substance_id, route, polymed, gender, age_min = rule
+        rule_data.append(_RULE.pack(
+            rule_id, strings.add(code), strings.add(advice), level, int(bool(polymed)),
+            _int_or_none(family_id), _int_or_none(substance_id), strings.add(route), strings.add(gender), _int_or_none(age_min)
+        ))
+        if substance_id is not None:
+            rules_by_substance.setdefault(substance_id, []).append(row)
+        if family_id is not None:
+            rules_by_family.setdefault(family_id, []).append(row)
+
+    composition_by_brand: Dict[int, List[tuple]] = {}
+    for brand_id, substance_id, dosage in compositions:
+        if substance_id in substance_row:
+            composition_by_brand.setdefault(brand_id, []).append((substance_id, dosage))
+
+    brand_data, comp_data, brul = [], [], []
+    for brand_id, cis, name, route, is_otc in brands:
+        composition = composition_by_brand.get(brand_id, [])
+        comp_start = len(comp_data)
+        comp_data.extend(_COMPOSITION.pack(substance_row[substance_id], strings.add(dosage)) for substance_id, dosage in composition)
+
+        # Mêmes règles que `AutomedicationRepository.get_rules_for_brand` : substances de la marque et leurs familles
+        substance_ids = {substance_id for substance_id, _ in composition}
+        family_ids = {family_id for substance_id in substance_ids for family_id in families_by_substance.get(substance_id, [])}
+        applicable = set()
+        for substance_id in substance_ids:
+            applicable.update(rules_by_substance.get(substance_id, []))
+        for family_id in family_ids:
+            applicable.update(rules_by_family.get(family_id, []))
+        rule_start = len(brul)
+        brul.extend(sorted(applicable))
+
+        brand_data.append(_BRAND.pack(
+            brand_id, strings.add(cis), strings.add(name), strings.add(route), int(bool(is_otc)),
+            len(composition), comp_start, rule_start, len(applicable)
+        ))
+
+    slots = 1
+    while slots < max(2 * len(brands), 8):
+        slots <<= 1
+    table = [0] * slots
+    for row, (_, cis, _, _, _) in enumerate(brands):
+        position = _cis_hash(cis.encode("utf-8")) & (slots - 1)
+        while table[position]:
+            position = (position + 1) & (slots - 1)
+        table[position] = row + 1
+
+    string_offsets, string_count, blob, _ = strings.sections()
+    payloads = {
+        "STRO": (string_offsets, string_count),
+        "STRB": (blob, len(strings.encoded)),
+        "BRND": (b"".join(brand_data), len(brand_data)),
+        "HASH": (struct.pack(f"<{slots}I", *table), slots),
+        "COMP": (b"".join(comp_data), len(comp_data)),
+        "SUBS": (b"".join(substance_data), len(substance_data)),
+        "SFAM": (struct.pack(f"<{len(sfam)}I", *sfam), len(sfam)),
+        "FAMI": (family_data, len(families)),
+        "RULE": (b"".join(rule_data), len(rule_data)),
+        "BRUL": (struct.pack(f"<{len(brul)}I", *brul), len(brul)),
+    }
+
+    offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    table_entries, chunks, digest = [], [], hashlib.blake2b(digest_size=16)
+    for name in _SECTIONS:
+        data, count = payloads[name]
+        padding = (-offset) % 8
+        chunks.append(b"\x00" * padding + data)
+        offset += padding
+        table_entries.append(_SECTION.pack(name.encode("ascii"), offset, len(data), count))
+        digest.update(data)
+        offset += len(data)
+
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(_SECTIONS), digest.digest(), (data_version or "").encode("ascii")))
+        f.writelines(table_entries)
+        f.writelines(chunks)
+    # Remplacement atomique : les workers qui ont déjà projeté l'ancien fichier le conservent
+    os.replace(tmp_path, snapshot_path)
+
+    return {name: payloads[name][1] for name in _SECTIONS}
+
+
+class CatalogSnapshot:
+    """Lecture de l'instantané projeté en mémoire. Aucune donnée n'est décodée à l'ouverture."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            raise SnapshotError(f"Instantané tronqué : {path}")
+        magic, version, section_count, digest, data_version = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"Fichier non reconnu comme instantané SafePills : {path}")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Version d'instantané {version} non supportée (attendue : {FORMAT_VERSION})")
+        self.digest = digest.hex()
+        self.data_version = data_version.rstrip(b"\x00").decode("ascii") or None
+
+        self._sections = {}
+        for i in range(section_count):
+            name, offset, size, count = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            if offset + size > len(self._mm):
+                raise SnapshotError(f"Section {name.decode('ascii', 'replace')} hors du fichier : {path}")
+            self._sections[name.decode("ascii")] = (offset, size, count)
+        missing = [name for name in _SECTIONS if name not in self._sections]
+        if missing:
+            raise SnapshotError(f"Sections manquantes dans l'instantané : {', '.join(missing)}")
+
+        self._strings_offset = self._sections["STRO"][0]
+        self._blob_offset = self._sections["STRB"][0]
+        self._brands_offset, _, self.brand_count = self._sections["BRND"]
+        self._hash_offset, _, self._hash_slots = self._sections["HASH"]
+        self._comp_offset = self._sections["COMP"][0]
+        self._subs_offset = self._sections["SUBS"][0]
+        self._sfam_offset = self._sections["SFAM"][0]
+        self._fami_offset = self._sections["FAMI"][0]
+        self._rules_offset, _, self.rule_count = self._sections["RULE"]
+        self._brul_offset = self._sections["BRUL"][0]
+
+    def close(self):
+        self._mm.close()
+
+    def verify(self) -> bool:
+        """Recalcule l'empreinte des sections (lit tout le fichier : réservé aux contrôles hors ligne)."""
+        digest = hashlib.blake2b(digest_size=16)
+        for name in _SECTIONS:
+            offset, size, _ = self._sections[name]
+            digest.update(self._mm[offset:offset + size])
+        return digest.hexdigest() == self.digest
+
+    def counts(self) -> Dict[str, int]:
+        return {name: count for name, (_, _, count) in self._sections.items()}
+
+    # --- Accès bas niveau -------------------------------------------------
+
+    def _u32(self, offset: int, index: int) -> int:
+        return _U32.unpack_from(self._mm, offset + 4 * index)[0]
+
+    def _string_bytes(self, index: int) -> bytes:
+        start, end = struct.unpack_from("<II", self._mm, self._strings_offset + 4 * index)
+        return self._mm[self._blob_offset + start:self._blob_offset + end]
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        return self._string_bytes(index).decode("utf-8")
+
+    def _brand_row(self, cis: str) -> Optional[int]:
+        encoded = cis.encode("utf-8")
+        mask = self._hash_slots - 1
+        position = _cis_hash(encoded) & mask
+        for _ in range(self._hash_slots):
+            slot = self._u32(self._hash_offset, position)
+            if not slot:
+                return None
+            row = slot - 1
+            cis_index = _U32.unpack_from(self._mm, self._brands_offset + row * _BRAND.size + 4)[0]
+            if self._string_bytes(cis_index) == encoded:
+                return row
+            position = (position + 1) & mask
+        return None
+
+    def _family(self, row: int) -> Family:
+        family_id, name = _FAMILY.unpack_from(self._mm, self._fami_offset + row * _FAMILY.size)
+        return Family(id=family_id, name=self._string(name))
+
+    def _substance(self, row: int, with_families: bool) -> Substance:
+        substance_id, name, fam_start, fam_count = _SUBSTANCE.unpack_from(self._mm, self._subs_offset + row * _SUBSTANCE.size)
+        families = [self._family(self._u32(self._sfam_offset, fam_start + i)) for i in range(fam_count)] if with_families else []
+        return Substance(id=substance_id, name=self._string(name), families=families)
+
+    def _rule(self, row: int) -> Rule:
+        rule_id, code, advice, level, polymed, family_id, substance_id, route, gender, age_min = _RULE.unpack_from(
+            self._mm, self._rules_offset + row * _RULE.size
+        )
+        try:
+            risk_enum = RiskLevel(level)
+        except ValueError:
+            risk_enum = RiskLevel.LEVEL_1
+        return Rule(
+            id=rule_id,
+            question_code=self._string(code),
+            risk_level=risk_enum,
+            advice=self._string(advice),
+            family_id=None if family_id == NO_INT else family_id,
+            substance_id=None if substance_id == NO_INT else substance_id,
+            filter_route=self._string(route),
+            filter_polymedication=bool(polymed),
+            filter_gender=self._string(gender),
+            age_min=None if age_min == NO_INT else age_min
+        )
+
+    # --- Accès métier -----------------------------------------------------
+
+    def has_brand(self, cis: str) -> bool:
+        return self._brand_row(cis) is not None
+
+    def brand(self, cis: str, with_families: bool = False) -> Optional[Brand]:
+        row = self._brand_row(cis)
+        if row is None:
+            return None
+        brand_id, cis_index, name, route, is_otc, comp_count, comp_start, _, _ = _BRAND.unpack_from(
+            self._mm, self._brands_offset + row * _BRAND.size
+        )
+        composition = []
+        for i in range(comp_count):
+            substance_row, dosage = _COMPOSITION.unpack_from(self._mm, self._comp_offset + (comp_start + i) * _COMPOSITION.size)
+            composition.append(BrandSubstance(substance=self._substance(substance_row, with_families), dosage=self._string(dosage)))
+        return Brand(
+            id=brand_id,
+            cis=cis,
+            name=self._string(name),
+            administration_route=self._string(route),
+            is_otc=bool(is_otc),
+            composition=composition
+        )
+
+    def brands(self, cis_list: Iterable[str], with_families: bool = True) -> List[Brand]:
+        found = (self.brand(cis, with_families) for cis in cis_list)
+        return [brand for brand in found if brand is not None]
+
+    def route(self, cis: str) -> Optional[str]:
+        row = self._brand_row(cis)
+        if row is None:
+            return None
+        return self._string(_U32.unpack_from(self._mm, self._brands_offset + row * _BRAND.size + 12)[0])
+
+    def rules_for_brand(self, cis: str) -> List[Rule]:
+        row = self._brand_row(cis)
+        if row is None:
+            return []
+        _, _, _, _, _, _, _, rule_start, rule_count = _BRAND.unpack_from(self._mm, self._brands_offset + row * _BRAND.size)
+        return [self._rule(self._u32(self._brul_offset, rule_start + i)) for i in range(rule_count)]
+
+
+class SharedSnapshot:
+    """Instantané partagé du processus, rouvert quand la version des données change.
+
+    Le fournisseur de version (`set_version_provider`, branché par le service de recherche)
+    est relu à chaque accès ; un instantané qui ne porte pas cette version est ignoré au profit
+    de SQLite jusqu'à ce que le fichier soit réécrit. Sans fournisseur, l'instantané est ouvert
+    une fois et ignoré s'il est plus ancien que la base.
+    """
+
+    def __init__(self):
+        self._version_provider: Optional[Callable[[], Optional[str]]] = None
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def set_version_provider(self, provider: Callable[[], Optional[str]]):
+        self._version_provider = provider
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+            self._key = None
+
+    @property
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Instantané déjà ouvert, sans ouverture ni contrôle de version."""
+        return self._snapshot
+
+    def get(self) -> Optional[CatalogSnapshot]:
+        if not settings.USE_SNAPSHOT:
+            return None
+        version = self._version_provider() if self._version_provider else None
+        snapshot, key = self._snapshot, self._key
+        if key is not None and key[0] == version and (snapshot is not None or key[1] == self._mtime()):
+            return snapshot
+
+        with self._lock:
+            mtime = self._mtime()
+            if self._key != (version, mtime):
+                # L'ancien instantané n'est pas fermé : la projection est libérée avec ses derniers lecteurs
+                self._snapshot = self._open(version, mtime)
+                self._key = (version, mtime)
+            return self._snapshot
+
+    @staticmethod
+    def _mtime() -> Optional[float]:
+        try:
+            return os.path.getmtime(default_snapshot_path())
+        except OSError:
+            return None
+
+    def _open(self, version: Optional[str], mtime: Optional[float]) -> Optional[CatalogSnapshot]:
+        path = default_snapshot_path()
+        if mtime is None:
+            return None
+        if self._version_provider is None and os.path.exists(settings.DB_PATH) and os.path.getmtime(settings.DB_PATH) > mtime:
+            logger.warning(f"Instantané {path} plus ancien que la base : lecture SQLite")
+            return None
+        try:
+            snapshot = CatalogSnapshot(path)
+        except (SnapshotError, OSError, struct.error) as e:
+            logger.warning(f"Instantané {path} ignoré : {e}")
+            return None
+        if self._version_provider is not None and snapshot.data_version != version:
+            logger.warning(f"Instantané {path} en version {snapshot.data_version}, base en {version} : lecture SQLite")
+            snapshot.close()
+            return None
+        return snapshot
+
+
+shared_snapshot = SharedSnapshot()
+
+
+def get_snapshot() -> Optional[CatalogSnapshot]:
+    """Instantané partagé du processus, ou None (désactivé, absent, invalide ou d'une autre version que la base)."""
+    return shared_snapshot.get()
+
+
+# Taille projetée, partagée entre les workers ; mesurée seulement si l'instantané est déjà ouvert
+memory_registry.register("snapshot", lambda: shared_snapshot.current)
@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+
+
+class RequestTimer:
+    """Durées cumulées par phase pour une requête, restituées en en-tête `Server-Timing`."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, duration: float):
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+    def as_dict(self) -> Dict[str, float]:
+        """Durées en millisecondes, phase `total` incluse."""
+        durations = {name: round(value * 1000, 2) for name, value in self.phases.items()}
+        durations["total"] = round(self.total * 1000, 2)
+        return durations
+
+    def header_value(self) -> str:
+        return ", ".join(f"{name};dur={duration:.2f}" for name, duration in self.as_dict().items())
+
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+
+
+def start_timer() -> Token:
+    return _current_timer.set(RequestTimer())
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current_timer.get()
+
+
+def stop_timer(token: Token):
+    _current_timer.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    """Chronomètre une phase de la requête courante (sans effet hors requête)."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, time.perf_counter() - start)
@@ -0,0 +1,174 @@
+"""
+Audit des plans d'exécution SQLite des repositories.
+Exécute chaque méthode de repository sur des entrées représentatives en capturant
+les requêtes émises, puis lance `EXPLAIN QUERY PLAN` sur chacune et signale les
+parcours complets de table (SCAN). Code de sortie 1 si un SCAN non attendu apparaît.
+
+Usage :
+    python backend/scripts/audit_query_plans.py [--db backend/data/safepills.db]
+"""
+import os
+import sys
+import sqlite3
+import argparse
+import tempfile
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core.cache import caching_disabled
+from backend.core.db import capture_statements, normalize_sql
+from backend.core.phonetic import phonetic_key
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.explanation_store import ExplanationKey, ExplanationStore
+from backend.services.search.repository import DrugRepository
+
+# Parcours complets assumés : la recherche par sous-chaîne (LIKE '%…%'), lancée quand les préfixes
+# ne remplissent pas la page, ne peut pas utiliser d'index ; la matrice d'interactions et la liste
+# de préchauffage sont lues une seule fois
+EXPECTED_SCANS = {
+    "drugs.search_ranked": "repli par sous-chaîne (LIKE '%…%') après les préfixes",
+    "drugs.search_ranked (page 2)": "repli par sous-chaîne (LIKE '%…%') après les préfixes",
+    "automedication.get_family_interactions": "table chargée en entier une fois (matrice d'interactions)",
+    "drugs.get_warmup_cis": "lecture unique au démarrage (préchauffage)",
+}
+
+
+class PlanReport(NamedTuple):
+    method: str
+    sql: str
+    plan: List[Tuple[int, int, str]]
+    scans: List[str]
+
+
+def _is_table_scan(detail: str) -> bool:
+    return detail.startswith("SCAN ") and not detail.startswith(("SCAN (subquery", "SCAN CONSTANT ROW"))
+
+
+def sample_inputs(db_path: str) -> dict:
+    conn = sqlite3.connect(db_path)
+    try:
+        cis = conn.execute("""
+            SELECT b.cis FROM brands b
+            JOIN brand_substances bs ON bs.brand_id = b.id
+            JOIN substance_families sf ON sf.substance_id = bs.substance_id
+            ORDER BY b.is_otc DESC, b.cis LIMIT 1
+        """).fetchone()[0]
+        substance_id = conn.execute("SELECT substance_id FROM substance_brands ORDER BY position DESC LIMIT 1").fetchone()[0]
+        codes = [row[0] for row in conn.execute("SELECT DISTINCT question_code FROM rules LIMIT 5")]
+    finally:
+        conn.close()
+    return {"cis": cis, "substance_id": substance_id, "codes": codes}
+
+
+def repository_calls(db_path: str, store_path: str) -> Dict[str, Callable[[], object]]:
+    drugs = DrugRepository(db_path)
+    automedication = AutomedicationRepository(db_path)
+    store = ExplanationStore(store_path)
+    store.init_schema()
+    inputs = sample_inputs(db_path)
+
+    def second_page():
+        hits = drugs.search_ranked("para", 5)
+        return drugs.search_ranked("para", 5, after=hits[-1].sort_key) if hits else []
+
+    return {
+        "drugs.search_ranked (préfixes)": lambda: drugs.search_ranked("para", 1),
+        "drugs.search_ranked": lambda: drugs.search_ranked("para", 20),
+        "drugs.search_ranked (page 2)": second_page,
+        "drugs.search_phonetic": lambda: drugs.search_phonetic(phonetic_key("paracetamol"), 20),
+        "drugs.substance_exists": lambda: drugs.substance_exists(inputs["substance_id"]),
+        "drugs.brand_exists": lambda: drugs.brand_exists(inputs["cis"]),
+        "drugs.get_brands_for_substance": lambda: drugs.get_brands_for_substance(inputs["substance_id"], 0, 20),
+        "drugs.get_drug_details": lambda: drugs.get_drug_details(inputs["cis"]),
+        "drugs.get_data_version": drugs.get_data_version,
+        "drugs.get_warmup_cis": lambda: drugs.get_warmup_cis(200),
+        "automedication.get_rules_by_codes": lambda: automedication.get_rules_by_codes(inputs["codes"]),
+        "automedication.get_rules_for_brand": lambda: automedication.get_rules_for_brand(inputs["cis"]),
+        "automedication.get_rules_for_brand (substance)": lambda: automedication.get_rules_for_brand(str(inputs["substance_id"])),
+        "automedication.get_drug_route": lambda: automedication.get_drug_route(inputs["cis"]),
+        "automedication.get_brands_composition": lambda: automedication.get_brands_composition([inputs["cis"], "00000000"]),
+        "automedication.get_family_interactions": automedication.get_family_interactions,
+        "explanations.get": lambda: store.get(ExplanationKey(inputs["cis"], "", "RED", "fr", "F-adult")),
+    }
+
+
+def audit(db_path: str) -> List[PlanReport]:
+    reports = []
+    with caching_disabled(), tempfile.TemporaryDirectory(prefix="safepills-audit-") as workdir:
+        store_path = os.path.join(workdir, "explanations.db")
+        for method, call in repository_calls(db_path, store_path).items():
+            with capture_statements() as statements:
+                call()
+
+            seen = set()
+            for sql, params in statements:
+                normalized = normalize_sql(sql)
+                if normalized in seen or normalized.upper().startswith("CREATE"):
+                    continue
+                seen.add(normalized)
+
+                target = store_path if method.startswith("explanations.") else db_path
+                conn = sqlite3.connect(target)
+                try:
+                    plan = [(row[0], row[1], row[3]) for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+                finally:
+                    conn.close()
+                scans = [detail for _, _, detail in plan if _is_table_scan(detail)]
+                reports.append(PlanReport(method, normalized, plan, scans))
+    return reports
+
+
+def print_report(report: PlanReport):
+    print(f"\n▶ {report.method}")
+    print(f"  {report.sql[:160]}{'…' if len(report.sql) > 160 else ''}")
+    depth: Dict[int, int] = {0: 0}
+    for node_id, parent, detail in report.plan:
+        depth[node_id] = depth.get(parent, 0) + 1
+        marker = "⚠️ " if _is_table_scan(detail) else ""
+        print(f"  {'  ' * depth[node_id]}{marker}{detail}")
+
+
+def audit_query_plans(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Audit des plans d'exécution des repositories")
+    parser.add_argument("--db", default=DB_PATH, help="Base SQLite à auditer")
+    parser.add_argument("--quiet", action="store_true", help="N'afficher que les SCAN signalés")
+    args = parser.parse_args(argv)
+
+    print("🔬 Audit des plans d'exécution SQLite...")
+
+    if not os.path.exists(args.db):
+        print(f"❌ Base de données introuvable : {args.db}. Veuillez d'abord lancer build_db.py.")
+        return 1
+
+    reports = audit(args.db)
+    unexpected = []
+    for report in reports:
+        if not args.quiet:
+            print_report(report)
+        if report.scans:
+            if report.method in EXPECTED_SCANS:
+                print(f"ℹ️ {report.method} : SCAN attendu — {EXPECTED_SCANS[report.method]}")
+            else:
+                unexpected.append(report)
+
+    print()
+    if unexpected:
+        for report in unexpected:
+            print(f"❌ {report.method} : {', '.join(report.scans)}")
+            print(f"   {report.sql[:200]}")
+        print(f"❌ {len(unexpected)} requête(s) avec parcours complet de table sur {len(reports)} auditées")
+        return 1
+
+    print(f"✅ {len(reports)} requêtes auditées, aucun parcours complet inattendu")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(audit_query_plans())
@@ -1,14 +1,28 @@
 import os
+import sys
 import sqlite3
 import json
 import re
+import hashlib
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
 DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
 SCRIPTS_DATA_DIR = os.path.join(BASE_DIR, '..', '..', 'scripts_data')
 
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core.normalization import normalize_name, normalize_text
+from backend.core.phonetic import phonetic_key
+from backend.core.snapshot import default_snapshot_path, write_snapshot
+from backend.scripts.compile_rules import compile_rules
+from backend.services.automedication.rule_engine import default_rules_path
+
 DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
 WHITELIST_PATH = os.path.join(DATA_DIR, 'whitelist.json')
+PHARMA_DATA_PATH = os.path.join(DATA_DIR, 'pharma_data.json')
+MED_KNOWLEDGE_PATH = os.path.join(DATA_DIR, 'medical_knowledge.json')
 
 def init_db(cursor):
     cursor.executescript("""
@@ -20,15 +34,24 @@ def init_db(cursor):
         DROP TABLE IF EXISTS questions;
         
         -- Drop new schema
+        DROP TABLE IF EXISTS substance_brands;
+        DROP TABLE IF EXISTS family_interactions;
         DROP TABLE IF EXISTS rules;
         DROP TABLE IF EXISTS substance_families;
         DROP TABLE IF EXISTS brand_substances;
         DROP TABLE IF EXISTS brands;
         DROP TABLE IF EXISTS substances;
         DROP TABLE IF EXISTS families;
+        DROP TABLE IF EXISTS meta;
 
         PRAGMA foreign_keys = ON;
 
+        -- Métadonnées du build (data_version : empreinte du contenu, utilisée pour les ETag)
+        CREATE TABLE meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID;
+
         CREATE TABLE families (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE NOT NULL
@@ -36,7 +59,9 @@ def init_db(cursor):
 
         CREATE TABLE substances (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL
+            name TEXT UNIQUE NOT NULL,
+            name_norm TEXT NOT NULL,
+            phonetic TEXT
         );
 
         CREATE TABLE substance_families (
@@ -52,7 +77,9 @@ def init_db(cursor):
             cis TEXT UNIQUE NOT NULL,
             name TEXT NOT NULL,
             administration_route TEXT,
-            is_otc BOOLEAN DEFAULT 0
+            is_otc BOOLEAN DEFAULT 0,
+            name_norm TEXT NOT NULL,
+            phonetic TEXT
         );
 
         CREATE TABLE brand_substances (
@@ -78,28 +105,107 @@ def init_db(cursor):
             FOREIGN KEY(family_id) REFERENCES families(id),
             FOREIGN KEY(substance_id) REFERENCES substances(id)
         );
+
+        -- Paires de familles à risque dans un même panier (family_a <= family_b)
+        CREATE TABLE family_interactions (
+            family_a INTEGER NOT NULL,
+            family_b INTEGER NOT NULL,
+            risk_level INTEGER NOT NULL,
+            advice TEXT NOT NULL,
+            PRIMARY KEY (family_a, family_b),
+            FOREIGN KEY(family_a) REFERENCES families(id),
+            FOREIGN KEY(family_b) REFERENCES families(id)
+        ) WITHOUT ROWID;
+
+        -- Index inversé précalculé : substance -> marques (OTC d'abord, puis par nom)
+        CREATE TABLE substance_brands (
+            substance_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            brand_id INTEGER NOT NULL,
+            PRIMARY KEY (substance_id, position)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX idx_brand_substances_substance ON brand_substances(substance_id);
+        CREATE INDEX idx_brand_substances_brand ON brand_substances(brand_id, substance_id);
+        CREATE INDEX idx_substance_families_substance ON substance_families(substance_id, family_id);
+        CREATE INDEX idx_rules_question_code ON rules(question_code);
+        CREATE INDEX idx_rules_substance ON rules(substance_id);
+        CREATE INDEX idx_rules_family ON rules(family_id);
+        CREATE INDEX idx_substances_name_norm ON substances(name_norm);
+        CREATE INDEX idx_brands_name_norm ON brands(name_norm);
+        CREATE INDEX idx_substances_phonetic ON substances(phonetic);
+        CREATE INDEX idx_brands_phonetic ON brands(phonetic);
+    """)
+
+def build_substance_brands_index(cursor):
+    cursor.execute("""
+        INSERT INTO substance_brands (substance_id, position, brand_id)
+        SELECT
+            pairs.substance_id,
+            ROW_NUMBER() OVER (
+                PARTITION BY pairs.substance_id
+                ORDER BY b.is_otc DESC, b.name, b.id
+            ),
+            b.id
+        FROM (SELECT DISTINCT substance_id, brand_id FROM brand_substances) pairs
+        JOIN brands b ON b.id = pairs.brand_id
     """)
 
-def normalize_name(name):
-    import unicodedata
-    if not isinstance(name, str):
-        return ""
-    n = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('utf-8')
-    n = n.lower().strip()
-    n = n.replace('-', '')
-    return n
+
+# Tables dont le contenu est servi par l'API (substance_brands en est dérivée)
+DATA_TABLES = ("families", "substances", "substance_families", "brands", "brand_substances", "rules", "family_interactions")
+
+
+def compute_data_version(cursor) -> str:
+    """Empreinte du contenu des tables servies : identique pour deux builds des mêmes données."""
+    digest = hashlib.sha256()
+    for table in DATA_TABLES:
+        rows = cursor.execute(f"SELECT * FROM {table}").fetchall()
+        digest.update(table.encode("utf-8"))
+        for row in sorted(rows, key=repr):
+            digest.update(repr(row).encode("utf-8"))
+    return digest.hexdigest()[:16]
 
 
-def build_database():
+def stamp_data_version(cursor) -> str:
+    data_version = compute_data_version(cursor)
+    cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('data_version', ?)", (data_version,))
+    return data_version
+
+
+def import_interactions(cursor, med_knowledge, family_ids):
+    """Importe la section `interactions` de medical_knowledge.json dans `family_interactions`.
+
+    Seules les paires sourcées (`source`) et validées par un pharmacien (`reviewed_by`) sont servies.
+    """
+    inserted = 0
+    for interaction in med_knowledge.get('interactions', []):
+        fam_a, fam_b = interaction['families']
+        if not interaction.get('source') or not interaction.get('reviewed_by'):
+            print(f"⚠️ Interaction {fam_a} + {fam_b} sans source ou validation pharmaceutique. Ignorée.")
+            continue
+        ids = [family_ids.get(fam_a), family_ids.get(fam_b)]
+        if not all(ids):
+            print(f"⚠️ Famille inconnue pour l'interaction {fam_a} + {fam_b}. Ignorée.")
+            continue
+
+        cursor.execute(
+            "INSERT OR REPLACE INTO family_interactions (family_a, family_b, risk_level, advice) VALUES (?, ?, ?, ?)",
+            (min(ids), max(ids), interaction['risk_level'], interaction['advice'])
+        )
+        inserted += 1
+    return inserted
+
+
+def build_database(db_path=DB_PATH, pharma_data_path=PHARMA_DATA_PATH, med_knowledge_path=MED_KNOWLEDGE_PATH, snapshot_path=None):
     print("🚀 Début de l'intégration dans SafePills (SQLite)...")
     
-    PHARMA_DATA_PATH = os.path.join(DATA_DIR, 'pharma_data.json')
-    if not os.path.exists(PHARMA_DATA_PATH):
-        print(f"❌ Fichier manquant: {PHARMA_DATA_PATH}. Veuillez lancer extract_data.py d'abord.")
+    if not os.path.exists(pharma_data_path):
+        print(f"❌ Fichier manquant: {pharma_data_path}. Veuillez lancer extract_data.py d'abord.")
         return
         
     try:
-        with open(PHARMA_DATA_PATH, 'r', encoding='utf-8') as f:
+        with open(pharma_data_path, 'r', encoding='utf-8') as f:
             pharma_data = json.load(f)
     except Exception as e:
         print(f"❌ Erreur lecture de la donnée JSON : {e}")
@@ -111,7 +217,7 @@ def build_database():
     substance_to_families = pharma_data.get("substance_to_families", {})
 
     print("💾 Insertion dans SQLite...")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     init_db(cursor)
 
@@ -122,7 +228,10 @@ def build_database():
 
     substance_ids = {} 
     for sub_name in substances_to_import:
-        cursor.execute("INSERT INTO substances (name) VALUES (?)", (sub_name,))
+        cursor.execute(
+            "INSERT INTO substances (name, name_norm, phonetic) VALUES (?, ?, ?)",
+            (sub_name, normalize_text(sub_name), phonetic_key(sub_name))
+        )
         sub_id = cursor.lastrowid
         substance_ids[sub_name] = sub_id
         
@@ -136,8 +245,8 @@ def build_database():
 
     for brand in brands_to_import:
         cursor.execute(
-            "INSERT INTO brands (cis, name, administration_route, is_otc) VALUES (?, ?, ?, ?)",
-            (brand['cis'], brand['name'], brand['route'], brand['is_otc'])
+            "INSERT INTO brands (cis, name, administration_route, is_otc, name_norm, phonetic) VALUES (?, ?, ?, ?, ?, ?)",
+            (brand['cis'], brand['name'], brand['route'], brand['is_otc'], normalize_text(brand['name']), phonetic_key(brand['name']))
         )
         brand_id = cursor.lastrowid
         
@@ -149,12 +258,12 @@ def build_database():
                     (brand_id, sub_id, compo.get('dosage'))
                 )
 
+    build_substance_brands_index(cursor)
     conn.commit()
 
     print("📚 Importation des Règles Médicales (Medical Knowledge)...")
-    MED_KNOWLEDGE_PATH = os.path.join(DATA_DIR, 'medical_knowledge.json')
     try:
-        with open(MED_KNOWLEDGE_PATH, 'r', encoding='utf-8') as f:
+        with open(med_knowledge_path, 'r', encoding='utf-8') as f:
             med_knowledge = json.load(f)
             
         rules_inserted = 0
@@ -199,13 +308,26 @@ def build_database():
                 ))
                 rules_inserted += 1
             
+        interactions_inserted = import_interactions(cursor, med_knowledge, family_ids)
+
         conn.commit()
         print(f"✅ {rules_inserted} règles insérées avec succès.")
+        print(f"✅ {interactions_inserted} interactions entre familles insérées.")
     except Exception as e:
         print(f"❌ Erreur lors de l'import des règles : {e}")
 
+    data_version = stamp_data_version(cursor)
+    conn.commit()
     conn.close()
-    print("✨ Base de données générée avec succès (Schéma Relationnel Majeur).")
+    print(f"✨ Base de données générée avec succès (Schéma Relationnel Majeur, version des données {data_version}).")
+
+    snapshot_path = snapshot_path or default_snapshot_path(db_path)
+    counts = write_snapshot(db_path, snapshot_path)
+    print(f"🗺️ Instantané binaire écrit : {snapshot_path} ({counts['BRND']} marques, {counts['RULE']} règles).")
+
+    rules_path = default_rules_path(db_path)
+    compiled = compile_rules(db_path, rules_path)
+    print(f"⚙️ Règles compilées : {rules_path} ({compiled['identifiers']} identifiants, {compiled['functions']} fonctions de décision).")
 
 if __name__ == "__main__":
     build_database()
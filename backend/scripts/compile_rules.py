@@ -0,0 +1,169 @@
+"""
+Compilation des règles médicales en module Python : pour chaque médicament (CIS) et chaque
+substance, les règles applicables (ciblage famille/substance, filtre de voie, polymédication)
+sont résolues au build puis traduites en une fonction de décision sans boucle ni lecture de
+la base. Les identifiants qui partagent le même ensemble de règles partagent la même fonction.
+
+Le module généré (`backend/data/safepills_rules.py`, à côté de la base) reproduit exactement
+`evaluate_risk` + `RiskCalculator.compute_score` ; il est régénéré par `build_db.py` et
+`update_rules.py`, et chargé par `services/automedication/rule_engine.py`.
+
+Usage :
+    python backend/scripts/compile_rules.py [--db backend/data/safepills.db] [--output ...]
+"""
+import os
+import sys
+import sqlite3
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+
+DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core.cache import caching_disabled
+from backend.core.models import RiskLevel, Rule
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.automedication.risk_calculator import RiskCalculator
+from backend.services.automedication.rule_engine import FORMAT_VERSION, default_rules_path
+
+# Règle effective : (code de question, niveau, conseil, forcée par la polymédication)
+CompiledRule = Tuple[str, int, Optional[str], bool]
+
+
+def effective_rules(rules: List[Rule], route: str) -> Tuple[CompiledRule, ...]:
+    """Règles retenues par `compute_score` pour cette voie, dans l'ordre d'évaluation.
+
+    Comme `evaluate_risk`, une polymédication déclarée répond « oui » à toutes les questions
+    portant le code d'une règle de polymédication, même filtrée par la voie.
+    """
+    forced = {r.question_code for r in rules if r.filter_polymedication or r.question_code == 'Q_POLYMEDICATION'}
+    return tuple(
+        (rule.question_code, rule.risk_level.value, rule.advice, rule.question_code in forced)
+        for rule in rules
+        if not (route and rule.filter_route and rule.filter_route.lower() not in route.lower())
+    )
+
+
+def collect_rule_sets(db_path: str, identifiers: Optional[Iterable[str]] = None) -> Dict[str, Tuple[CompiledRule, ...]]:
+    """Identifiant (CIS ou id de substance) → règles effectives, lues par le repository SQL de référence."""
+    if identifiers is None:
+        conn = sqlite3.connect(db_path)
+        try:
+            identifiers = [row[0] for row in conn.execute("SELECT cis FROM brands ORDER BY cis")]
+            identifiers += [str(row[0]) for row in conn.execute("SELECT id FROM substances ORDER BY id")]
+        finally:
+            conn.close()
+
+    repository = AutomedicationRepository(db_path)
+    rule_sets = {}
+    with caching_disabled():
+        for identifier in identifiers:
+            rules = repository.get_rules_for_brand(identifier)
+            route = repository.get_drug_route(identifier) or "orale"
+            rule_sets[identifier] = effective_rules(rules, route)
+    return rule_sets
+
+
+def generate_function(name: str, rules: Tuple[CompiledRule, ...]) -> str:
+    lines = [f"def {name}(answers, has_other_meds):", "    score = 1", "    details = []", "    context = []"]
+    emitted_advice = set()
+    for code, level, advice, forced in rules:
+        body = [
+            f"context.append({{'question_id': {code!r}, 'question_text': {code!r}, 'answer': 'OUI', "
+            f"'risk_level': {level}, 'triggers_alert': True}})",
+            f"if score < {level}:",
+            f"    score = {level}",
+        ]
+        if advice:
+            if advice in emitted_advice:
+                body += [f"if {advice!r} not in details:", f"    details.append({advice!r})"]
+            else:
+                body.append(f"details.append({advice!r})")
+            emitted_advice.add(advice)
+
+        if code == "GENERAL":
+            lines += ["    " + line for line in body]
+            continue
+        condition = f"answers.get({code!r}, False)"
+        if forced:
+            condition = f"has_other_meds or {condition}"
+        lines.append(f"    if {condition}:")
+        lines += ["        " + line for line in body]
+
+    lines.append("    return EvaluationResponse(score=_LABELS[score], details=details, answered_questions_context=context)")
+    return "\n".join(lines)
+
+
+def generate_module(rule_sets: Dict[str, Tuple[CompiledRule, ...]], data_version: Optional[str]) -> Tuple[str, int]:
+    """Source du module et nombre de fonctions de décision distinctes."""
+    functions: Dict[Tuple[CompiledRule, ...], str] = {}
+    for rules in rule_sets.values():
+        if rules not in functions:
+            functions[rules] = f"_decide_{len(functions)}"
+
+    labels = {level.value: RiskCalculator.score_label(level) for level in RiskLevel}
+    parts = [
+        '"""Module généré par backend/scripts/compile_rules.py : ne pas modifier."""',
+        "from backend.core.schemas import EvaluationResponse",
+        "",
+        f"FORMAT_VERSION = {FORMAT_VERSION}",
+        f"DATA_VERSION = {data_version!r}",
+        f"FUNCTION_COUNT = {len(functions)}",
+        f"_LABELS = {labels!r}",
+    ]
+    for rules, name in functions.items():
+        parts += ["", "", generate_function(name, rules)]
+
+    parts += ["", "", "DECISIONS = {"]
+    parts += [f"    {identifier!r}: {functions[rules]}," for identifier, rules in sorted(rule_sets.items())]
+    parts.append("}")
+    return "\n".join(parts) + "\n", len(functions)
+
+
+def read_data_version(db_path: str) -> Optional[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row else None
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def compile_rules(db_path: str = DB_PATH, output_path: str = None, identifiers: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Génère le module de décision (écriture atomique) et retourne identifiants / fonctions / octets."""
+    output_path = output_path or default_rules_path(db_path)
+    rule_sets = collect_rule_sets(db_path, identifiers)
+    source, function_count = generate_module(rule_sets, read_data_version(db_path))
+    compile(source, output_path, "exec")
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(source)
+    os.replace(tmp_path, output_path)
+    return {"identifiers": len(rule_sets), "functions": function_count, "bytes": len(source.encode("utf-8"))}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compile les règles médicales en module Python")
+    parser.add_argument("--db", default=DB_PATH, help="Base SQLite source")
+    parser.add_argument("--output", default=None, help="Module généré (défaut : à côté de la base)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Base de données introuvable : {args.db}. Veuillez d'abord lancer build_db.py.")
+        return
+    output_path = args.output or default_rules_path(args.db)
+    counts = compile_rules(args.db, output_path)
+    print(f"⚙️ Règles compilées : {output_path} ({counts['identifiers']} identifiants, {counts['functions']} fonctions, {counts['bytes'] // 1024} Ko)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Export de l'index de recherche pour l'autocomplétion côté navigateur.
+Lit `safepills.db` (généré par `build_db.py`) et écrit `public/search-index.json`
+en codage par préfixe (front coding), accompagné de ses variantes précompressées.
+Lancé au build du front (`npm run build`) ; le fichier porte la version des données
+et le navigateur l'écarte si l'API sert une autre version.
+"""
+import os
+import json
+import gzip
+import sqlite3
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+
+DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
+OUTPUT_PATH = os.path.join(ROOT_DIR, 'public', 'search-index.json')
+
+FORMAT_VERSION = 2
+BLOCK_SIZE = 16
+
+# Types d'entrée : 0 = substance, 1 = médicament, 2 = médicament OTC
+TYPE_SUBSTANCE = 0
+TYPE_DRUG = 1
+TYPE_DRUG_OTC = 2
+
+
+def load_entries(db_path):
+    """Retourne les entrées (clé normalisée, type, identifiant, nom affiché) triées par clé."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    entries = []
+
+    cursor.execute("SELECT id, name, name_norm FROM substances")
+    for sub_id, name, name_norm in cursor.fetchall():
+        entries.append((name_norm, TYPE_SUBSTANCE, str(sub_id), name))
+
+    cursor.execute("SELECT cis, name, is_otc, name_norm FROM brands")
+    for cis, name, is_otc, name_norm in cursor.fetchall():
+        entries.append((name_norm, TYPE_DRUG_OTC if is_otc else TYPE_DRUG, cis, name))
+
+    conn.close()
+    entries.sort()
+    return entries
+
+
+def load_data_version(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def front_code(entries, block_size=BLOCK_SIZE):
+    """Code chaque clé par (longueur du préfixe commun avec la précédente, suffixe).
+
+    Le préfixe repart de zéro au début de chaque bloc de `block_size` entrées,
+    ce qui permet au client de décoder un bloc sans relire tout l'index.
+    """
+    coded = []
+    previous = ""
+    for i, (key, entry_type, entry_id, name) in enumerate(entries):
+        if i % block_size == 0:
+            previous = ""
+        shared = 0
+        limit = min(len(previous), len(key))
+        while shared < limit and previous[shared] == key[shared]:
+            shared += 1
+        coded.append([shared, key[shared:], entry_type, entry_id, name])
+        previous = key
+    return coded
+
+
+def write_compressed_variants(output_path, payload):
+    with open(output_path + '.gz', 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+
+    if brotli is None:
+        return
+
+    with open(output_path + '.br', 'wb') as f:
+        f.write(brotli.compress(payload, quality=11))
+
+
+def export_search_index(db_path=DB_PATH, output_path=OUTPUT_PATH, block_size=BLOCK_SIZE):
+    print("🔎 Export de l'index de recherche navigateur...")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Base de données introuvable : {db_path}. Veuillez d'abord lancer build_db.py.")
+        return
+
+    entries = load_entries(db_path)
+    index = {
+        "version": FORMAT_VERSION,
+        "data_version": load_data_version(db_path),
+        "block_size": block_size,
+        "entries": front_code(entries, block_size),
+    }
+    payload = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(payload)
+    write_compressed_variants(output_path, payload)
+    if brotli is None:
+        print("ℹ️ Module 'brotli' absent : variante .br non générée.")
+
+    print(f"✅ {len(entries)} entrées exportées ({len(payload) // 1024} Ko, version des données {index['data_version']}) dans {output_path}")
+    return index
+
+
+if __name__ == "__main__":
+    export_search_index()
@@ -0,0 +1,164 @@
+"""
+Export statique des endpoints en lecture seule, pour un hébergement CDN.
+`GET /api/drugs/{cis}` et `GET /api/automedication/flow/{id}?lang=…` ne dépendent que
+du catalogue et de la langue : chaque réponse est écrite telle que l'API la renvoie
+(mêmes octets JSON), avec ses variantes `.gz` et `.br`, plus un `manifest.json`
+(empreinte et tailles de chaque fichier).
+
+Arborescence :
+    public/static-api/drugs/{cis}.json
+    public/static-api/flow/{lang}/{cis | id substance}.json
+    public/static-api/manifest.json
+
+Usage :
+    python backend/scripts/export_static_api.py [--langs fr es] [--output public/static-api]
+"""
+import os
+import sys
+import json
+import hashlib
+import sqlite3
+import argparse
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+
+DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'public', 'static-api')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.api.flow_endpoint import build_flow
+from backend.scripts.export_search_index import brotli, write_compressed_variants
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.search.repository import DrugRepository
+
+FORMAT_VERSION = 1
+DEFAULT_LANGS = ["fr", "es"]
+
+
+def render(content) -> bytes:
+    """Sérialisation identique à la `JSONResponse` de FastAPI."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def load_identifiers(db_path: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        cis_list = [row[0] for row in conn.execute("SELECT cis FROM brands ORDER BY cis")]
+        substance_ids = [str(row[0]) for row in conn.execute("SELECT id FROM substances ORDER BY id")]
+    finally:
+        conn.close()
+    return cis_list, substance_ids
+
+
+def write_payload(output_dir: str, relative_path: str, payload: bytes) -> dict:
+    """Écrit le fichier et ses variantes s'il a changé, et retourne son entrée de manifeste."""
+    path = os.path.join(output_dir, relative_path)
+    etag = hashlib.sha256(payload).hexdigest()[:32]
+
+    unchanged = False
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            unchanged = f.read() == payload
+    if not unchanged:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(payload)
+        write_compressed_variants(path, payload)
+
+    entry = {"etag": etag, "bytes": len(payload)}
+    for suffix in ("gz", "br"):
+        variant = f"{path}.{suffix}"
+        if os.path.exists(variant):
+            entry[suffix] = os.path.getsize(variant)
+    entry["written"] = not unchanged
+    return entry
+
+
+def prune_stale_files(output_dir: str, keep, langs: List[str]) -> int:
+    """Supprime les réponses (et variantes) d'identifiants disparus du catalogue.
+
+    Seuls les sous-dossiers écrits par l'export (`drugs/`, `flow/{lang}/`) et les fichiers
+    `.json` / `.json.gz` / `.json.br` sont concernés : le dossier de sortie peut être partagé.
+    """
+    removed = 0
+    for subtree in ["drugs"] + [f"flow/{lang}" for lang in langs]:
+        directory = os.path.join(output_dir, subtree)
+        if not os.path.isdir(directory):
+            continue
+        for filename in os.listdir(directory):
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path) or not filename.endswith((".json", ".json.gz", ".json.br")):
+                continue
+            base = f"{subtree}/{filename[:-3] if filename.endswith(('.gz', '.br')) else filename}"
+            if base not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def export_static_api(db_path: str = DB_PATH, output_dir: str = OUTPUT_DIR, langs: Optional[List[str]] = None) -> Optional[dict]:
+    print("📦 Export statique de l'API en lecture seule...")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Base de données introuvable : {db_path}. Veuillez d'abord lancer build_db.py.")
+        return None
+
+    if brotli is None:
+        print("ℹ️ Module 'brotli' absent : variantes .br non générées.")
+
+    langs = langs or DEFAULT_LANGS
+    drugs = DrugRepository(db_path)
+    automedication = AutomedicationRepository(db_path)
+    cis_list, substance_ids = load_identifiers(db_path)
+
+    files: Dict[str, dict] = {}
+    for cis in cis_list:
+        brand = drugs.get_drug_details(cis)
+        if brand:
+            files[f"drugs/{cis}.json"] = write_payload(output_dir, f"drugs/{cis}.json", render(brand.model_dump(mode="json")))
+
+    for lang in langs:
+        for identifier in cis_list + substance_ids:
+            questions = build_flow(automedication, identifier, lang)
+            relative_path = f"flow/{lang}/{identifier}.json"
+            files[relative_path] = write_payload(output_dir, relative_path, render([q.model_dump(mode="json") for q in questions]))
+
+    written = sum(1 for entry in files.values() if entry.pop("written"))
+    removed = prune_stale_files(output_dir, files, langs)
+    digest = hashlib.sha256()
+    for relative_path in sorted(files):
+        digest.update(f"{relative_path}:{files[relative_path]['etag']}\n".encode("utf-8"))
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "content_hash": digest.hexdigest()[:32],
+        "langs": langs,
+        "drugs": len(cis_list),
+        "substances": len(substance_ids),
+        "files": files,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "manifest.json"), 'wb') as f:
+        f.write(json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True).encode("utf-8"))
+
+    total = sum(entry["bytes"] for entry in files.values())
+    print(f"✅ {len(files)} réponses exportées ({written} modifiées, {removed} fichiers obsolètes supprimés, {total // 1024} Ko non compressés) dans {output_dir}")
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export statique des endpoints en lecture seule")
+    parser.add_argument("--db", default=DB_PATH, help="Base SQLite source")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Répertoire de sortie")
+    parser.add_argument("--langs", nargs="+", default=DEFAULT_LANGS)
+    args = parser.parse_args(argv)
+    export_static_api(args.db, args.output, args.langs)
+
+
+if __name__ == "__main__":
+    main()
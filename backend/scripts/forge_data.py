@@ -1,4 +1,5 @@
 import os
+import sys
 import sqlite3
 import json
 import pandas as pd
@@ -14,6 +15,12 @@ OTC_PATH = os.path.join(SCRIPTS_DATA_DIR, 'Liste-OTC.xls')
 CIS_PATH = os.path.join(SCRIPTS_DATA_DIR, 'CIS_bdpm.txt')
 COMPO_PATH = os.path.join(SCRIPTS_DATA_DIR, 'CIS_COMPO_bdpm.txt')
 
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core.normalization import normalize_name
+
 def init_db(cursor):
     cursor.executescript("""
         PRAGMA foreign_keys = OFF;
@@ -84,13 +91,6 @@ def init_db(cursor):
         );
     """)
 
-def normalize_name(name):
-    import unicodedata
-    if not isinstance(name, str):
-        return ""
-    n = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('utf-8')
-    return n.lower().strip()
-
 def load_otc_names():
     otc_names = set()
     try:
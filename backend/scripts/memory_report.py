@@ -0,0 +1,72 @@
+"""
+Coût mémoire par worker : charge l'application, la préchauffe comme au démarrage,
+puis affiche la taille profonde de chaque structure enregistrée (caches, index, tables i18n,
+état du rate limiter...) et, avec `--tracemalloc`, les lignes qui ont le plus alloué.
+
+Usage :
+    python backend/scripts/memory_report.py [--top-cis 200] [--tracemalloc 15] [--json]
+"""
+import os
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core.memory import allocation_tracer, memory_registry, process_memory
+
+
+def _format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "n/a"
+    for unit in ("o", "Ko", "Mo"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} Go"
+
+
+def memory_report(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description="Taille mémoire des structures d'un worker")
+    parser.add_argument("--top-cis", type=int, default=None, help="Médicaments préchauffés (défaut : WARMUP_TOP_CIS)")
+    parser.add_argument("--no-warmup", action="store_true", help="Mesure juste après l'import, sans préchauffage")
+    parser.add_argument("--tracemalloc", type=int, default=0, metavar="N", help="Affiche les N lignes ayant le plus alloué pendant le préchauffage")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args(argv)
+
+    from backend.api.warmup import WarmupState, warm_up
+    before = process_memory()
+    if args.tracemalloc:
+        allocation_tracer.start()
+    if not args.no_warmup:
+        warm_up(WarmupState(), limit=args.top_cis)
+
+    report = {
+        "before": before,
+        "process": process_memory(),
+        "structures": memory_registry.report(),
+        "allocations": allocation_tracer.diff(args.tracemalloc) if args.tracemalloc else [],
+    }
+    allocation_tracer.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=1))
+        return report
+
+    print(f"🧠 RSS : {_format_bytes(before['rss_bytes'])} après import → {_format_bytes(report['process']['rss_bytes'])} après préchauffage")
+    for name, size in sorted(report["structures"].items(), key=lambda item: -item[1]["bytes"]):
+        print(f"   {name:<32} {_format_bytes(size['bytes']):>10}  {size['objects']:>9} objets")
+    if report["allocations"]:
+        print("📈 Allocations du préchauffage :")
+        for stat in report["allocations"]:
+            print(f"   {_format_bytes(stat['size_diff']):>10}  {stat['count_diff']:>7}  {stat['location']}")
+    return report
+
+
+if __name__ == "__main__":
+    memory_report()
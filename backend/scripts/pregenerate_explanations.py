@@ -0,0 +1,213 @@
+"""
+Pré-génération des explications IA pour les combinaisons de réponses les plus fréquentes.
+Les combinaisons (CIS, questions déclenchées, score, langue, profil) sont énumérées
+depuis les règles de `safepills.db`, ou depuis un journal d'évaluations (JSON lines),
+puis générées par un pool de workers à débit limité et enregistrées dans l'`ExplanationStore`.
+
+Usage :
+    python backend/scripts/pregenerate_explanations.py --top 100 --concurrency 4 --rate 2
+    python backend/scripts/pregenerate_explanations.py --from-log evaluations.jsonl --top 500
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.services import ai_service
+from backend.services.automedication.orchestrator import AutomedicationOrchestrator
+from backend.services.explanation_store import ExplanationKey, ExplanationStore, bucket_profile, explanation_key
+
+DEFAULT_PROFILES = [("F", 35), ("M", 35), ("F", 70), ("M", 70)]
+DEFAULT_LANGS = ["fr", "es"]
+
+
+class Job(NamedTuple):
+    key: ExplanationKey
+    explanation_args: dict
+
+
+class RateLimiter:
+    """Espace les départs d'appels d'au moins `1 / rate` seconde, tous workers confondus."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def patterns_from_rules(db_path: str, top: int) -> List[dict]:
+    """Une évaluation par question déclenchable seule (et une sans réponse), médicaments OTC en premier."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT b.cis, GROUP_CONCAT(DISTINCT r.question_code)
+        FROM brands b
+        JOIN brand_substances bs ON bs.brand_id = b.id
+        LEFT JOIN substance_families sf ON sf.substance_id = bs.substance_id
+        JOIN rules r ON r.substance_id = bs.substance_id OR r.family_id = sf.family_id
+        GROUP BY b.id
+        ORDER BY b.is_otc DESC, b.name
+        LIMIT ?
+    """, (top,)).fetchall()
+    conn.close()
+
+    patterns = []
+    for cis, codes in rows:
+        patterns.append({"cis": cis, "answers": {}, "has_other_meds": False})
+        for code in sorted(set(codes.split(","))):
+            if code != "GENERAL":
+                patterns.append({"cis": cis, "answers": {code: True}, "has_other_meds": False})
+    return patterns
+
+
+def patterns_from_log(log_path: str, top: int) -> List[dict]:
+    """Évaluations les plus fréquentes d'un journal JSON lines (`cis`, `answers`, `has_other_meds`, `gender`, `age`, `lang`)."""
+    counts: Counter = Counter()
+    payloads: Dict[str, dict] = {}
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not payload.get("cis"):
+                continue
+            signature = json.dumps(payload, sort_keys=True)
+            counts[signature] += 1
+            payloads[signature] = payload
+    return [payloads[signature] for signature, _ in counts.most_common(top)]
+
+
+def build_jobs(
+    orchestrator: AutomedicationOrchestrator,
+    patterns: Iterable[dict],
+    profiles: List[tuple],
+    langs: List[str],
+    skip: Iterable[ExplanationKey] = ()
+) -> List[Job]:
+    """Une tâche par clé d'explication distincte dont le score n'est pas GREEN, générée pour le profil représentatif de la tranche."""
+    seen = set(skip)
+    jobs = []
+    for pattern in patterns:
+        pattern_profiles = [(pattern["gender"], pattern.get("age"))] if "gender" in pattern else profiles
+        pattern_langs = [pattern["lang"]] if "lang" in pattern else langs
+        for gender, age in pattern_profiles:
+            for lang in pattern_langs:
+                result, explanation_args = orchestrator.prepare(
+                    pattern["cis"], dict(pattern.get("answers", {})), pattern.get("has_other_meds", False), gender, age, lang
+                )
+                if result.score == "GREEN":
+                    continue
+                key = explanation_key(pattern["cis"], result.score, explanation_args["answered_questions"], lang, gender, age)
+                if key in seen:
+                    continue
+                seen.add(key)
+                # Le texte est servi à toute la tranche de profil : génération sans l'âge exact
+                explanation_args["user_profile"] = bucket_profile(explanation_args.get("user_profile", {}))
+                jobs.append(Job(key, explanation_args))
+    return jobs
+
+
+async def run_jobs(jobs: List[Job], store: ExplanationStore, concurrency: int = 4, rate: float = 2.0) -> Dict[str, int]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    limiter = RateLimiter(rate)
+    stats = {"generated": 0, "failed": 0}
+
+    async def worker():
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await limiter.wait()
+            try:
+                text = await ai_service.request_risk_explanation(**job.explanation_args)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"   ⚠️ {job.key.cis} [{job.key.codes or '-'}] {job.key.lang}/{job.key.profile} : {e}")
+                continue
+            store.put(job.key, text, source="ai")
+            stats["generated"] += 1
+            done = stats["generated"] + stats["failed"]
+            if done % 25 == 0:
+                print(f"   {done}/{len(jobs)}...")
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return stats
+
+
+def _parse_profiles(items: List[str]) -> List[tuple]:
+    profiles = []
+    for item in items:
+        gender, _, age = item.partition(":")
+        profiles.append((gender or None, int(age) if age else None))
+    return profiles
+
+
+def pregenerate_explanations(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pré-génération des explications IA")
+    parser.add_argument("--store", help="Base des explications (défaut : EXPLANATION_DB_PATH)")
+    parser.add_argument("--from-log", help="Journal d'évaluations JSON lines (à défaut : énumération depuis les règles)")
+    parser.add_argument("--top", type=int, default=100, help="Nombre de médicaments (règles) ou de combinaisons (journal)")
+    parser.add_argument("--profiles", nargs="+", default=[f"{g}:{a}" for g, a in DEFAULT_PROFILES], help="Profils sexe:âge")
+    parser.add_argument("--langs", nargs="+", default=DEFAULT_LANGS)
+    parser.add_argument("--concurrency", type=int, default=4, help="Workers simultanés")
+    parser.add_argument("--rate", type=float, default=2.0, help="Appels Gemini par seconde (0 = illimité)")
+    parser.add_argument("--force", action="store_true", help="Régénérer les explications déjà présentes")
+    parser.add_argument("--dry-run", action="store_true", help="Compter les combinaisons sans appeler Gemini")
+    args = parser.parse_args(argv)
+
+    print("🧠 Pré-génération des explications...")
+
+    if not os.path.exists(DB_PATH):
+        print(f"❌ Base de données introuvable : {DB_PATH}. Veuillez d'abord lancer build_db.py.")
+        return
+
+    store = ExplanationStore(args.store)
+    store.init_schema()
+    orchestrator = AutomedicationOrchestrator(store=store)
+
+    patterns = patterns_from_log(args.from_log, args.top) if args.from_log else patterns_from_rules(DB_PATH, args.top)
+    skip = [] if args.force else store.existing_keys()
+    jobs = build_jobs(orchestrator, patterns, _parse_profiles(args.profiles), args.langs, skip)
+    print(f"📋 {len(patterns)} combinaisons de réponses → {len(jobs)} explications à générer")
+
+    if args.dry_run or not jobs:
+        return
+
+    if not ai_service.client:
+        print("❌ Client Gemini non configuré (API_KEY manquante).")
+        return
+
+    stats = asyncio.run(run_jobs(jobs, store, args.concurrency, args.rate))
+    print(f"✅ {stats['generated']} explications enregistrées dans {store.db_path} ({stats['failed']} échecs)")
+
+
+if __name__ == "__main__":
+    pregenerate_explanations()
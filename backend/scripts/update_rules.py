@@ -1,4 +1,5 @@
 import os
+import sys
 import sqlite3
 import json
 
@@ -7,14 +8,15 @@ DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
 DB_PATH = os.path.join(DATA_DIR, 'safepills.db')
 MED_KNOWLEDGE_PATH = os.path.join(DATA_DIR, 'medical_knowledge.json')
 
-def normalize_name(name):
-    import unicodedata
-    if not isinstance(name, str):
-        return ""
-    n = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('utf-8')
-    n = n.lower().strip()
-    n = n.replace('-', '')
-    return n
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.core.normalization import normalize_name
+from backend.core.snapshot import default_snapshot_path, write_snapshot
+from backend.scripts.build_db import import_interactions, stamp_data_version
+from backend.scripts.compile_rules import compile_rules
+from backend.services.automedication.rule_engine import default_rules_path
 
 def update_rules():
     print("🚀 Début de la mise à jour des Règles Médicales (Medical Knowledge)...")
@@ -30,11 +32,18 @@ def update_rules():
         print(f"❌ Erreur lecture de medical_knowledge.json : {e}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    # Mise à jour sur une copie : l'instantané et le module compilé sont écrits avant que la
+    # nouvelle version des données ne soit publiée (remplacement atomique de la base)
+    staging_path = f"{DB_PATH}.staging"
+    source = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(staging_path)
+    source.backup(conn)
+    source.close()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM rules;")
     cursor.execute("DELETE FROM sqlite_sequence WHERE name='rules';")
+    cursor.execute("DELETE FROM family_interactions;")
     
     cursor.execute("SELECT id, name FROM families")
     family_rows = cursor.fetchall()
@@ -85,11 +94,27 @@ def update_rules():
                 rule.get('age_min')
             ))
             rules_inserted += 1
+
+    interactions_inserted = import_interactions(cursor, med_knowledge, family_ids)
+    data_version = stamp_data_version(cursor)
         
     conn.commit()
     conn.close()
     
     print(f"✅ {rules_inserted} règles mises à jour avec succès dans SafePills.")
+    print(f"✅ {interactions_inserted} interactions entre familles mises à jour.")
+    print(f"🏷️ Version des données : {data_version}")
+
+    snapshot_path = default_snapshot_path(DB_PATH)
+    write_snapshot(staging_path, snapshot_path)
+    print(f"🗺️ Instantané binaire régénéré : {snapshot_path}")
+
+    rules_path = default_rules_path(DB_PATH)
+    compiled = compile_rules(staging_path, rules_path)
+    print(f"⚙️ Règles recompilées : {rules_path} ({compiled['functions']} fonctions de décision)")
+
+    os.replace(staging_path, DB_PATH)
+    print(f"📦 Base publiée : {DB_PATH}")
 
 if __name__ == "__main__":
     update_rules()
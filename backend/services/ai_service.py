@@ -1,12 +1,16 @@
 import os
 import json
+import time
 import logging
 from typing import List, Dict
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+from backend.core.config import settings
 from backend.core.i18n import i18n
+from backend.core.metrics import registry, ai_request_seconds, ai_queue_wait_seconds, ai_errors, classify_ai_error
+from backend.core.resilience import CircuitBreaker, Dispatcher, call_with_resilience
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,34 @@ if GOOGLE_API_KEY:
     except Exception as e:
         logger.error(f"Erreur configuration Gemini: {e}")
 
+ai_circuit = CircuitBreaker(settings.AI_CIRCUIT_FAILURE_THRESHOLD, settings.AI_CIRCUIT_RESET_SECONDS)
+
+registry.callback(
+    "safepills_ai_circuit_open", "Disjoncteur Gemini ouvert (1) ou fermé (0)", (),
+    lambda: {(): 1.0 if ai_circuit.state == CircuitBreaker.OPEN else 0.0},
+)
+
+ai_dispatcher = Dispatcher(settings.AI_MAX_CONCURRENCY, settings.AI_MAX_QUEUE)
+
+# Classe d'âge des profils représentatifs (pré-génération) : pas d'âge exact dans le prompt
+AGE_BAND_TEXT = {
+    "fr": {"minor": "moins de 18 ans", "adult": "entre 18 et 64 ans", "senior": "65 ans ou plus", "unknown": "âge non précisé"},
+    "es": {"minor": "menos de 18 años", "adult": "entre 18 y 64 años", "senior": "65 años o más", "unknown": "edad no especificada"},
+}
+
+registry.callback(
+    "safepills_ai_queue_depth", "Appels Gemini en attente par langue", ("lang",),
+    lambda: {(lang,): depth for lang, depth in ai_dispatcher.depth_by_key().items()},
+)
+registry.callback(
+    "safepills_ai_in_flight", "Appels Gemini en cours", (),
+    lambda: {(): ai_dispatcher.in_flight},
+)
+registry.callback(
+    "safepills_ai_queue_rejections_total", "Appels Gemini rejetés (file pleine)", (),
+    lambda: {(): ai_dispatcher.rejections}, metric_type="counter",
+)
+
 async def generate_risk_explanation(
     drug_name: str,
     score: str,
@@ -38,51 +70,83 @@ async def generate_risk_explanation(
         return "Service d'assistance virtuelle indisponible pour le moment." if lang == "fr" else "Servicio de asistencia virtual no disponible por el momento."
 
     try:
-        if lang == "es":
-            gender = user_profile.get('gender')
-            if gender == 'F':
-                gender_text = "una mujer"
-            elif gender == 'M':
-                gender_text = "un hombre"
-            else:
-                gender_text = "una persona"
-                
+        return await request_risk_explanation(drug_name, score, details, user_profile, answered_questions, lang)
+
+    except Exception as e:
+        error_class = classify_ai_error(e)
+        ai_errors.inc(error_class=error_class)
+        if error_class in ("429", "503", "timeout", "circuit_open", "queue_full"):
+            logger.warning(f"Quota ou surcharge IA: {e}")
+            return "Le service d'analyse par IA est temporairement surchargé. Veuillez réessayer dans quelques instants." if lang == "fr" else "El servicio de análisis por IA está temporalmente sobrecargado. Por favor, inténtelo de nuevo en unos momentos."
+        
+        logger.error(f"Erreur génération IA: {e}", exc_info=True)
+        return "Désolé, je n'ai pas pu générer d'explication personnalisée pour le moment." if lang == "fr" else "Lo siento, no pude generar una explicación personalizada en este momento."
+
+
+async def request_risk_explanation(
+    drug_name: str,
+    score: str,
+    details: List[str],
+    user_profile: dict,
+    answered_questions: List[dict],
+    lang: str = "fr"
+) -> str:
+    """Appel Gemini sans repli : lève l'exception en cas d'échec (utilisé par la pré-génération)."""
+    if lang == "es":
+        gender = user_profile.get('gender')
+        if gender == 'F':
+            gender_text = "una mujer"
+        elif gender == 'M':
+            gender_text = "un hombre"
+        else:
+            gender_text = "una persona"
+            
+        if "age_band" in user_profile:
+            age_text = AGE_BAND_TEXT["es"][user_profile["age_band"]]
+            patient_context = f"El paciente es {gender_text} ({age_text}).\n"
+            patient_context += "Este texto se dirige a todos los pacientes de este grupo de edad: no menciones ninguna edad precisa.\n"
+        else:
             age_text = f"{user_profile.get('age', '?')} años"
             patient_context = f"El paciente es {gender_text} de {age_text}.\n"
+        
+        if answered_questions:
+            patient_context += "\nRespuestas del paciente que activan alertas:\n"
+            for q in answered_questions:
+                risk_emoji = "🔴" if q['risk_level'] == 'RED' else "🟠"
+                patient_context += f"{risk_emoji} {q['question_text']} → {q['answer']}\n"
+    else:
+        gender = user_profile.get('gender')
+        if gender == 'F':
+            gender_text = "une femme"
+        elif gender == 'M':
+            gender_text = "un homme"
+        else:
+            gender_text = "une personne"
             
-            if answered_questions:
-                patient_context += "\nRespuestas del paciente que activan alertas:\n"
-                for q in answered_questions:
-                    risk_emoji = "🔴" if q['risk_level'] == 'RED' else "🟠"
-                    patient_context += f"{risk_emoji} {q['question_text']} → {q['answer']}\n"
+        if "age_band" in user_profile:
+            age_text = AGE_BAND_TEXT["fr"][user_profile["age_band"]]
+            patient_context = f"Le patient est {gender_text} ({age_text}).\n"
+            patient_context += "Ce texte s'adresse à tous les patients de cette tranche d'âge : ne mentionne aucun âge précis.\n"
         else:
-            gender = user_profile.get('gender')
-            if gender == 'F':
-                gender_text = "une femme"
-            elif gender == 'M':
-                gender_text = "un homme"
-            else:
-                gender_text = "une personne"
-                
             age_text = f"{user_profile.get('age', '?')} ans"
             patient_context = f"Le patient est {gender_text} de {age_text}.\n"
-            
-            if answered_questions:
-                patient_context += "\nRéponses du patient qui déclenchent des alertes :\n"
-                for q in answered_questions:
-                    risk_emoji = "🔴" if q['risk_level'] == 'RED' else "🟠"
-                    patient_context += f"{risk_emoji} {q['question_text']} → {q['answer']}\n"
-
-        substance_names = user_profile.get('substances', [])
-        triggered_ids = [q['question_id'] for q in answered_questions if q.get('question_id')]
-        
-        validated_advice = "\n".join([f"- {d}" for d in details]) if details else ""
         
-        logger.debug(f"RAG — Substances: {substance_names}")
-        logger.debug(f"RAG — Conseils transmis: {len(details)} lignes")
-
-        if lang == "es":
-            system_instruction = """Eres un farmacéutico experimentado, amable y pedagógico.
+        if answered_questions:
+            patient_context += "\nRéponses du patient qui déclenchent des alertes :\n"
+            for q in answered_questions:
+                risk_emoji = "🔴" if q['risk_level'] == 'RED' else "🟠"
+                patient_context += f"{risk_emoji} {q['question_text']} → {q['answer']}\n"
+
+    substance_names = user_profile.get('substances', [])
+    triggered_ids = [q['question_id'] for q in answered_questions if q.get('question_id')]
+    
+    validated_advice = "\n".join([f"- {d}" for d in details]) if details else ""
+    
+    logger.debug(f"RAG — Substances: {substance_names}")
+    logger.debug(f"RAG — Conseils transmis: {len(details)} lignes")
+
+    if lang == "es":
+        system_instruction = """Eres un farmacéutico experimentado, amable y pedagógico.
 Tu paciente te pide consejo para tomar un medicamento en automedicación.
 
 REGLAS STRICTAS:
@@ -98,27 +162,27 @@ REGLAS STRICTAS:
 - RESPONDE EN ESPAÑOL
 - Máximo 5 frases cortas y claras"""
 
-            user_prompt = f"""
+        user_prompt = f"""
 CONTEXTO PACIENTE:
 {patient_context}
 
 MEDICAMENTO SOLICITADO: {drug_name}
 NIVEL DE RIESGO DETECTADO: {score}
 """
-            if validated_advice:
-                user_prompt += f"""
+        if validated_advice:
+            user_prompt += f"""
 ELEMENTOS DE CONSEJO VALIDADOS A UTILIZAR:
 {validated_advice}
 
 Reformule estos elementos en una explicación personalizada para este paciente, teniendo en cuenta su perfil y respuestas.
 """
-            else:
-                user_prompt += """
+        else:
+            user_prompt += """
 Explique por qué no es recomendado en su situación, manteniéndose factual y amable.
 """
 
-        else:
-            system_instruction = """Tu es un pharmacien expérimenté, bienveillant et pédagogique.
+    else:
+        system_instruction = """Tu es un pharmacien expérimenté, bienveillant et pédagogique.
 Ton patient te demande conseil pour prendre un médicament en automedicación.
 
 RÈGLES STRICTES :
@@ -133,41 +197,51 @@ RÈGLES STRICTES :
 - Sois rassurant mais ferme sur les contre-indications
 - Maximum 5 phrases courtes et claires"""
 
-            user_prompt = f"""
+        user_prompt = f"""
 CONTEXTE PATIENT :
 {patient_context}
 
 MÉDICAMENT DEMANDÉ : {drug_name}
 NIVEAU DE RISQUE DÉTECTÉ : {score}
 """
-            if validated_advice:
-                user_prompt += f"""
+        if validated_advice:
+            user_prompt += f"""
 ÉLÉMENTS DE CONSEIL VALIDÉS À UTILISER :
 {validated_advice}
 
 Reformule ces éléments en une explication personnalisée pour ce patient, en tenant compte de son profil et de ses réponses.
 """
-            else:
-                user_prompt += """
+        else:
+            user_prompt += """
 Explique-lui pourquoi ce n'est pas recommandé dans sa situation, en restant factuel et bienveillant.
 """
-        
-        response = await client.aio.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=user_prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                temperature=0.2
-            )
-        )
-        
-        return response.text
+    
+    queued = time.perf_counter()
+    async with ai_dispatcher.slot(lang):
+        ai_queue_wait_seconds.observe(time.perf_counter() - queued, lang=lang)
+        response = await _call_gemini(user_prompt, system_instruction)
 
-    except Exception as e:
-        error_msg = str(e)
-        if "429" in error_msg or "503" in error_msg:
-            logger.warning(f"Quota ou surcharge IA: {e}")
-            return "Le service d'analyse par IA est temporairement surchargé. Veuillez réessayer dans quelques instants." if lang == "fr" else "El servicio de análisis por IA está temporalmente sobrecargado. Por favor, inténtelo de nuevo en unos momentos."
-        
-        logger.error(f"Erreur génération IA: {e}", exc_info=True)
-        return "Désolé, je n'ai pas pu générer d'explication personnalisée pour le moment." if lang == "fr" else "Lo siento, no pude generar una explicación personalizada en este momento."
+    return response.text
+
+
+async def _call_gemini(user_prompt: str, system_instruction: str):
+    start = time.perf_counter()
+    try:
+        response = await call_with_resilience(
+            lambda: client.aio.models.generate_content(
+                model='gemini-2.5-flash',
+                contents=user_prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=system_instruction,
+                    temperature=0.2
+                )
+            ),
+            timeout=settings.AI_TIMEOUT_SECONDS,
+            breaker=ai_circuit,
+            hedge_after=settings.AI_HEDGE_AFTER_SECONDS,
+        )
+    except Exception:
+        ai_request_seconds.observe(time.perf_counter() - start, outcome="error")
+        raise
+    ai_request_seconds.observe(time.perf_counter() - start, outcome="success")
+    return response
@@ -4,6 +4,9 @@ from backend.core.models import Rule, RiskLevel
 from backend.core.schemas import EvaluationResponse
 from .risk_calculator import RiskCalculator
 from .db_repository import AutomedicationRepository
+from .rule_engine import evaluate_compiled
+from backend.core.timing import phase
+from backend.services.search import get_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -25,15 +28,24 @@ def evaluate_risk(
                 answered_questions_context=[]
             )
             
-        rules = _repository.get_rules_for_brand(identifier)
-        route = _repository.get_drug_route(identifier) or "orale"
+        # Moteur compilé : ni lecture de la base ni interprétation des règles
+        with phase("scoring"):
+            result = evaluate_compiled(identifier, answers, has_other_meds, get_data_version())
+        if result is not None:
+            return result
+
+        with phase("rules"):
+            rules = _repository.get_rules_for_brand(identifier)
+        with phase("route"):
+            route = _repository.get_drug_route(identifier) or "orale"
         
         if has_other_meds:
             for r in rules:
                 if r.filter_polymedication or r.question_code == 'Q_POLYMEDICATION':
                     answers[r.question_code] = True
         
-        result = RiskCalculator.compute_score(rules, answers, route=route)
+        with phase("scoring"):
+            result = RiskCalculator.compute_score(rules, answers, route=route)
         
         return result
         
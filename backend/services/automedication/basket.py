@@ -0,0 +1,156 @@
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.core.i18n import i18n
+from backend.core.models import Brand, FamilyInteraction, RiskLevel
+from backend.core.schemas import BasketDuplicate, BasketInteraction, BasketResponse
+from backend.core.timing import phase
+from backend.services.search import get_data_version
+from .db_repository import AutomedicationRepository
+from .risk_calculator import RiskCalculator
+
+logger = logging.getLogger(__name__)
+
+MAX_BASKET_SIZE = 10
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class InteractionMatrix:
+    """Interactions entre familles compilées en masques de bits.
+
+    `masks[f]` a le bit `g` à 1 si l'association des familles `f` et `g` est à risque
+    (les identifiants de famille servent directement de positions de bit). Tester un
+    médicament contre tout le panier revient à un ET binaire par famille.
+    """
+
+    def __init__(self, interactions: List[FamilyInteraction]):
+        self.masks: Dict[int, int] = {}
+        self._details: Dict[Tuple[int, int], FamilyInteraction] = {}
+        for interaction in interactions:
+            a, b = interaction.family_a, interaction.family_b
+            self.masks[a] = self.masks.get(a, 0) | (1 << b)
+            self.masks[b] = self.masks.get(b, 0) | (1 << a)
+            self._details[(min(a, b), max(a, b))] = interaction
+
+    def conflicts(self, family_id: int, families_mask: int) -> int:
+        return self.masks.get(family_id, 0) & families_mask
+
+    def get(self, family_a: int, family_b: int) -> Optional[FamilyInteraction]:
+        return self._details.get((min(family_a, family_b), max(family_a, family_b)))
+
+
+def family_mask(brand: Brand) -> int:
+    mask = 0
+    for compo in brand.composition:
+        for family in compo.substance.families:
+            mask |= 1 << family.id
+    return mask
+
+
+class BasketChecker:
+    """Vérifie un panier de plusieurs médicaments : substances en double et familles incompatibles.
+
+    La matrice d'interactions est chargée depuis `family_interactions` et rechargée
+    quand la version des données change (`update_rules.py`).
+    """
+
+    def __init__(self, repository: AutomedicationRepository = None, version_provider: Callable[[], Optional[str]] = None):
+        self._repository = repository or AutomedicationRepository()
+        self._version_provider = version_provider or get_data_version
+        self._matrix: Optional[InteractionMatrix] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def matrix(self) -> InteractionMatrix:
+        version = self._version_provider()
+        matrix = self._matrix
+        if matrix is None or self._version != version:
+            with self._lock:
+                if self._matrix is None or self._version != version:
+                    self._matrix = InteractionMatrix(self._repository.get_family_interactions())
+                    self._version = version
+                    if not self._matrix.masks:
+                        logger.warning("Aucune interaction entre familles en base : le panier ne signale que les doublons de substance")
+                matrix = self._matrix
+        return matrix
+
+    @property
+    def current_matrix(self) -> Optional[InteractionMatrix]:
+        """Matrice déjà chargée, sans chargement ni contrôle de version."""
+        return self._matrix
+
+    def check(self, cis_list: List[str], lang: str = "fr") -> BasketResponse:
+        cis_list = list(dict.fromkeys(cis_list))
+        with phase("composition"):
+            brands = self._repository.get_brands_composition(cis_list)
+        found = {brand.cis for brand in brands}
+        matrix = self.matrix
+
+        with phase("interactions"):
+            duplicates = self._find_duplicates(brands, lang)
+            interactions = self._find_interactions(brands, matrix)
+
+        score = RiskLevel.LEVEL_4 if duplicates else RiskLevel.LEVEL_1
+        for interaction in interactions:
+            if interaction.risk_level > score:
+                score = RiskLevel(interaction.risk_level)
+
+        return BasketResponse(
+            score=RiskCalculator.score_label(score),
+            duplicates=duplicates,
+            interactions=interactions,
+            unknown_cis=[cis for cis in cis_list if cis not in found],
+            has_interaction_coverage=bool(matrix.masks)
+        )
+
+    def _find_duplicates(self, brands: List[Brand], lang: str) -> List[BasketDuplicate]:
+        by_substance: Dict[int, List[str]] = {}
+        names: Dict[int, str] = {}
+        for brand in brands:
+            for compo in brand.composition:
+                holders = by_substance.setdefault(compo.substance.id, [])
+                if brand.cis not in holders:
+                    holders.append(brand.cis)
+                names[compo.substance.id] = compo.substance.name
+
+        template = i18n.get("basket_duplicate_substance", lang, "risks") or "{substance}"
+        return [
+            BasketDuplicate(substance=names[substance_id], cis=holders, advice=template.format(substance=names[substance_id]))
+            for substance_id, holders in by_substance.items()
+            if len(holders) > 1
+        ]
+
+    @staticmethod
+    def _find_interactions(brands: List[Brand], matrix: InteractionMatrix) -> List[BasketInteraction]:
+        """Une alerte par couple de médicaments : l'interaction de famille la plus grave."""
+        holders: Dict[int, List[int]] = {}
+        seen_mask = 0
+        found: Dict[Tuple[int, int], BasketInteraction] = {}
+
+        for index, brand in enumerate(brands):
+            mask = family_mask(brand)
+            for family_id in _bits(mask):
+                for other_family in _bits(matrix.conflicts(family_id, seen_mask)):
+                    interaction = matrix.get(family_id, other_family)
+                    for previous in holders[other_family]:
+                        current = found.get((previous, index))
+                        if current is None or interaction.risk_level > current.risk_level:
+                            found[(previous, index)] = BasketInteraction(
+                                cis=[brands[previous].cis, brand.cis],
+                                families=[interaction.family_a_name, interaction.family_b_name],
+                                risk_level=interaction.risk_level.value,
+                                advice=interaction.advice
+                            )
+            for family_id in _bits(mask):
+                holders.setdefault(family_id, []).append(index)
+            seen_mask |= mask
+
+        return sorted(found.values(), key=lambda interaction: -interaction.risk_level)
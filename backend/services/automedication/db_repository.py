@@ -1,21 +1,30 @@
-import sqlite3
 import logging
-from typing import List, Optional
-from backend.core.models import Rule, RiskLevel
+from typing import Dict, List, Optional
+from backend.core.models import Brand, BrandSubstance, Family, FamilyInteraction, Rule, RiskLevel, Substance
 from backend.core.config import settings
+from backend.core.cache import cached
+from backend.core.db import connect
+from backend.core.metrics import db_query_seconds
+from backend.core.snapshot import CatalogSnapshot, get_snapshot
 
 logger = logging.getLogger(__name__)
 
 
 class AutomedicationRepository:
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, snapshot: CatalogSnapshot = None):
         self.db_path = db_path or settings.DB_PATH
+        self._own_snapshot = snapshot
+        # L'instantané partagé ne décrit que la base par défaut
+        self._use_shared_snapshot = snapshot is None and not db_path
+
+    @property
+    def _snapshot(self) -> Optional[CatalogSnapshot]:
+        # Résolu à chaque appel : une mise à jour des règles à chaud remplace l'instantané partagé
+        return get_snapshot() if self._use_shared_snapshot else self._own_snapshot
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return connect(self.db_path, read_only=True)
     
     def _map_row_to_rule(self, row) -> Rule:
         try:
@@ -36,6 +45,7 @@ class AutomedicationRepository:
             age_min=row['age_min']
         )
 
+    @db_query_seconds.time_calls(repository="automedication", method="get_rules_by_codes")
     def get_rules_by_codes(self, question_codes: List[str]) -> List[Rule]:
         if not question_codes:
             return []
@@ -56,7 +66,11 @@ class AutomedicationRepository:
             logger.error(f"Erreur get_rules_by_codes: {e}", exc_info=True)
             return []
     
+    @cached("rules")
+    @db_query_seconds.time_calls(repository="automedication", method="get_rules_for_brand")
     def get_rules_for_brand(self, identifier: str) -> List[Rule]:
+        if self._snapshot and len(identifier) == 8 and identifier.isdigit():
+            return self._snapshot.rules_for_brand(identifier)
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -97,6 +111,7 @@ class AutomedicationRepository:
                         (substance_id IN ({sub_ph}))
                         OR 
                         (family_id IN ({fam_ph}))
+                    ORDER BY id
                 """
                 
                 sub_ph = placeholders
@@ -117,10 +132,14 @@ class AutomedicationRepository:
             logger.error(f"Erreur get_rules_for_brand: {e}", exc_info=True)
             return []
             
+    @db_query_seconds.time_calls(repository="automedication", method="get_drug_route")
     def get_drug_route(self, identifier: str) -> Optional[str]:
         try:
             if len(identifier) < 8:
                 return None 
+
+            if self._snapshot:
+                return self._snapshot.route(identifier)
                 
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -133,3 +152,94 @@ class AutomedicationRepository:
         except Exception as e:
             logger.error(f"Erreur get_drug_route: {e}", exc_info=True)
             return None
+
+    @db_query_seconds.time_calls(repository="automedication", method="get_family_interactions")
+    def get_family_interactions(self) -> List[FamilyInteraction]:
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT fi.family_a, fi.family_b, fa.name AS family_a_name, fb.name AS family_b_name,
+                           fi.risk_level, fi.advice
+                    FROM family_interactions fi
+                    JOIN families fa ON fa.id = fi.family_a
+                    JOIN families fb ON fb.id = fi.family_b
+                """)
+                rows = cursor.fetchall()
+
+                interactions = []
+                for row in rows:
+                    try:
+                        risk_enum = RiskLevel(row['risk_level'])
+                    except ValueError:
+                        risk_enum = RiskLevel.LEVEL_1
+                    interactions.append(FamilyInteraction(
+                        family_a=row['family_a'],
+                        family_b=row['family_b'],
+                        family_a_name=row['family_a_name'],
+                        family_b_name=row['family_b_name'],
+                        risk_level=risk_enum,
+                        advice=row['advice']
+                    ))
+                return interactions
+
+        except Exception as e:
+            logger.error(f"Erreur get_family_interactions: {e}", exc_info=True)
+            return []
+
+    @db_query_seconds.time_calls(repository="automedication", method="get_brands_composition")
+    def get_brands_composition(self, cis_list: List[str]) -> List[Brand]:
+        """Marques avec substances et familles, en une requête, dans l'ordre de `cis_list`."""
+        if not cis_list:
+            return []
+        if self._snapshot:
+            return self._snapshot.brands(cis_list)
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+
+                placeholders = ','.join('?' * len(cis_list))
+                cursor.execute(f"""
+                    SELECT b.id AS brand_id, b.cis, b.name AS brand_name, b.administration_route, b.is_otc,
+                           bs.dosage, s.id AS substance_id, s.name AS substance_name,
+                           f.id AS family_id, f.name AS family_name
+                    FROM brands b
+                    LEFT JOIN brand_substances bs ON bs.brand_id = b.id
+                    LEFT JOIN substances s ON s.id = bs.substance_id
+                    LEFT JOIN substance_families sf ON sf.substance_id = s.id
+                    LEFT JOIN families f ON f.id = sf.family_id
+                    WHERE b.cis IN ({placeholders})
+                    ORDER BY b.id, bs.id, f.id
+                """, cis_list)
+                rows = cursor.fetchall()
+
+            brands: Dict[str, Brand] = {}
+            substances: Dict[tuple, Substance] = {}
+            for row in rows:
+                brand = brands.get(row['cis'])
+                if brand is None:
+                    brand = Brand(
+                        id=row['brand_id'],
+                        cis=row['cis'],
+                        name=row['brand_name'],
+                        administration_route=row['administration_route'],
+                        is_otc=bool(row['is_otc'])
+                    )
+                    brands[row['cis']] = brand
+
+                if row['substance_id'] is None:
+                    continue
+                substance = substances.get((row['cis'], row['substance_id']))
+                if substance is None:
+                    substance = Substance(id=row['substance_id'], name=row['substance_name'])
+                    substances[(row['cis'], row['substance_id'])] = substance
+                    brand.composition.append(BrandSubstance(substance=substance, dosage=row['dosage']))
+                if row['family_id'] is not None:
+                    substance.families.append(Family(id=row['family_id'], name=row['family_name']))
+
+            return [brands[cis] for cis in cis_list if cis in brands]
+
+        except Exception as e:
+            logger.error(f"Erreur get_brands_composition: {e}", exc_info=True)
+            return []
@@ -1,19 +1,30 @@
+import random
+import asyncio
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from backend.core.schemas import EvaluationResponse
 from backend.services.automedication import evaluate_risk
 from backend.services.automedication.db_repository import AutomedicationRepository
 from backend.services.search import get_drug_details
+from backend.services import ai_service
 from backend.services.ai_service import generate_risk_explanation
+from backend.services.template_explainer import generate_template_explanation
+from backend.services.explanation_store import ExplanationStore, explanation_key
+from backend.core.config import settings
+from backend.core.load_shedding import load_shedder
+from backend.core.metrics import explanations
+from backend.core.resilience import CircuitBreaker, remaining_time
+from backend.core.timing import phase
 
 logger = logging.getLogger(__name__)
 
 
 class AutomedicationOrchestrator:
 
-    def __init__(self, repository: AutomedicationRepository = None):
+    def __init__(self, repository: AutomedicationRepository = None, store: ExplanationStore = None):
         self._repository = repository or AutomedicationRepository()
+        self._store = store or ExplanationStore()
 
     async def evaluate(
         self,
@@ -24,6 +35,42 @@ class AutomedicationOrchestrator:
         age: Optional[int],
         lang: str = "fr"
     ) -> EvaluationResponse:
+        # Lectures SQLite (score, médicament, couverture, explications stockées) hors de la boucle d'événements
+        result, explanation_args = await asyncio.to_thread(self.prepare, cis, answers, has_other_meds, gender, age, lang)
+
+        if result.score != "GREEN":
+            stored = None
+            if cis:
+                key = explanation_key(cis, result.score, explanation_args["answered_questions"], lang, gender, age)
+                with phase("store"):
+                    stored = await asyncio.to_thread(self._store.get, key)
+
+            template_reason = None if stored else self._template_reason()
+            if stored:
+                explanation = stored
+                explanations.inc(source="store", reason="")
+            elif template_reason:
+                with phase("template"):
+                    explanation = generate_template_explanation(**explanation_args)
+                explanations.inc(source="template", reason=template_reason)
+            else:
+                with phase("ai"):
+                    explanation = await generate_risk_explanation(**explanation_args)
+                explanations.inc(source="ai", reason="")
+            result.ai_explanation = explanation
+
+        return result
+
+    def prepare(
+        self,
+        cis: Optional[str],
+        answers: Dict[str, bool],
+        has_other_meds: bool,
+        gender: Optional[str],
+        age: Optional[int],
+        lang: str = "fr"
+    ) -> Tuple[EvaluationResponse, dict]:
+        """Score, informations médicament et couverture, plus les arguments de l'explication."""
         result = evaluate_risk(
             answers=answers,
             identifier=cis,
@@ -31,7 +78,8 @@ class AutomedicationOrchestrator:
             lang=lang
         )
 
-        drug_name, substance_names, is_otc = self._get_drug_info(cis, lang)
+        with phase("drug_info"):
+            drug_name, substance_names, is_otc = self._get_drug_info(cis, lang)
 
         result.general_advice = []
 
@@ -41,28 +89,44 @@ class AutomedicationOrchestrator:
                 result.details.insert(0, warning_msg)
 
         if cis:
-            rules = self._repository.get_rules_for_brand(cis)
+            with phase("coverage"):
+                rules = self._repository.get_rules_for_brand(cis)
             result.has_coverage = len(rules) > 0
         else:
             result.has_coverage = False
 
-        if result.score != "GREEN":
-            explanation = await generate_risk_explanation(
-                drug_name=drug_name,
-                score=result.score,
-                details=result.details,
-                user_profile={
-                    "gender": gender,
-                    "age": age,
-                    "has_other_meds": has_other_meds,
-                    "substances": substance_names
-                },
-                answered_questions=result.answered_questions_context or [],
-                lang=lang
-            )
-            result.ai_explanation = explanation
+        explanation_args = dict(
+            drug_name=drug_name,
+            score=result.score,
+            details=result.details,
+            user_profile={
+                "gender": gender,
+                "age": age,
+                "has_other_meds": has_other_meds,
+                "substances": substance_names
+            },
+            answered_questions=result.answered_questions_context or [],
+            lang=lang
+        )
+        return result, explanation_args
 
-        return result
+    @staticmethod
+    def _template_reason() -> Optional[str]:
+        """Motif d'utiliser l'explication locale plutôt que Gemini, `None` pour appeler l'IA."""
+        if ai_service.client is None:
+            return "ai_disabled"
+        if ai_service.ai_circuit.state == CircuitBreaker.OPEN:
+            return "circuit_open"
+        if ai_service.ai_dispatcher.is_saturated():
+            return "queue_full"
+        if load_shedder.skip_ai():
+            return "overload"
+        remaining = remaining_time()
+        if remaining is not None and remaining < settings.AI_MIN_BUDGET_SECONDS:
+            return "low_budget"
+        if settings.AI_TEMPLATE_RATIO > 0 and random.random() < settings.AI_TEMPLATE_RATIO:
+            return "traffic_ratio"
+        return None
 
     def _get_drug_info(self, cis: Optional[str], lang: str) -> tuple:
         drug_name = "ce médicament" if lang == "fr" else "este medicamento"
@@ -1,11 +1,23 @@
 from typing import Dict, List
 from backend.core.models import Rule, RiskLevel
 from backend.core.schemas import EvaluationResponse
+from backend.core.metrics import risk_score_seconds
 
 
 class RiskCalculator:
 
     @staticmethod
+    def score_label(score: RiskLevel) -> str:
+        if score >= RiskLevel.LEVEL_4:
+            return "RED"
+        if score == RiskLevel.LEVEL_3:
+            return "ORANGE"
+        if score == RiskLevel.LEVEL_2:
+            return "YELLOW"
+        return "GREEN"
+
+    @staticmethod
+    @risk_score_seconds.time_calls()
     def compute_score(rules: List[Rule], answers: Dict[str, bool], route: str = None) -> EvaluationResponse:
 
         score = RiskLevel.LEVEL_1
@@ -35,16 +47,8 @@ class RiskCalculator:
                     if rule.advice not in details:
                         details.append(rule.advice)
         
-        score_str = "GREEN"
-        if score == RiskLevel.LEVEL_2:
-            score_str = "YELLOW"
-        elif score == RiskLevel.LEVEL_3:
-            score_str = "ORANGE"
-        elif score >= RiskLevel.LEVEL_4:
-            score_str = "RED"
-            
         return EvaluationResponse(
-            score=score_str,
+            score=RiskCalculator.score_label(score),
             details=details,
             answered_questions_context=answered_questions_context
         )
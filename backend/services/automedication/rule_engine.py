@@ -0,0 +1,100 @@
+"""
+Moteur de règles compilé : chargement du module généré par `scripts/compile_rules.py`
+(une fonction de décision par ensemble de règles, tables constantes identifiant → fonction).
+
+`evaluate_risk` l'utilise en priorité : aucune lecture de la base ni interprétation des règles.
+Le module n'est retenu que si sa version des données est celle de la base ; sinon (ou s'il
+est absent, désactivé, d'un autre format), le calcul interprété `RiskCalculator` prend le relais
+jusqu'à ce que le fichier soit réécrit.
+"""
+import os
+import logging
+import threading
+import importlib.util
+from types import ModuleType
+from typing import Dict, Optional
+
+from backend.core.config import settings
+from backend.core.metrics import risk_score_seconds
+from backend.core.schemas import EvaluationResponse
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+def default_rules_path(db_path: str = None) -> str:
+    if db_path is None and settings.COMPILED_RULES_PATH:
+        return settings.COMPILED_RULES_PATH
+    return os.path.splitext(db_path or settings.DB_PATH)[0] + "_rules.py"
+
+
+def load_compiled_rules(path: str) -> ModuleType:
+    """Importe le module généré depuis son chemin (hors paquet). Lève `ImportError` si le format diffère."""
+    spec = importlib.util.spec_from_file_location("safepills_compiled_rules", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Module de règles illisible : {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if getattr(module, "FORMAT_VERSION", None) != FORMAT_VERSION:
+        raise ImportError(f"Format du module de règles {getattr(module, 'FORMAT_VERSION', None)} != {FORMAT_VERSION}")
+    return module
+
+
+class CompiledRules:
+    """Module compilé du processus, rechargé quand la version des données ou le fichier change.
+
+    Un module retenu n'est plus contrôlé tant que la version ne change pas ; après un échec
+    (absent, illisible, autre version), la date de modification du fichier est relue à chaque
+    appel pour réessayer dès qu'il est réécrit.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._module: Optional[ModuleType] = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def decisions(self, data_version: Optional[str]) -> Optional[Dict]:
+        module, key = self._module, self._key
+        if key is None or key[0] != data_version or (module is None and key[1] != self._mtime()):
+            with self._lock:
+                mtime = self._mtime()
+                if self._key != (data_version, mtime):
+                    self._module = self._load(data_version) if mtime is not None else None
+                    self._key = (data_version, mtime)
+                module = self._module
+        return module.DECISIONS if module is not None else None
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path or default_rules_path())
+        except OSError:
+            return None
+
+    def _load(self, data_version: Optional[str]) -> Optional[ModuleType]:
+        path = self.path or default_rules_path()
+        try:
+            module = load_compiled_rules(path)
+        except Exception as e:
+            logger.warning(f"Module de règles {path} ignoré : {e}")
+            return None
+        if module.DATA_VERSION != data_version:
+            logger.warning(f"Module de règles {path} compilé pour la version {module.DATA_VERSION}, base en {data_version} : calcul interprété")
+            return None
+        logger.info(f"Module de règles chargé : {len(module.DECISIONS)} identifiants, {module.FUNCTION_COUNT} fonctions de décision")
+        return module
+
+
+compiled_rules = CompiledRules()
+
+
+def evaluate_compiled(identifier: str, answers: Dict[str, bool], has_other_meds: bool, data_version: Optional[str]) -> Optional[EvaluationResponse]:
+    """Score par la fonction compilée de l'identifiant, ou None si le moteur compilé ne le couvre pas."""
+    if not settings.USE_COMPILED_RULES:
+        return None
+    decisions = compiled_rules.decisions(data_version)
+    decide = decisions.get(identifier) if decisions is not None else None
+    if decide is None:
+        return None
+    with risk_score_seconds.time():
+        return decide(answers, has_other_meds)
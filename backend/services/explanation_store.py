@@ -0,0 +1,125 @@
+import os
+import time
+import sqlite3
+import logging
+from typing import Iterable, List, NamedTuple, Optional
+
+from backend.core.config import settings
+from backend.core.db import connect
+from backend.core.metrics import db_query_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class ExplanationKey(NamedTuple):
+    cis: str
+    codes: str
+    score: str
+    lang: str
+    profile: str
+
+
+def age_band(age: Optional[int]) -> str:
+    """Classe d'âge : « minor », « adult », « senior » ou « unknown »."""
+    if age is None:
+        return "unknown"
+    if age < 18:
+        return "minor"
+    if age < 65:
+        return "adult"
+    return "senior"
+
+
+def profile_bucket(gender: Optional[str], age: Optional[int]) -> str:
+    """Tranche de profil patient : sexe et classe d'âge (« F-adult », « M-senior », « U-unknown »)."""
+    return f"{gender or 'U'}-{age_band(age)}"
+
+
+def bucket_profile(user_profile: dict) -> dict:
+    """Profil représentatif de la tranche : l'âge exact est remplacé par la classe d'âge.
+
+    Le texte stocké est servi à tous les patients de la tranche ; il ne doit donc
+    pas être généré à partir d'un âge précis.
+    """
+    profile = {name: value for name, value in user_profile.items() if name != "age"}
+    profile["age_band"] = age_band(user_profile.get("age"))
+    return profile
+
+
+def explanation_key(
+    cis: str,
+    score: str,
+    answered_questions: Iterable[dict],
+    lang: str,
+    gender: Optional[str],
+    age: Optional[int]
+) -> ExplanationKey:
+    codes = sorted({
+        question["question_id"] for question in answered_questions
+        if question.get("question_id") and question["question_id"] != "GENERAL"
+    })
+    return ExplanationKey(cis, ",".join(codes), score, lang, profile_bucket(gender, age))
+
+
+class ExplanationStore:
+    """Explications pré-générées, dans une base SQLite séparée de `safepills.db`.
+
+    Remplie hors ligne par `scripts/pregenerate_explanations.py` et lue par
+    l'orchestrateur avant tout appel à Gemini.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.EXPLANATION_DB_PATH or os.path.join(settings.BASE_DIR, "data", "explanations.db")
+
+    def _get_connection(self):
+        return connect(self.db_path, row_factory=None)
+
+    def init_schema(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS explanations (
+                    cis TEXT NOT NULL,
+                    codes TEXT NOT NULL,
+                    score TEXT NOT NULL,
+                    lang TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (cis, codes, score, lang, profile)
+                ) WITHOUT ROWID
+            """)
+
+    @db_query_seconds.time_calls(repository="explanations", method="get")
+    def get(self, key: ExplanationKey) -> Optional[str]:
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    "SELECT text FROM explanations WHERE cis = ? AND codes = ? AND score = ? AND lang = ? AND profile = ?",
+                    key
+                ).fetchone()
+                return row[0] if row else None
+        except sqlite3.OperationalError:
+            # Base présente mais pas encore initialisée
+            return None
+        except Exception as e:
+            logger.error(f"Erreur lecture explication: {e}", exc_info=True)
+            return None
+
+    def put(self, key: ExplanationKey, text: str, source: str = "ai"):
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO explanations (cis, codes, score, lang, profile, text, source, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, text, source, time.time())
+            )
+
+    def existing_keys(self) -> List[ExplanationKey]:
+        if not os.path.exists(self.db_path):
+            return []
+        with self._get_connection() as conn:
+            rows = conn.execute("SELECT cis, codes, score, lang, profile FROM explanations").fetchall()
+        return [ExplanationKey(*row) for row in rows]
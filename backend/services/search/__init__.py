@@ -2,4 +2,9 @@ from backend.services.search.service import search_service
 
 
 search_medication = search_service.search_medication
+search_page = search_service.search_page
 get_drug_details = search_service.get_details
+drug_exists = search_service.drug_exists
+list_substance_brands = search_service.list_substance_brands
+get_data_version = search_service.data_version
+refresh_data_version = search_service.refresh_data_version
@@ -0,0 +1,79 @@
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+from backend.core.cache import CacheNamespace
+from backend.services.search.repository import SearchHit, rank_hit
+
+MIN_QUERY_LENGTH = 3
+
+
+class CacheEntry(NamedTuple):
+    hits: List[SearchHit]
+    complete: bool
+
+
+class SearchCache:
+    """Cache LRU des résultats de recherche, indexé par requête normalisée.
+
+    Une entrée « complète » contient toutes les correspondances de sa requête :
+    une requête plus longue qui la prolonge (« dol » → « doli ») est alors
+    résolue en filtrant cette entrée en mémoire, sans interroger SQLite.
+
+    Le stockage est un espace de noms de `backend.core.cache` (`namespace`), ce qui
+    rattache les entrées à la version des données ; sans espace de noms fourni,
+    le cache est autonome (tests, benchmarks).
+    """
+
+    def __init__(self, max_entries: int = 512, prefetch: int = 200, namespace: CacheNamespace = None):
+        self.prefetch = prefetch
+        self._store = namespace or CacheNamespace("search", max_entries)
+
+    @property
+    def max_entries(self) -> int:
+        return self._store.max_entries
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        return self._store.get(key)
+
+    def put(self, key: Hashable, hits: List[SearchHit], complete: bool) -> CacheEntry:
+        return self._store.put(key, CacheEntry(list(hits), complete))
+
+    def lookup(self, query: str) -> Optional[CacheEntry]:
+        """Entrée exacte, sinon raffinement d'une entrée complète d'un préfixe de `query`."""
+        entry = self._store.peek(query)
+        if entry is not None:
+            self._store.record(hit=True)
+            return entry
+
+        for end in range(len(query) - 1, MIN_QUERY_LENGTH - 1, -1):
+            parent = self._store.peek(query[:end])
+            if parent is not None and parent.complete:
+                break
+        else:
+            self._store.record(hit=False)
+            return None
+        self._store.record("refinements")
+
+        refined = [
+            hit._replace(rank=rank_hit(query, hit.key, hit.is_otc))
+            for hit in parent.hits
+            if query in hit.key
+        ]
+        refined.sort(key=lambda hit: hit.sort_key)
+        return self.put(query, refined, complete=True)
+
+    def clear(self):
+        self._store.clear()
+
+    def stats(self) -> Dict[str, float]:
+        stats = self._store.stats()
+        refinements = stats.get("refinements", 0)
+        lookups = stats["hits"] + refinements + stats["misses"]
+        return {
+            "size": stats["size"],
+            "max_entries": stats["max_entries"],
+            "hits": stats["hits"],
+            "refinements": refinements,
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "hit_ratio": (stats["hits"] + refinements) / lookups if lookups else 0.0,
+        }
@@ -1,73 +1,216 @@
-import sqlite3
 import logging
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 from backend.core.config import settings
-from backend.core.schemas import SearchResult
+from backend.core.cache import cached
+from backend.core.db import connect
+from backend.core.metrics import db_query_seconds
+from backend.core.snapshot import CatalogSnapshot, get_snapshot
+from backend.core.schemas import BrandSummary
 from backend.core.models import Brand, BrandSubstance, Substance as MetierSubstance
-from backend.core.i18n import i18n
 
 logger = logging.getLogger(__name__)
 
 
+class SearchHit(NamedTuple):
+    rank: int
+    name: str
+    type: str
+    id: str
+    is_otc: bool
+    key: str
+
+    @property
+    def sort_key(self) -> tuple:
+        return (self.rank, self.name, self.type, self.id)
+
+
+def rank_hit(query: str, key: str, is_otc: bool) -> int:
+    """Équivalent Python du score calculé par `search_ranked` (négatif : tri croissant)."""
+    score = 4 if key.startswith(query) else 0
+    if f" {query} " in f" {key} ":
+        score += 2
+    return -(score + int(is_otc))
+
+
+# Borne haute d'une plage de préfixe : supérieur à tout caractère en comparaison binaire UTF-8
+PREFIX_UPPER_BOUND = "\U0010ffff"
+# Rang maximal d'une correspondance par préfixe (score >= 4)
+PREFIX_MAX_RANK = -4
+
+_PREFIX_FILTER = "name_norm >= :low AND name_norm < :high"
+_CONTAINS_FILTER = "name_norm LIKE :contains ESCAPE '\\' AND NOT (name_norm >= :low AND name_norm < :high)"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class DrugRepository:
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, snapshot: CatalogSnapshot = None):
         self.db_path = db_path or settings.DB_PATH
+        self._own_snapshot = snapshot
+        # L'instantané partagé ne décrit que la base par défaut
+        self._use_shared_snapshot = snapshot is None and not db_path
+
+    @property
+    def _snapshot(self) -> Optional[CatalogSnapshot]:
+        # Résolu à chaque appel : une mise à jour des règles à chaud remplace l'instantané partagé
+        return get_snapshot() if self._use_shared_snapshot else self._own_snapshot
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return connect(self.db_path, read_only=True)
+
+    @db_query_seconds.time_calls(repository="drugs", method="search_ranked")
+    def search_ranked(self, normalized_query: str, limit: int = 20, after: Optional[Sequence] = None) -> List[SearchHit]:
+        """Recherche unifiée substances + médicaments, classée.
+
+        Score : préfixe (4) + mot entier (2) + OTC (1). Les résultats sont triés par
+        (rank, name, type, id) ; `after` est la clé du dernier élément de la page
+        précédente (pagination par clé, sans OFFSET).
+
+        Toutes les correspondances par préfixe (rank <= -4) précèdent les autres : elles
+        sont lues d'abord par plage sur les index `name_norm`, et le parcours complet par
+        sous-chaîne (LIKE '%…%') n'est lancé que si la page n'est pas remplie.
+        """
+        pattern = _escape_like(normalized_query)
+        params = {
+            "low": normalized_query,
+            "high": normalized_query + PREFIX_UPPER_BOUND,
+            "contains": f"%{pattern}%",
+            "prefix": f"{pattern}%",
+            "word": f"% {pattern} %",
+        }
+        keyset = ""
+        if after:
+            keyset = "WHERE (rank, name, type, id) > (:a_rank, :a_name, :a_type, :a_id)"
+            params.update(zip(("a_rank", "a_name", "a_type", "a_id"), after))
 
-    def search_substances(self, normalized_query: str, lang: str = "fr") -> List[SearchResult]:
-        results = []
         try:
             with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id, name FROM substances WHERE LOWER(name) LIKE ? LIMIT 20",
-                    (f"%{normalized_query}%",)
+                hits: List[SearchHit] = []
+                if not after or after[0] <= PREFIX_MAX_RANK:
+                    hits = self._ranked_tier(conn, _PREFIX_FILTER, keyset, dict(params, limit=limit))
+                if len(hits) < limit:
+                    # Après les préfixes : la clé de page n'a de sens que si elle vient de ce rang
+                    contains_keyset = keyset if after and after[0] > PREFIX_MAX_RANK else ""
+                    hits += self._ranked_tier(conn, _CONTAINS_FILTER, contains_keyset, dict(params, limit=limit - len(hits)))
+                return hits
+        except Exception as e:
+            logger.error(f"Erreur recherche classée: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    def _ranked_tier(conn, tier_filter: str, keyset: str, params: dict) -> List[SearchHit]:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT rank, name, type, id, is_otc, lname FROM (
+                SELECT
+                    -((CASE WHEN lname LIKE :prefix ESCAPE '\\' THEN 4 ELSE 0 END)
+                      + (CASE WHEN ' ' || lname || ' ' LIKE :word ESCAPE '\\' THEN 2 ELSE 0 END)
+                      + is_otc) AS rank,
+                    name, type, id, is_otc, lname
+                FROM (
+                    SELECT name, 'substance' AS type, CAST(id AS TEXT) AS id, 0 AS is_otc, name_norm AS lname
+                    FROM substances WHERE {tier_filter}
+                    UNION ALL
+                    SELECT name, 'drug', cis, is_otc, name_norm
+                    FROM brands WHERE {tier_filter}
                 )
-                
-                desc = i18n.get("type_substance", lang, "search") or "Substance active"
-                for sub in cursor.fetchall():
-                    results.append(SearchResult(
-                        type="substance",
-                        id=str(sub['id']),
-                        name=sub['name'],
-                        description=desc
-                    ))
+            )
+            {keyset}
+            ORDER BY rank, name, type, id
+            LIMIT :limit
+        """, params)
+
+        return [
+            SearchHit(row['rank'], row['name'], row['type'], row['id'], bool(row['is_otc']), row['lname'])
+            for row in cursor.fetchall()
+        ]
+
+    @db_query_seconds.time_calls(repository="drugs", method="search_phonetic")
+    def search_phonetic(self, key: str, limit: int = 20) -> List[SearchHit]:
+        """Recherche par préfixe de clé phonétique (plage sur les index `phonetic`)."""
+        if not key:
+            return []
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT name, 'substance' AS type, CAST(id AS TEXT) AS id, 0 AS is_otc, phonetic
+                    FROM substances WHERE phonetic >= :low AND phonetic < :high
+                    UNION ALL
+                    SELECT name, 'drug', cis, is_otc, phonetic
+                    FROM brands WHERE phonetic >= :low AND phonetic < :high
+                    LIMIT :limit
+                """, {"low": key, "high": key + "~", "limit": limit})
+
+                return [
+                    SearchHit(0, row['name'], row['type'], row['id'], bool(row['is_otc']), row['phonetic'])
+                    for row in cursor.fetchall()
+                ]
         except Exception as e:
-            logger.error(f"Erreur recherche substances: {e}", exc_info=True)
-            
-        return results
+            logger.error(f"Erreur recherche phonétique: {e}", exc_info=True)
+            return []
 
-    def search_drugs(self, normalized_query: str, lang: str = "fr") -> List[SearchResult]:
-        """Recherche les médicaments (marques) via SQL LIKE (délégation au moteur DB)."""
-        results = []
+    @db_query_seconds.time_calls(repository="drugs", method="substance_exists")
+    def substance_exists(self, substance_id: int) -> bool:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT cis, name, is_otc FROM brands WHERE LOWER(name) LIKE ? LIMIT 20",
-                    (f"%{normalized_query}%",)
-                )
-                
-                desc = i18n.get("type_drug", lang, "search") or "Médicament"
-                for drug in cursor.fetchall():
-                    results.append(SearchResult(
-                        type="drug",
-                        id=drug['cis'],
-                        name=drug['name'],
-                        description=desc
+                cursor.execute("SELECT 1 FROM substances WHERE id = ?", (substance_id,))
+                return cursor.fetchone() is not None
+        except Exception as e:
+            logger.error(f"Erreur substance_exists {substance_id}: {e}", exc_info=True)
+            return False
+
+    @db_query_seconds.time_calls(repository="drugs", method="brand_exists")
+    def brand_exists(self, cis: str) -> bool:
+        if self._snapshot:
+            return self._snapshot.has_brand(cis)
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM brands WHERE cis = ?", (cis,))
+                return cursor.fetchone() is not None
+        except Exception as e:
+            logger.error(f"Erreur brand_exists {cis}: {e}", exc_info=True)
+            return False
+
+    @db_query_seconds.time_calls(repository="drugs", method="get_brands_for_substance")
+    def get_brands_for_substance(self, substance_id: int, after: int = 0, limit: int = 20) -> List[Tuple[int, BrandSummary]]:
+        """Lit une page de l'index inversé `substance_brands` (pagination par clé `position`)."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT sb.position, b.cis, b.name, b.administration_route, b.is_otc
+                    FROM substance_brands sb
+                    JOIN brands b ON b.id = sb.brand_id
+                    WHERE sb.substance_id = ? AND sb.position > ?
+                    ORDER BY sb.position
+                    LIMIT ?
+                """, (substance_id, after, limit))
+
+                return [
+                    (row['position'], BrandSummary(
+                        cis=row['cis'],
+                        name=row['name'],
+                        administration_route=row['administration_route'],
+                        is_otc=bool(row['is_otc'])
                     ))
+                    for row in cursor.fetchall()
+                ]
         except Exception as e:
-            logger.error(f"Erreur recherche médicaments: {e}", exc_info=True)
-            
-        return results
+            logger.error(f"Erreur marques de la substance {substance_id}: {e}", exc_info=True)
+            return []
 
+    @cached("drug_details")
+    @db_query_seconds.time_calls(repository="drugs", method="get_drug_details")
     def get_drug_details(self, cis: str) -> Optional[Brand]:
         """Récupère les détails complets d'un médicament par son code CIS."""
+        if self._snapshot:
+            return self._snapshot.brand(cis)
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -108,3 +251,24 @@ class DrugRepository:
         except Exception as e:
             logger.error(f"Erreur détails médicament {cis}: {e}", exc_info=True)
             return None
+
+    def get_data_version(self) -> Optional[str]:
+        """Empreinte du contenu écrite par `build_db.py` (table `meta`), None pour une base plus ancienne."""
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+                return row['value'] if row else None
+        except Exception as e:
+            logger.error(f"Erreur lecture version des données: {e}", exc_info=True)
+            return None
+
+    @db_query_seconds.time_calls(repository="drugs", method="get_warmup_cis")
+    def get_warmup_cis(self, limit: int) -> List[str]:
+        """Médicaments à préchauffer au démarrage : OTC d'abord (cœur de l'automédication)."""
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute("SELECT cis FROM brands ORDER BY is_otc DESC, cis LIMIT ?", (limit,)).fetchall()
+                return [row['cis'] for row in rows]
+        except Exception as e:
+            logger.error(f"Erreur sélection des médicaments à préchauffer: {e}", exc_info=True)
+            return []
@@ -1,27 +1,148 @@
-from typing import List, Optional
-from backend.services.search.repository import DrugRepository
-from backend.services.search.utils import normalize_text
-from backend.core.schemas import SearchResult
+import time
+from bisect import bisect_right
+from typing import List, Optional, Sequence
+from backend.services.search.repository import DrugRepository, SearchHit
+from backend.services.search.cache import SearchCache
+from backend.core.normalization import normalize_text
+from backend.core.phonetic import phonetic_prefix
+from backend.core.pagination import encode_cursor, decode_cursor
+from backend.core.schemas import SearchResult, SearchPage, BrandPage
 from backend.core.models import Brand
+from backend.core.i18n import i18n
+from backend.core.cache import caches
+from backend.core.snapshot import shared_snapshot
+from backend.core.config import settings
 
 class SearchService:
-    def __init__(self, repository: DrugRepository = None):
+    def __init__(self, repository: DrugRepository = None, cache: SearchCache = None):
         self.repository = repository or DrugRepository()
+        self.cache = cache
+        self._data_version: Optional[str] = None
+        self._data_version_checked_at: Optional[float] = None
+
+    def search_page(self, query: str, lang: str = "fr", limit: int = 20, cursor: Optional[str] = None) -> SearchPage:
+        """Page de résultats classés (substances et médicaments confondus), paginée par curseur."""
+        after = decode_cursor(cursor)
+        # Clé de tri (rang, nom, type, id) : comparée aux clés des résultats, elle doit en avoir les types
+        if after is not None and (
+            len(after) != 4
+            or type(after[0]) is not int
+            or not all(isinstance(value, str) for value in after[1:])
+        ):
+            raise ValueError(f"Curseur invalide: {cursor}")
 
-    def search_medication(self, query: str, lang: str = "fr") -> List[SearchResult]:
         clean_query = normalize_text(query)
         if len(clean_query) < 3:
+            return SearchPage(results=[])
+
+        hits = self._ranked_hits(clean_query, limit + 1, after)
+        page = hits[:limit]
+        next_cursor = encode_cursor(page[-1].sort_key) if len(hits) > limit else None
+
+        return SearchPage(
+            results=[self._to_result(hit, lang) for hit in page],
+            next_cursor=next_cursor
+        )
+
+    def search_medication(self, query: str, lang: str = "fr", limit: int = 20) -> List[SearchResult]:
+        if len(normalize_text(query)) < 3:
             return []
 
-        substances = self.repository.search_substances(clean_query, lang)
-        
-        drugs = self.repository.search_drugs(clean_query, lang)
-        
-        results = substances + drugs
+        results = self.search_page(query, lang, limit).results
+
+        if len(results) < limit:
+            results += self._phonetic_complement(query, results, lang)
         
-        return results[:20]
+        return results[:limit]
+
+    def _ranked_hits(self, clean_query: str, count: int, after: Optional[Sequence]) -> List[SearchHit]:
+        """Lit `count` résultats après `after`, depuis le cache si possible, sinon depuis SQLite."""
+        if self.cache is None:
+            return self.repository.search_ranked(clean_query, count, after)
+
+        entry = self.cache.lookup(clean_query)
+        if entry is None and after is None:
+            fetched = self.repository.search_ranked(clean_query, self.cache.prefetch)
+            entry = self.cache.put(clean_query, fetched, complete=len(fetched) < self.cache.prefetch)
+
+        if entry is not None:
+            start = bisect_right(entry.hits, tuple(after), key=lambda hit: hit.sort_key) if after else 0
+            if entry.complete or start + count <= len(entry.hits):
+                return entry.hits[start:start + count]
+
+        return self.repository.search_ranked(clean_query, count, after)
+
+    def _to_result(self, hit: SearchHit, lang: str) -> SearchResult:
+        if hit.type == "substance":
+            desc = i18n.get("type_substance", lang, "search") or "Substance active"
+        else:
+            desc = i18n.get("type_drug", lang, "search") or "Médicament"
+        return SearchResult(type=hit.type, id=hit.id, name=hit.name, description=desc)
+
+    def _phonetic_complement(self, query: str, results: List[SearchResult], lang: str) -> List[SearchResult]:
+        """Ajoute les correspondances phonétiques absentes des résultats textuels."""
+        key = phonetic_prefix(query)
+        if len(key) < 3:
+            return []
+
+        entry = self.cache.get(("phonetic", key)) if self.cache is not None else None
+        if entry is None:
+            hits = self.repository.search_phonetic(key)
+            if self.cache is not None:
+                self.cache.put(("phonetic", key), hits, complete=False)
+        else:
+            hits = entry.hits
+
+        seen = {(r.type, r.id) for r in results}
+        return [
+            self._to_result(hit, lang) for hit in hits
+            if (hit.type, hit.id) not in seen
+        ]
 
     def get_details(self, cis: str) -> Optional[Brand]:
         return self.repository.get_drug_details(cis)
 
-search_service = SearchService()
+    def drug_exists(self, cis: str) -> bool:
+        return self.repository.brand_exists(cis)
+
+    def data_version(self) -> Optional[str]:
+        """Version des données, relue au plus toutes les `DATA_VERSION_CHECK_SECONDS`.
+
+        Une mise à jour de la base (`update_rules`) change ainsi les ETags et invalide
+        les caches sans redémarrage.
+        """
+        now = time.monotonic()
+        checked_at = self._data_version_checked_at
+        if checked_at is None or now - checked_at >= settings.DATA_VERSION_CHECK_SECONDS:
+            self._data_version = self.repository.get_data_version()
+            self._data_version_checked_at = now
+        return self._data_version
+
+    def refresh_data_version(self) -> Optional[str]:
+        self._data_version_checked_at = None
+        return self.data_version()
+
+    def list_substance_brands(self, substance_id: int, cursor: Optional[str] = None, limit: int = 20) -> Optional[BrandPage]:
+        """Page de marques contenant une substance (OTC d'abord). None si la substance est inconnue."""
+        values = decode_cursor(cursor)
+        try:
+            after = int(values[0]) if values else 0
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Curseur invalide: {cursor}") from e
+
+        rows = self.repository.get_brands_for_substance(substance_id, after, limit + 1)
+        if not rows and after == 0 and not self.repository.substance_exists(substance_id):
+            return None
+
+        page = rows[:limit]
+        next_cursor = encode_cursor([page[-1][0]]) if len(rows) > limit else None
+        return BrandPage(items=[brand for _, brand in page], next_cursor=next_cursor)
+
+search_service = SearchService(
+    cache=SearchCache(
+        prefetch=settings.SEARCH_CACHE_PREFETCH,
+        namespace=caches.namespace("search", max_entries=settings.SEARCH_CACHE_SIZE)
+    )
+)
+caches.set_version_provider(search_service.data_version)
+shared_snapshot.set_version_provider(search_service.data_version)
@@ -1,6 +1,3 @@
-import unicodedata
+from backend.core.normalization import normalize_text
 
-def normalize_text(text: str) -> str:
-    if not text: return ""
-    return ''.join(c for c in unicodedata.normalize('NFD', text)
-                   if unicodedata.category(c) != 'Mn').lower()
+__all__ = ["normalize_text"]
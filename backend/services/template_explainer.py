@@ -0,0 +1,66 @@
+import logging
+from typing import List
+
+from backend.core.i18n import i18n
+
+logger = logging.getLogger(__name__)
+
+MAX_ADVICE_SENTENCES = 3
+
+DEFAULT_DRUG_NAME = {"fr": "ce médicament", "es": "este medicamento"}
+
+
+def generate_template_explanation(
+    drug_name: str,
+    score: str,
+    details: List[str],
+    user_profile: dict,
+    answered_questions: List[dict] = None,
+    lang: str = "fr"
+) -> str:
+    """Explication déterministe construite à partir des sections `explanations` et `advice` des locales.
+
+    Même contrat que `generate_risk_explanation` (sans appel réseau) : introduction selon
+    le score, rappel des réponses « oui », conseils validés des substances, conclusion.
+    """
+    if answered_questions is None:
+        answered_questions = []
+
+    level = score if score in ("RED", "ORANGE", "YELLOW") else "ORANGE"
+    drug = drug_name or DEFAULT_DRUG_NAME.get(lang, DEFAULT_DRUG_NAME["fr"])
+
+    sentences = [_text(f"intro_{level}", lang).format(drug=drug)]
+
+    question_ids = []
+    for question in answered_questions:
+        question_id = question.get("question_id")
+        if question_id and question_id != "GENERAL" and question_id not in question_ids:
+            question_ids.append(question_id)
+
+    if question_ids:
+        answers = " ; ".join(i18n.translate_question(qid, qid, lang) for qid in question_ids)
+        sentences.append(_text("answers", lang).format(answers=answers))
+
+    sentences.extend(_advice(user_profile.get("substances", []), question_ids, details, lang))
+    sentences.append(_text(f"closing_{level}", lang))
+
+    return " ".join(sentence.strip() for sentence in sentences if sentence)
+
+
+def _text(key: str, lang: str) -> str:
+    return i18n.get(key, lang, "explanations") or i18n.get(key, "fr", "explanations") or ""
+
+
+def _advice(substances: List[str], question_ids: List[str], details: List[str], lang: str) -> List[str]:
+    """Conseils des substances pour les questions déclenchées, à défaut les détails du score (en français)."""
+    advice = []
+    for question_id in question_ids:
+        for substance in substances:
+            for tip in i18n.get_advice(substance, question_id, lang)[:1]:
+                if tip not in advice:
+                    advice.append(tip)
+
+    if not advice and lang == "fr":
+        advice = [detail for detail in details if not detail.startswith("⚠️")]
+
+    return advice[:MAX_ADVICE_SENTENCES]
@@ -1,8 +1,17 @@
+from contextlib import ExitStack
+import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, PropertyMock
 from backend.api.main import app
-from backend.core.models import RiskLevel, Rule
-from backend.core.schemas import EvaluationResponse, FlowQuestion, SearchResult
+from backend.core.models import Brand, RiskLevel, Rule
+from backend.api import automedication as automedication_api, flow_endpoint
+from backend.core.cache import caches
+from backend.core.config import settings
+from backend.core.snapshot import shared_snapshot
+from backend.scripts.build_db import build_database
+from backend.services import automedication as automedication_service
+from backend.services.search import search_service
+from backend.core.schemas import BasketInteraction, BasketResponse, EvaluationResponse, FlowQuestion, SearchResult, BrandPage, BrandSummary
 
 client = TestClient(app)
 
@@ -15,6 +24,38 @@ MOCK_FLOW_QUESTIONS = [
     FlowQuestion(id="GENDER", text="Sexe ?", type="choice", is_profile=True)
 ]
 
+@pytest.fixture(scope="module")
+def catalog_path(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("catalog") / "safepills.db")
+    build_database(db_path=db_path)
+    return db_path
+
+
+def _reset_catalog_state():
+    caches.invalidate()
+    shared_snapshot.reset()
+    # Relecture paresseuse : ne pas ouvrir la base réelle (absente d'un clone) au démontage
+    search_service._data_version_checked_at = None
+
+
+@pytest.fixture
+def catalog(catalog_path):
+    """Base construite pour le test, substituée à `settings.DB_PATH` et aux repositories déjà instanciés."""
+    repositories = [
+        search_service.repository,
+        flow_endpoint.flow_repository,
+        automedication_api._orchestrator._repository,
+        automedication_api.basket_checker._repository,
+        automedication_service._repository,
+    ]
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(type(settings), "DB_PATH", new_callable=PropertyMock, return_value=catalog_path))
+        for repository in repositories:
+            stack.enter_context(patch.object(repository, "db_path", catalog_path))
+        _reset_catalog_state()
+        stack.callback(_reset_catalog_state)
+        yield catalog_path
+
 MOCK_EVALUATION = EvaluationResponse(
     score="RED",
     details=["DANGER SIMULÉ"],
@@ -29,8 +70,24 @@ def test_search_endpoint():
         assert len(data) == 1
         assert data[0]["name"] == "TEST DRUG"
 
+def test_substance_brands_endpoint():
+    page = BrandPage(
+        items=[BrandSummary(cis="123", name="TEST DRUG (Orale)", is_otc=True)],
+        next_cursor="WzFd"
+    )
+    with patch("backend.api.drugs.list_substance_brands", return_value=page) as mock_service:
+        response = client.get("/api/substances/7/brands?limit=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"][0]["cis"] == "123"
+        assert data["next_cursor"] == "WzFd"
+        mock_service.assert_called_once_with(7, None, 1)
+
+    with patch("backend.api.drugs.list_substance_brands", return_value=None):
+        assert client.get("/api/substances/7/brands").status_code == 404
+
 def test_flow_endpoint():
-    with patch("backend.api.flow_endpoint._repository") as mock_repo:
+    with patch("backend.api.flow_endpoint.flow_repository") as mock_repo:
         mock_repo.get_rules_for_brand.return_value = [
             Rule(id=1, question_code="Q1", risk_level=RiskLevel.LEVEL_1, advice="Test Q")
         ]
@@ -62,3 +119,156 @@ def test_evaluate_endpoint():
         assert data["score"] == "RED"
         assert data["details"][0] == "DANGER SIMULÉ"
         mock_service.assert_called_once()
+        assert "drug_info;dur=" in response.headers["server-timing"]
+
+def test_basket_endpoint():
+    result = BasketResponse(
+        score="RED",
+        interactions=[BasketInteraction(cis=["111", "222"], families=["AINS_ORAUX", "AINS_ORAUX"], risk_level=4, advice="Deux AINS")]
+    )
+    with patch("backend.api.automedication.basket_checker") as mock_checker:
+        mock_checker.check.return_value = result
+        response = client.post("/api/automedication/basket?lang=es", json={"cis_list": ["111", "222"]})
+
+        assert response.status_code == 200
+        assert response.json()["interactions"][0]["advice"] == "Deux AINS"
+        mock_checker.check.assert_called_once_with(["111", "222"], "es")
+
+        assert client.post("/api/automedication/basket", json={"cis_list": ["111"]}).status_code == 422
+        assert client.post("/api/automedication/basket", json={"cis_list": [str(i) for i in range(11)]}).status_code == 422
+
+def test_drug_details_conditional_get():
+    brand = Brand(id=1, cis="60073914", name="IBUPROFENE (Orale)", is_otc=True)
+    with patch("backend.api.drugs.get_data_version", return_value="abc123"), \
+            patch("backend.api.drugs.drug_exists", return_value=True), \
+            patch("backend.api.drugs.get_drug_details", return_value=brand) as mock_details:
+        response = client.get("/api/drugs/60073914")
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"abc123-60073914"'
+        assert response.headers["cache-control"].startswith("public, max-age=")
+
+        revalidated = client.get("/api/drugs/60073914", headers={"If-None-Match": 'W/"old", "abc123-60073914"'})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == '"abc123-60073914"'
+        mock_details.assert_called_once()
+
+        assert client.get("/api/drugs/60073914", headers={"If-None-Match": '"old-60073914"'}).status_code == 200
+
+    with patch("backend.api.drugs.get_data_version", return_value="abc123"), \
+            patch("backend.api.drugs.drug_exists", return_value=False), \
+            patch("backend.api.drugs.get_drug_details", return_value=None):
+        for if_none_match in ("*", '"abc123-99999999"'):
+            response = client.get("/api/drugs/99999999", headers={"If-None-Match": if_none_match})
+            assert response.status_code == 404
+            assert "etag" not in response.headers
+            assert "cache-control" not in response.headers
+
+def test_admin_cache_endpoints_require_token():
+    with patch("backend.api.admin.settings.ADMIN_TOKEN", ""):
+        assert client.get("/api/admin/cache").status_code == 404
+
+    with patch("backend.api.admin.settings.ADMIN_TOKEN", "secret"), \
+         patch("backend.api.admin.refresh_data_version", return_value="abc123"):
+        assert client.get("/api/admin/cache", headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+        response = client.get("/api/admin/cache", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        assert response.json()["data_version"] == "abc123"
+        assert "search" in response.json()["namespaces"]
+
+        response = client.post("/api/admin/cache/invalidate?namespace=flow", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        assert "flow" in response.json()["invalidated"]
+        assert client.post("/api/admin/cache/invalidate?namespace=nope", headers={"Authorization": "Bearer secret"}).status_code == 404
+
+def test_readiness_waits_for_warmup(catalog):
+    from backend.api.warmup import WarmupState, warm_up
+
+    state = WarmupState()
+    assert client.get("/healthz").status_code == 200
+
+    with patch("backend.api.main.warmup_state", state), \
+         patch("backend.api.main.get_data_version", return_value="abc123"):
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+        with patch("backend.api.warmup.warmup_cis", return_value=["123"]), \
+             patch("backend.api.warmup.build_flow") as mock_flow, \
+             patch("backend.api.warmup.search_service"), \
+             patch("backend.api.warmup.get_snapshot"), \
+             patch("backend.api.warmup.i18n.languages", return_value=["es", "fr"]):
+            warm_up(state, limit=1)
+
+        assert mock_flow.call_count == 2
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["data_version"] == "abc123"
+        assert response.json()["warmup"]["primed"] == 1
+        assert set(response.json()["warmup"]["steps_ms"]) == {"db_pages", "indexes", "flows"}
+
+def test_readiness_fails_when_database_is_unusable(tmp_path):
+    from backend.api.warmup import WarmupState, warm_up
+
+    state = WarmupState()
+    with patch("backend.api.main.warmup_state", state), \
+         patch.object(type(settings), "DB_PATH", new_callable=PropertyMock, return_value=str(tmp_path / "absent.db")), \
+         patch("backend.api.warmup.warmup_cis", return_value=[]):
+        warm_up(state, limit=1)
+
+        assert state.finished and not state.ready
+        assert {"db_pages", "indexes"} <= set(state.errors)
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "failed"
+
+def test_load_shedding_rejects_only_non_critical_routes():
+    with patch("backend.api.main.load_shedder.lag", 1.0), \
+         patch("backend.api.drugs.search_medication", return_value=MOCK_SEARCH_RESULT):
+        response = client.get("/api/drugs/123")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+        assert client.get("/api/search?q=test").status_code == 200
+
+def test_hot_endpoints_never_block_event_loop(catalog):
+    import asyncio
+    import httpx
+    from backend.core.blocking import assert_no_blocking
+    from backend.core.limiter import limiter
+
+    cis = search_service.repository.get_warmup_cis(1)[0]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            async with assert_no_blocking(0.02):
+                assert (await async_client.get("/api/search?q=doli")).status_code == 200
+                assert (await async_client.get(f"/api/drugs/{cis}")).status_code == 200
+                assert (await async_client.get(f"/api/automedication/flow/{cis}")).status_code == 200
+                response = await async_client.post("/api/automedication/evaluate", json={"cis": cis, "answers": {}})
+                assert response.status_code == 200
+
+    with patch.object(limiter, "enabled", False), \
+         patch("backend.services.ai_service.client", None):
+        asyncio.run(scenario())
+
+def test_metrics_endpoint_requires_token():
+    with patch("backend.api.admin.settings.ADMIN_TOKEN", ""), patch("backend.api.admin.settings.METRICS_TOKEN", ""):
+        assert client.get("/metrics").status_code == 404
+
+    with patch("backend.api.admin.settings.ADMIN_TOKEN", "secret"), patch("backend.api.admin.settings.METRICS_TOKEN", "scraper"):
+        assert client.get("/metrics").status_code == 403
+        for token in ("scraper", "secret"):
+            response = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200
+            assert "safepills_http_requests_total" in response.text
+
+def test_admin_memory_report():
+    with patch("backend.api.admin.settings.ADMIN_TOKEN", "secret"):
+        response = client.get("/api/admin/memory", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        structures = response.json()["structures"]
+        assert {"i18n.translations", "limiter.storage", "cache.search"} <= set(structures)
+        assert client.get("/api/admin/memory").status_code == 403
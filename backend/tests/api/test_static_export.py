@@ -0,0 +1,74 @@
+"""
+Tests de l'export statique : les fichiers exportés sont octet pour octet les réponses de l'API.
+"""
+import gzip
+import json
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.main import app
+from backend.scripts.build_db import build_database
+from backend.scripts.export_search_index import export_search_index
+from backend.scripts.export_static_api import export_static_api, prune_stale_files
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.search.repository import DrugRepository
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("static-api")
+    db_path = str(workdir / "safepills.db")
+    build_database(db_path=db_path)
+    output_dir = workdir / "static-api"
+    manifest = export_static_api(db_path, str(output_dir), ["fr", "es"])
+    return db_path, output_dir, manifest
+
+
+def test_exported_payloads_match_api_responses(exported):
+    db_path, output_dir, manifest = exported
+    cis = sorted(path for path in manifest["files"] if path.startswith("drugs/"))[0][len("drugs/"):-len(".json")]
+
+    with patch("backend.api.drugs.get_drug_details", DrugRepository(db_path).get_drug_details), \
+            patch("backend.api.flow_endpoint.flow_repository", AutomedicationRepository(db_path)):
+        drug = client.get(f"/api/drugs/{cis}")
+        flow = client.get(f"/api/automedication/flow/{cis}?lang=es")
+
+    assert drug.content == (output_dir / "drugs" / f"{cis}.json").read_bytes()
+    assert flow.content == (output_dir / "flow" / "es" / f"{cis}.json").read_bytes()
+    assert gzip.decompress((output_dir / "flow" / "es" / f"{cis}.json.gz").read_bytes()) == flow.content
+
+
+def test_manifest_lists_every_payload(exported):
+    _, output_dir, manifest = exported
+
+    assert len(manifest["files"]) == manifest["drugs"] * 3 + manifest["substances"] * 2
+    assert json.loads((output_dir / "manifest.json").read_text(encoding="utf-8"))["content_hash"] == manifest["content_hash"]
+    entry = manifest["files"]["flow/fr/1.json"]
+    assert entry["bytes"] == (output_dir / "flow" / "fr" / "1.json").stat().st_size
+    assert "gz" in entry
+
+
+def test_pruning_only_touches_exported_subtrees(exported):
+    _, output_dir, manifest = exported
+    foreign = [output_dir / "search-index.json", output_dir / "drugs" / "notes.txt", output_dir / "assets" / "app.json"]
+    stale = [output_dir / "drugs" / "00000000.json", output_dir / "flow" / "fr" / "00000000.json.gz"]
+    for path in foreign + stale:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"{}")
+
+    assert prune_stale_files(str(output_dir), manifest["files"], manifest["langs"]) == len(stale)
+    assert all(path.exists() for path in foreign)
+    assert not any(path.exists() for path in stale)
+    assert (output_dir / "flow" / "fr" / "1.json").exists()
+
+
+def test_search_index_carries_the_served_data_version(exported):
+    db_path, output_dir, _ = exported
+    index = export_search_index(db_path, str(output_dir / "search-index.json"))
+    assert index["data_version"]
+
+    assert json.loads((output_dir / "search-index.json").read_text(encoding="utf-8"))["data_version"] == index["data_version"]
+    with patch("backend.api.drugs.get_data_version", return_value=index["data_version"]):
+        assert client.get("/api/search/version").json() == {"data_version": index["data_version"]}
@@ -0,0 +1,36 @@
+"""
+Tests du générateur de catalogues synthétiques des benchmarks.
+"""
+from backend.benchmarks.catalog import scale_catalog
+
+PHARMA_DATA = {
+    "families": {"ANTALGIQUES_ANTIPYRETIQUES": ["paracetamol"]},
+    "substance_to_families": {"paracetamol": ["ANTALGIQUES_ANTIPYRETIQUES"]},
+    "substances": ["PARACÉTAMOL"],
+    "brands": [{
+        "cis": "60000001",
+        "name": "DOLIPRANE (Orale)",
+        "route": "orale",
+        "is_otc": True,
+        "composition": [{"substance": "PARACÉTAMOL", "norm_substance": "paracetamol", "dosage": "1000 mg"}],
+    }],
+}
+
+
+def test_scale_one_returns_original_catalog():
+    assert scale_catalog(PHARMA_DATA, 1) is PHARMA_DATA
+
+
+def test_scaled_catalog_keeps_unique_ids_and_compositions():
+    scaled = scale_catalog(PHARMA_DATA, 10)
+
+    assert len(scaled["substances"]) == 10
+    assert len(scaled["brands"]) == 10
+    assert len({brand["cis"] for brand in scaled["brands"]}) == 10
+    assert all(len(brand["cis"]) == 8 for brand in scaled["brands"])
+
+    copy = scaled["brands"][3]
+    assert copy["name"] == "DOLIPRANE 3 (Orale)"
+    assert copy["composition"][0]["substance"] == "PARACÉTAMOL 3"
+    assert copy["composition"][0]["substance"] in scaled["substances"]
+    assert scaled["families"] == PHARMA_DATA["families"]
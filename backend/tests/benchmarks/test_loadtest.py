@@ -0,0 +1,54 @@
+"""
+Tests du harnais de charge (faux Gemini, percentiles, exécution courte en processus).
+"""
+import asyncio
+from unittest.mock import patch
+import pytest
+from backend.benchmarks.loadtest import FakeGeminiClient, FakeGeminiError, fake_gemini, main, percentile, run_load
+from backend.core.limiter import limiter
+from backend.services import ai_service
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_fake_gemini_errors_and_restores_client():
+    fake = FakeGeminiClient(latency=0.0, error_rate=1.0, seed=1)
+    previous = ai_service.client
+
+    with fake_gemini(fake):
+        assert ai_service.client is fake
+        assert limiter.enabled is False
+        with pytest.raises(FakeGeminiError) as exc:
+            asyncio.run(fake.aio.models.generate_content(model="m", contents="c"))
+        assert exc.value.code == 503
+
+    assert ai_service.client is previous
+    assert limiter.enabled is True
+
+
+def test_remote_target_refuses_real_ai_evaluations(capsys):
+    with patch("backend.benchmarks.loadtest.run_load") as mock_run:
+        assert main(["--base-url", "http://localhost:8000"]) == 2
+        assert not mock_run.called
+    assert "--allow-real-ai" in capsys.readouterr().out
+
+
+def test_run_load_reports_latency_by_kind():
+    fixtures = {
+        "cis": ["60004487"],
+        "evaluations": [{"cis": "60004487", "answers": {"Q_PREGNANCY": True}, "gender": "F", "age": 30}],
+    }
+    fake = FakeGeminiClient(latency=0.001, seed=1)
+
+    with fake_gemini(fake):
+        report = asyncio.run(run_load(duration=30, concurrency=2, max_requests=12, fixtures=fixtures))
+
+    assert report["requests"] == 12
+    assert report["error_rate"] == 0.0
+    assert set(report["by_kind"]) == {"search", "flow", "detail", "evaluate"}
+    assert report["latency"]["p50_ms"] <= report["latency"]["p99_ms"]
@@ -0,0 +1,43 @@
+"""
+Tests du détecteur d'appels bloquants de la boucle d'événements.
+"""
+import asyncio
+import time
+
+import pytest
+
+from backend.core.blocking import BlockingDetector, assert_no_blocking
+
+
+def _blocking_call():
+    time.sleep(0.15)
+
+
+def test_detector_reports_blocking_frame():
+    async def scenario():
+        async with BlockingDetector(threshold=0.05) as detector:
+            await asyncio.sleep(0.02)
+            _blocking_call()
+            await asyncio.sleep(0.02)
+        return detector.reports
+
+    reports = asyncio.run(scenario())
+
+    assert len(reports) == 1
+    assert reports[0].duration >= 0.1
+    assert "_blocking_call" in reports[0].location
+    assert "scenario" in reports[0].stack
+
+
+def test_assert_no_blocking():
+    async def quiet():
+        async with assert_no_blocking(0.05):
+            await asyncio.sleep(0.1)
+
+    async def blocking():
+        async with assert_no_blocking(0.05):
+            _blocking_call()
+
+    asyncio.run(quiet())
+    with pytest.raises(AssertionError, match="_blocking_call"):
+        asyncio.run(blocking())
@@ -0,0 +1,80 @@
+"""
+Tests du cache unifié : éviction LRU/TTL, version des données et décorateur.
+"""
+from unittest.mock import patch
+
+from backend.core.cache import CacheNamespace, CacheRegistry, cached
+
+
+def test_namespace_evicts_lru_and_expires_entries():
+    namespace = CacheNamespace("test", max_entries=2, ttl=60)
+    namespace.put("a", 1)
+    namespace.put("b", 2)
+    namespace.get("a")
+    namespace.put("c", 3)
+
+    assert namespace.get("b") is None
+    assert namespace.get("a") == 1
+
+    with patch("backend.core.cache.time.monotonic", return_value=10**9):
+        assert namespace.get("c") is None
+
+    stats = namespace.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+def test_namespace_is_cleared_when_data_version_changes():
+    version = ["v1"]
+    namespace = CacheNamespace("test", version_provider=lambda: version[0])
+    namespace.put("a", 1)
+    assert namespace.get("a") == 1
+
+    version[0] = "v2"
+    assert namespace.get("a") is None
+    assert namespace.stats()["data_version"] == "v2"
+    assert namespace.stats()["invalidations"] == 1
+
+
+def test_cached_decorator_and_registry_invalidation():
+    caches = CacheRegistry()
+    calls = []
+
+    with patch("backend.core.cache.caches", caches):
+        @cached("square")
+        def square(x):
+            calls.append(x)
+            return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert calls == [3]
+    assert caches.stats()["square"]["hits"] == 1
+
+    assert caches.invalidate("square") == {"square": 1}
+    assert square(3) == 9
+    assert calls == [3, 3]
+
+
+def test_cached_decorator_bypasses_unhashable_arguments():
+    calls = []
+
+    @cached("test_unhashable")
+    def total(values):
+        calls.append(values)
+        return sum(values)
+
+    assert total([1, 2]) == 3
+    assert total([1, 2]) == 3
+    assert len(calls) == 2
+
+
+def test_version_provider_is_called_outside_the_lock():
+    holding = []
+    namespace = CacheNamespace("test", version_provider=lambda: holding.append(namespace._lock.locked()) or "v1")
+
+    namespace.put("a", 1)
+    assert namespace.get("a") == 1
+    assert namespace.peek("a") == 1
+    assert holding == [False, False, False]
@@ -0,0 +1,68 @@
+"""
+Tests de l'instrumentation SQLite (requêtes lentes, capture) et de l'audit des plans.
+"""
+import time
+import sqlite3
+import logging
+import pytest
+from unittest.mock import patch
+from backend.core.db import capture_statements, connect, normalize_sql
+from backend.scripts.audit_query_plans import EXPECTED_SCANS, audit
+from backend.scripts.build_db import build_database
+
+
+def test_normalize_sql_collapses_whitespace_and_placeholder_lists():
+    sql = """
+        SELECT * FROM rules
+        WHERE substance_id IN (?, ?,?)   OR family_id IN (?)
+    """
+    assert normalize_sql(sql) == "SELECT * FROM rules WHERE substance_id IN (?…) OR family_id IN (?)"
+
+
+def test_read_only_connection_never_creates_the_database(tmp_path):
+    missing = tmp_path / "absent.db"
+    with pytest.raises(sqlite3.OperationalError):
+        connect(str(missing), read_only=True).execute("SELECT 1")
+    assert not missing.exists()
+
+
+def test_slow_statements_are_logged_and_captured(tmp_path, caplog):
+    conn = connect(str(tmp_path / "test.db"))
+    conn.execute("CREATE TABLE t (x INTEGER)")
+
+    with patch("backend.core.db.settings") as mock_settings, capture_statements() as statements:
+        mock_settings.SLOW_QUERY_MS = 0.000001
+        with caplog.at_level(logging.WARNING, logger="safepills.sql"):
+            conn.execute("SELECT x FROM t WHERE x IN (?, ?)", (1, 2)).fetchall()
+    conn.close()
+
+    assert statements == [("SELECT x FROM t WHERE x IN (?, ?)", (1, 2))]
+    assert "SELECT x FROM t WHERE x IN (?…) | paramètres : (1, 2)" in caplog.text
+
+
+def test_row_fetching_counts_towards_statement_duration(tmp_path, caplog):
+    conn = connect(str(tmp_path / "test.db"))
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(5)])
+    # Chaque ligne coûte 10 ms : `execute` n'en produit qu'une, le reste est lu ensuite
+    conn.create_function("slow", 1, lambda x: time.sleep(0.01) or x)
+
+    with patch("backend.core.db.settings") as mock_settings, caplog.at_level(logging.WARNING, logger="safepills.sql"):
+        mock_settings.SLOW_QUERY_MS = 30
+        assert len(conn.execute("SELECT slow(x) FROM t").fetchall()) == 5
+        assert len([row for row in conn.execute("SELECT slow(x) FROM t WHERE x >= 0")]) == 5
+    conn.close()
+
+    assert "SELECT slow(x) FROM t |" in caplog.text
+    assert "SELECT slow(x) FROM t WHERE x >= 0 |" in caplog.text
+
+
+def test_repository_queries_avoid_unexpected_table_scans(tmp_path):
+    db_path = str(tmp_path / "safepills.db")
+    build_database(db_path=db_path)
+
+    reports = audit(db_path)
+
+    assert {report.method for report in reports} >= {"drugs.get_drug_details", "automedication.get_rules_for_brand"}
+    unexpected = [(report.method, report.scans) for report in reports if report.scans and report.method not in EXPECTED_SCANS]
+    assert unexpected == []
@@ -0,0 +1,33 @@
+"""
+Tests des ETag de version des données et de leur empreinte au build.
+"""
+import sqlite3
+from backend.core.http_cache import data_etag, etag_matches
+from backend.scripts.build_db import build_database, compute_data_version
+
+
+def test_etag_matching():
+    etag = data_etag("v1", "60073914")
+
+    assert etag == '"v1-60073914"'
+    assert etag_matches('"v1-60073914"', etag)
+    assert etag_matches('W/"v1-60073914"', etag)
+    assert etag_matches('"v0-60073914", "v1-60073914"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"v0-60073914"', etag)
+    assert not etag_matches(None, etag)
+    assert data_etag(None, "60073914") is None
+    assert data_etag("v1", 'bad"cis') is None
+
+
+def test_data_version_tracks_content(tmp_path):
+    db_path = str(tmp_path / "safepills.db")
+    build_database(db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    stamped = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0]
+    assert compute_data_version(conn.cursor()) == stamped
+
+    conn.execute("UPDATE rules SET advice = advice || '.' WHERE id = 1")
+    assert compute_data_version(conn.cursor()) != stamped
+    conn.close()
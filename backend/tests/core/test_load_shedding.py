@@ -0,0 +1,53 @@
+"""
+Tests du délestage : niveaux de charge, mesure du retard de boucle et rejet des routes non critiques.
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+from backend.core.load_shedding import DEGRADED, NORMAL, SHEDDING, LoadShedder
+
+
+def test_levels_follow_lag_and_in_flight():
+    shedder = LoadShedder()
+    assert shedder.level() == NORMAL
+
+    shedder.observe_lag(0.2)
+    assert shedder.level() == DEGRADED
+    assert shedder.skip_ai()
+    assert not shedder.should_reject("/api/drugs/123")
+
+    shedder.observe_lag(1.0)
+    assert shedder.level() == SHEDDING
+    assert shedder.should_reject("/api/drugs/123")
+    assert not shedder.should_reject("/api/search")
+    assert not shedder.should_reject("/api/automedication/evaluate")
+    assert not shedder.should_reject("/api/search/page")
+    assert not shedder.should_reject("/api/automedication/flow/60000001")
+    assert shedder.should_reject("/api/searchXYZ")
+    assert shedder.should_reject("/api/search-suggestions")
+    assert shedder.rejections == 3
+
+    # Baisse lissée : un seul échantillon calme ne suffit pas à revenir à la normale
+    shedder.observe_lag(0.0)
+    assert shedder.level() == SHEDDING
+
+    shedder = LoadShedder()
+    with patch("backend.core.load_shedding.settings.SHED_IN_FLIGHT_REJECT", 2):
+        with shedder.track(), shedder.track():
+            assert shedder.level() == SHEDDING
+        assert shedder.level() == NORMAL
+
+
+def test_monitor_measures_blocked_event_loop():
+    shedder = LoadShedder(sample_interval=0.01)
+
+    async def scenario():
+        shedder.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.15)
+        await asyncio.sleep(0.02)
+        await shedder.stop()
+
+    asyncio.run(scenario())
+    assert shedder.lag >= 0.1
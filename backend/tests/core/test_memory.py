@@ -0,0 +1,58 @@
+"""
+Tests de la mesure mémoire : taille profonde, registre des structures et diff tracemalloc.
+"""
+import sys
+
+from backend.core.memory import AllocationTracer, MemoryRegistry, deep_size
+
+
+class _Slotted:
+    __slots__ = ("payload",)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+def test_deep_size_follows_containers_and_slots_once():
+    payload = "x" * 10_000
+    size = deep_size({"a": [payload, payload], "b": _Slotted(payload)})
+
+    assert size["bytes"] >= sys.getsizeof(payload)
+    assert size["bytes"] < 2 * sys.getsizeof(payload)
+    assert size["objects"] == 6  # dict, 2 clés, liste, instance, chaîne partagée
+
+
+def test_registry_reports_built_structures_only():
+    memory = MemoryRegistry()
+    memory.register("built", lambda: list(range(100)))
+    memory.register("lazy", lambda: None)
+
+    report = memory.report()
+    assert set(report) == {"built"}
+    assert report["built"]["objects"] == 101
+
+
+def test_registry_skips_structure_modified_during_measurement():
+    class _Mutating:
+        def __sizeof__(self):
+            raise RuntimeError("dictionary changed size during iteration")
+
+    memory = MemoryRegistry()
+    memory.register("built", lambda: [1, 2])
+    memory.register("mutating", lambda: [_Mutating()])
+
+    assert set(memory.report()) == {"built"}
+
+
+def test_allocation_tracer_reports_growth():
+    tracer = AllocationTracer(frames=1)
+    tracer.start()
+    try:
+        retained = [bytearray(1024) for _ in range(1000)]
+        diff = tracer.diff(top=5)
+    finally:
+        tracer.stop()
+
+    assert retained
+    assert diff[0]["size_diff"] >= 1024 * 1000
+    assert "test_memory.py" in diff[0]["location"]
@@ -0,0 +1,68 @@
+"""
+Tests unitaires du registre de métriques (format Prometheus, agrégation multi-workers).
+"""
+import os
+import sys
+import subprocess
+from backend.core.metrics import MetricsRegistry, classify_ai_error, render_snapshots
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Durée", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    text = registry.render()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{route="/a"} 3' in text
+
+
+def test_worker_snapshots_are_summed(tmp_path):
+    workers = [MetricsRegistry(), MetricsRegistry()]
+    for worker in workers:
+        worker.counter("test_total", "Compteur", ("kind",)).inc(kind="x")
+
+    text = render_snapshots(worker.snapshot() for worker in workers)
+    assert 'test_total{kind="x"} 2' in text
+
+
+def test_multiprocess_directory_merges_flushed_snapshots(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    registry.counter("test_total", "Compteur").inc(3)
+    (tmp_path / "metrics-1.json").write_text(
+        '[{"name": "test_total", "type": "counter", "help": "Compteur", "labelnames": [], "samples": [[[], 4]]}]'
+    )
+    assert "test_total 7" in registry.render()
+
+
+def test_dead_worker_snapshots_are_pruned_and_gauges_kept_per_worker(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    registry.counter("test_total", "Compteur").inc(3)
+    registry.callback("test_rss_bytes", "Jauge", (), lambda: {(): 100})
+
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    dead = tmp_path / f"metrics-{process.pid}.json"
+    dead.write_text(
+        '[{"name": "test_total", "type": "counter", "help": "Compteur", "labelnames": [], "samples": [[[], 4]]},'
+        ' {"name": "test_rss_bytes", "type": "gauge", "help": "Jauge", "labelnames": ["pid"], "samples": [[["%d"], 500]]}]' % process.pid
+    )
+
+    text = registry.render()
+    assert "test_total 3" in text
+    assert f'test_rss_bytes{{pid="{os.getpid()}"}} 100' in text
+    assert str(process.pid) not in text
+    assert not dead.exists()
+
+
+def test_classify_ai_error():
+    class QuotaError(Exception):
+        code = 429
+
+    assert classify_ai_error(QuotaError("quota")) == "429"
+    assert classify_ai_error(Exception("503 UNAVAILABLE")) == "503"
+    assert classify_ai_error(ValueError("boom")) == "other"
@@ -0,0 +1,33 @@
+"""
+Tests du module de normalisation partagé (API et scripts ETL).
+Les cas de `normalization_cases.json` sont aussi vérifiés côté navigateur (src/test/searchIndex.test.ts).
+"""
+import os
+import json
+from backend.core.normalization import normalize_name, normalize_text
+
+CASES_PATH = os.path.join(os.path.dirname(__file__), "normalization_cases.json")
+
+
+def test_normalize_text_ascii_fast_path_and_accents():
+    assert normalize_text("Doliprane") == "doliprane"
+    assert normalize_text("PSEUDO-ÉPHÉDRINE") == "pseudo-ephedrine"
+    assert normalize_text("Ibuprofène") == normalize_text("IBUPROFENE")
+    assert normalize_text("") == ""
+
+
+def test_normalize_text_unfolds_ligatures():
+    assert normalize_text("Œstradiol") == normalize_text("oestradiol") == "oestradiol"
+    assert normalize_text("Lætitia") == "laetitia"
+
+
+def test_shared_cases_with_browser_normalizer():
+    with open(CASES_PATH, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+    for text, expected in cases:
+        assert normalize_text(text) == expected, text
+
+
+def test_normalize_name_strips_hyphens_and_edges():
+    assert normalize_name("  Pseudo-Éphédrine ") == "pseudoephedrine"
+    assert normalize_name(None) == ""
@@ -0,0 +1,30 @@
+"""
+Tests unitaires de l'encodage phonétique français utilisé par la recherche.
+"""
+from backend.core.phonetic import phonetic_key, phonetic_prefix
+
+
+def test_homophones_share_the_same_key():
+    assert phonetic_key("Doliprane") == phonetic_key("dolipranne")
+    assert phonetic_key("paracétamol") == phonetic_key("parasetamol")
+    assert phonetic_key("ibuprofène") == phonetic_key("ibuprofaine")
+
+
+def test_partial_word_prefix_matches_full_key():
+    for name in ["DOLIPRANE (Orale)", "paracétamol", "KARDEGIC", "ibuprofène", "SPASFON", "HUMEX RHUME", "ÉFFERALGAN"]:
+        full = phonetic_key(name)
+        for end in range(1, len(name) + 1):
+            assert full.startswith(phonetic_prefix(name[:end])), name[:end]
+
+
+def test_partial_word_prefix_drops_only_the_unstable_tail():
+    assert phonetic_key("parac") == "PARAK" and phonetic_prefix("parac") == "PARA"
+    assert phonetic_prefix("paracetam") == "PARASETA"
+    assert phonetic_prefix("kardeg") == "KARD"
+    assert phonetic_prefix("dolipranne") == phonetic_key("doliprane")
+
+
+def test_empty_input():
+    assert phonetic_key("") == ""
+    assert phonetic_key(None) == ""
+    assert phonetic_prefix("") == ""
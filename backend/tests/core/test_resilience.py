@@ -0,0 +1,131 @@
+"""
+Tests de la couche de résilience (budget de requête, délai, disjoncteur, hedging).
+"""
+import asyncio
+import pytest
+from backend.core.resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, Dispatcher, QueueFullError,
+    call_with_resilience, deadline_scope, remaining_time
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_scope_keeps_shortest_budget():
+    assert remaining_time() is None
+    with deadline_scope(10):
+        with deadline_scope(1):
+            assert remaining_time() <= 1
+        with deadline_scope(60):
+            assert remaining_time() <= 10
+    assert remaining_time() is None
+
+
+def test_timeout_cancels_call_and_opens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await call_with_resilience(slow, timeout=0.01, breaker=breaker)
+        with pytest.raises(CircuitOpenError):
+            await call_with_resilience(slow, timeout=0.01, breaker=breaker)
+
+        clock.now = 31
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert await call_with_resilience(_ok, timeout=1, breaker=breaker) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+    assert len(cancelled) == 2
+
+
+async def _ok():
+    return "ok"
+
+
+def test_exhausted_budget_fails_fast():
+    async def scenario():
+        with deadline_scope(0):
+            await call_with_resilience(_ok, timeout=5)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+
+
+def test_hedged_call_returns_first_success():
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        await asyncio.sleep(0.5 if len(calls) == 1 else 0.01)
+        return f"call-{len(calls)}"
+
+    result = asyncio.run(call_with_resilience(call, timeout=2, hedge_after=0.05))
+
+    assert len(calls) == 2
+    assert result == "call-2"
+
+
+def test_dispatcher_rejects_when_queue_full_and_serves_keys_in_turn():
+    dispatcher = Dispatcher(max_concurrency=1, max_queue=3)
+    order = []
+
+    async def job(key, name, hold=0.0):
+        async with dispatcher.slot(key):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        first = asyncio.create_task(job("fr", "fr-0", hold=0.05))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(job("fr", "fr-1")),
+            asyncio.create_task(job("fr", "fr-2")),
+            asyncio.create_task(job("es", "es-1")),
+        ]
+        await asyncio.sleep(0)
+        assert dispatcher.depth == 3
+        assert dispatcher.is_saturated()
+
+        with pytest.raises(QueueFullError):
+            await job("es", "es-2")
+
+        await asyncio.gather(first, *waiting)
+
+    asyncio.run(scenario())
+
+    assert order == ["fr-0", "fr-1", "es-1", "fr-2"]
+    assert dispatcher.rejections == 1
+    assert dispatcher.in_flight == 0
+    assert dispatcher.depth == 0
+
+
+def test_dispatcher_wait_is_bounded_by_budget():
+    dispatcher = Dispatcher(max_concurrency=1, max_queue=5)
+
+    async def scenario():
+        async with dispatcher.slot():
+            with deadline_scope(0.01):
+                with pytest.raises(DeadlineExceeded):
+                    async with dispatcher.slot():
+                        pass
+            assert dispatcher.depth == 0
+        assert dispatcher.in_flight == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+"""
+Tests de l'instantané binaire du catalogue : fidélité à SQLite et rejet des fichiers invalides.
+"""
+import os
+import sqlite3
+import pytest
+from unittest.mock import patch
+from backend.core.snapshot import CatalogSnapshot, SharedSnapshot, SnapshotError, write_snapshot
+from backend.scripts.build_db import build_database, stamp_data_version
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.search.repository import DrugRepository
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("snapshot") / "safepills.db")
+    build_database(db_path=db_path)
+    return db_path
+
+
+def test_snapshot_matches_sqlite_repositories(catalog):
+    snapshot = CatalogSnapshot(os.path.splitext(catalog)[0] + ".snap")
+    assert snapshot.verify()
+
+    sql_auto, snap_auto = AutomedicationRepository(catalog), AutomedicationRepository(catalog, snapshot=snapshot)
+    sql_drugs, snap_drugs = DrugRepository(catalog), DrugRepository(catalog, snapshot=snapshot)
+
+    conn = sqlite3.connect(catalog)
+    all_cis = [row[0] for row in conn.execute("SELECT cis FROM brands")]
+    conn.close()
+    assert snapshot.brand_count == len(all_cis)
+
+    for cis in all_cis:
+        assert snap_auto.get_rules_for_brand(cis) == sql_auto.get_rules_for_brand(cis)
+        assert snap_auto.get_drug_route(cis) == sql_auto.get_drug_route(cis)
+        assert snap_auto.get_brands_composition([cis]) == sql_auto.get_brands_composition([cis])
+        sql_brand, snap_brand = sql_drugs.get_drug_details(cis), snap_drugs.get_drug_details(cis)
+        assert snap_brand.model_dump(exclude={"composition"}) == sql_brand.model_dump(exclude={"composition"})
+        assert sorted(c.substance.id for c in snap_brand.composition) == sorted(c.substance.id for c in sql_brand.composition)
+
+    assert snap_drugs.get_drug_details("00000000") is None
+    assert snap_auto.get_rules_for_brand("00000000") == []
+
+
+def test_invalid_snapshot_is_rejected(tmp_path, catalog):
+    path = tmp_path / "bad.snap"
+    path.write_bytes(b"NOTASNAP" + b"\x00" * 64)
+    with pytest.raises(SnapshotError):
+        CatalogSnapshot(str(path))
+
+    data = bytearray(open(os.path.splitext(catalog)[0] + ".snap", "rb").read())
+    data[8] = 99  # version du format
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        CatalogSnapshot(str(path))
+
+
+def test_shared_snapshot_ignored_when_older_than_database(tmp_path, catalog):
+    snap_path = os.path.splitext(catalog)[0] + ".snap"
+    db_path = str(tmp_path / "safepills.db")
+    with open(db_path, "wb"):
+        pass
+    os.utime(db_path, (os.path.getmtime(snap_path) + 10,) * 2)
+
+    shared = SharedSnapshot()
+    with patch("backend.core.snapshot.settings") as mock_settings:
+        mock_settings.USE_SNAPSHOT = True
+        mock_settings.SNAPSHOT_PATH = snap_path
+        mock_settings.DB_PATH = db_path
+        assert shared.get() is None
+        os.utime(db_path, (os.path.getmtime(snap_path) - 10,) * 2)
+        shared.reset()
+        assert shared.get().path == snap_path
+
+
+def test_shared_snapshot_follows_live_rules_update(tmp_path):
+    db_path = str(tmp_path / "safepills.db")
+    build_database(db_path=db_path)
+    snap_path = os.path.splitext(db_path)[0] + ".snap"
+
+    conn = sqlite3.connect(db_path)
+    cis = conn.execute("""
+        SELECT b.cis FROM brands b JOIN brand_substances bs ON bs.brand_id = b.id
+        JOIN rules r ON r.substance_id = bs.substance_id LIMIT 1
+    """).fetchone()[0]
+    conn.close()
+
+    version = {"current": CatalogSnapshot(snap_path).data_version}
+    shared = SharedSnapshot()
+    shared.set_version_provider(lambda: version["current"])
+    with patch("backend.core.snapshot.settings") as mock_settings:
+        mock_settings.USE_SNAPSHOT = True
+        mock_settings.SNAPSHOT_PATH = snap_path
+        mock_settings.DB_PATH = db_path
+        assert version["current"] and shared.get().data_version == version["current"]
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE rules SET advice = 'Conseil mis à jour'")
+        version["current"] = stamp_data_version(conn.cursor())
+        conn.commit()
+        conn.close()
+
+        # Fichier pas encore réécrit : la version ne correspond plus, lecture SQLite
+        assert shared.get() is None
+        write_snapshot(db_path, snap_path)
+        snapshot = shared.get()
+        assert snapshot.data_version == version["current"]
+        assert {rule.advice for rule in snapshot.rules_for_brand(cis)} == {"Conseil mis à jour"}
@@ -0,0 +1,29 @@
+"""
+Tests unitaires du chronométrage par phase (en-tête Server-Timing).
+"""
+from backend.core.timing import phase, start_timer, current_timer, stop_timer
+
+
+def test_phases_accumulate_in_current_request():
+    token = start_timer()
+    try:
+        with phase("rules"):
+            pass
+        with phase("rules"):
+            pass
+        with phase("ai"):
+            pass
+        timer = current_timer()
+    finally:
+        stop_timer(token)
+
+    header = timer.header_value()
+    assert header.startswith("rules;dur=")
+    assert "ai;dur=" in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+def test_phase_is_noop_outside_request():
+    with phase("rules"):
+        pass
+    assert current_timer() is None
@@ -1,5 +1,6 @@
 from unittest.mock import patch, MagicMock, AsyncMock
 from backend.services.ai_service import generate_risk_explanation
+from backend.core.resilience import CircuitBreaker
 import pytest
 import asyncio
 
@@ -28,3 +29,27 @@ def test_generate_risk_explanation_calls_client():
     asyncio.run(run_test())
 
 
+
+def test_generate_risk_explanation_times_out():
+
+    async def run_test():
+        async def never_answers(**kwargs):
+            await asyncio.sleep(5)
+
+        with patch("backend.services.ai_service.client") as mock_client, \
+             patch("backend.services.ai_service.settings") as mock_settings, \
+             patch("backend.services.ai_service.ai_circuit", CircuitBreaker()):
+            mock_settings.AI_TIMEOUT_SECONDS = 0.01
+            mock_settings.AI_HEDGE_AFTER_SECONDS = 0.0
+            mock_client.aio.models.generate_content = never_answers
+
+            result = await generate_risk_explanation(
+                drug_name="Test Drug",
+                score="RED",
+                details=[],
+                user_profile={"gender": "F", "age": 40}
+            )
+
+            assert "surchargé" in result
+
+    asyncio.run(run_test())
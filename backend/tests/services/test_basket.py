@@ -0,0 +1,160 @@
+"""
+Tests du contrôle de panier multi-médicaments (doublons de substance, familles incompatibles).
+Le repository est simulé, sauf pour l'import des interactions et le catalogue construit avec une paire sourcée.
+"""
+import json
+import sqlite3
+from unittest.mock import MagicMock
+
+from backend.core.models import Brand, BrandSubstance, Family, FamilyInteraction, RiskLevel, Substance
+from backend.scripts.build_db import MED_KNOWLEDGE_PATH, build_database, import_interactions
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.automedication.basket import BasketChecker, InteractionMatrix
+
+AINS = Family(id=3, name="AINS_ORAUX")
+CORTICOIDES = Family(id=6, name="CORTICOIDES_SYSTEMIQUES")
+ANTALGIQUES = Family(id=1, name="ANTALGIQUES_ANTIPYRETIQUES")
+
+INTERACTIONS = [
+    FamilyInteraction(family_a=3, family_b=3, family_a_name="AINS_ORAUX", family_b_name="AINS_ORAUX",
+                      risk_level=RiskLevel.LEVEL_4, advice="Deux AINS"),
+    FamilyInteraction(family_a=3, family_b=6, family_a_name="AINS_ORAUX", family_b_name="CORTICOIDES_SYSTEMIQUES",
+                      risk_level=RiskLevel.LEVEL_3, advice="AINS + corticoïde"),
+]
+
+
+def _brand(brand_id, cis, *substances):
+    return Brand(
+        id=brand_id, cis=cis, name=cis, is_otc=True,
+        composition=[BrandSubstance(substance=Substance(id=sub_id, name=name, families=families))
+                     for sub_id, name, families in substances]
+    )
+
+
+IBUPROFENE = _brand(1, "11111111", (10, "IBUPROFÈNE", [AINS]))
+KETOPROFENE = _brand(2, "22222222", (11, "KÉTOPROFÈNE", [AINS]))
+PREDNISOLONE = _brand(3, "33333333", (12, "PREDNISOLONE", [CORTICOIDES]))
+PARACETAMOL_A = _brand(4, "44444444", (13, "PARACÉTAMOL", [ANTALGIQUES]))
+PARACETAMOL_B = _brand(5, "55555555", (13, "PARACÉTAMOL", [ANTALGIQUES]))
+
+
+def _checker(*brands):
+    repository = MagicMock()
+    repository.get_family_interactions.return_value = INTERACTIONS
+    repository.get_brands_composition.side_effect = lambda cis_list: [b for b in brands if b.cis in cis_list]
+    return BasketChecker(repository, version_provider=lambda: "v1"), repository
+
+
+def test_interaction_matrix_is_symmetric():
+    matrix = InteractionMatrix(INTERACTIONS)
+
+    assert matrix.conflicts(6, 1 << 3) == 1 << 3
+    assert matrix.conflicts(3, 1 << 6) == 1 << 6
+    assert matrix.conflicts(1, (1 << 3) | (1 << 6)) == 0
+    assert matrix.get(6, 3).advice == "AINS + corticoïde"
+
+
+def test_basket_flags_family_pairs():
+    checker, repository = _checker(IBUPROFENE, KETOPROFENE, PREDNISOLONE)
+
+    result = checker.check(["11111111", "22222222", "33333333", "99999999"])
+
+    assert result.score == "RED"
+    assert result.duplicates == []
+    assert [(i.cis, i.risk_level) for i in result.interactions] == [
+        (["11111111", "22222222"], 4),
+        (["11111111", "33333333"], 3),
+        (["22222222", "33333333"], 3),
+    ]
+    assert result.unknown_cis == ["99999999"]
+
+    checker.check(["11111111", "33333333"])
+    repository.get_family_interactions.assert_called_once()
+
+
+def test_basket_flags_duplicate_substance():
+    checker, _ = _checker(PARACETAMOL_A, PARACETAMOL_B)
+
+    result = checker.check(["44444444", "55555555"], lang="es")
+
+    assert result.score == "RED"
+    assert result.interactions == []
+    assert result.duplicates[0].cis == ["44444444", "55555555"]
+    assert "PARACÉTAMOL" in result.duplicates[0].advice
+
+
+def test_basket_without_interaction_is_green():
+    checker, _ = _checker(IBUPROFENE, PARACETAMOL_A)
+
+    result = checker.check(["11111111", "44444444", "11111111"])
+
+    assert result.score == "GREEN"
+    assert result.duplicates == [] and result.interactions == []
+
+
+def test_only_sourced_and_reviewed_interactions_are_imported():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE family_interactions (family_a INTEGER, family_b INTEGER, risk_level INTEGER, advice TEXT, PRIMARY KEY (family_a, family_b))")
+    med_knowledge = {
+        "interactions": [
+            {"families": ["AINS_ORAUX", "AINS_ORAUX"], "risk_level": 4, "advice": "Deux AINS",
+             "source": "Thésaurus ANSM", "reviewed_by": "Pharmacien, 2026-01-01"},
+            {"families": ["AINS_ORAUX", "CORTICOIDES_SYSTEMIQUES"], "risk_level": 3, "advice": "Non sourcée"},
+        ],
+        "interactions_pending_review": [
+            {"families": ["CORTICOIDES_SYSTEMIQUES", "CORTICOIDES_SYSTEMIQUES"], "risk_level": 3, "advice": "Brouillon",
+             "source": "Brouillon", "reviewed_by": "Personne"},
+        ],
+    }
+
+    inserted = import_interactions(conn.cursor(), med_knowledge, {"AINS_ORAUX": 3, "CORTICOIDES_SYSTEMIQUES": 6})
+
+    assert inserted == 1
+    assert conn.execute("SELECT family_a, family_b, advice FROM family_interactions").fetchall() == [(3, 3, "Deux AINS")]
+
+
+def test_matrix_is_reloaded_when_data_version_changes():
+    repository = MagicMock()
+    repository.get_family_interactions.side_effect = [[], INTERACTIONS]
+    repository.get_brands_composition.side_effect = lambda cis_list: [b for b in (IBUPROFENE, KETOPROFENE) if b.cis in cis_list]
+    version = ["v1"]
+    checker = BasketChecker(repository, version_provider=lambda: version[0])
+
+    result = checker.check(["11111111", "22222222"])
+    assert result.interactions == [] and not result.has_interaction_coverage
+
+    version[0] = "v2"
+    result = checker.check(["11111111", "22222222"])
+    assert result.score == "RED" and result.has_interaction_coverage
+    assert checker.current_matrix.get(3, 3).advice == "Deux AINS"
+
+
+def test_sourced_interaction_is_served_from_built_catalog(tmp_path):
+    with open(MED_KNOWLEDGE_PATH, "r", encoding="utf-8") as f:
+        med_knowledge = json.load(f)
+    med_knowledge["interactions"] = [
+        {"families": ["AINS_ORAUX", "AINS_ORAUX"], "risk_level": 4, "advice": "Deux AINS (test)",
+         "source": "Thésaurus ANSM (fixture de test)", "reviewed_by": "Pharmacien (fixture), 2026-01-01"},
+    ]
+    knowledge_path = tmp_path / "medical_knowledge.json"
+    knowledge_path.write_text(json.dumps(med_knowledge, ensure_ascii=False), encoding="utf-8")
+    db_path = str(tmp_path / "safepills.db")
+    build_database(db_path=db_path, med_knowledge_path=str(knowledge_path))
+
+    conn = sqlite3.connect(db_path)
+    cis_list = [row[0] for row in conn.execute("""
+        SELECT b.cis FROM brands b
+        JOIN brand_substances bs ON bs.brand_id = b.id
+        JOIN substance_families sf ON sf.substance_id = bs.substance_id
+        JOIN families f ON f.id = sf.family_id
+        WHERE f.name = 'AINS_ORAUX'
+        GROUP BY bs.substance_id
+        LIMIT 2
+    """)]
+    conn.close()
+    assert len(cis_list) == 2
+
+    result = BasketChecker(AutomedicationRepository(db_path), version_provider=lambda: "fixture").check(cis_list)
+
+    assert result.has_interaction_coverage
+    assert [(i.risk_level, i.advice) for i in result.interactions] == [(4, "Deux AINS (test)")]
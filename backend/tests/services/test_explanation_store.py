@@ -0,0 +1,93 @@
+"""
+Tests du stockage des explications pré-générées et de la pré-génération par lots.
+"""
+import asyncio
+from unittest.mock import patch, AsyncMock, MagicMock
+from backend.core.schemas import EvaluationResponse
+from backend.scripts.pregenerate_explanations import build_jobs, run_jobs
+from backend.services.automedication.orchestrator import AutomedicationOrchestrator
+from backend.services import ai_service
+from backend.services.explanation_store import ExplanationStore, bucket_profile, explanation_key, profile_bucket
+
+ANSWERED = [
+    {"question_id": "Q_LIVER", "risk_level": 4},
+    {"question_id": "GENERAL", "risk_level": 2},
+    {"question_id": "Q_ALCOHOL", "risk_level": 3},
+]
+
+
+def test_profile_bucket_and_key():
+    assert profile_bucket("F", 35) == "F-adult"
+    assert profile_bucket(None, None) == "U-unknown"
+    assert profile_bucket("M", 70) == "M-senior"
+
+    key = explanation_key("60000001", "RED", ANSWERED, "fr", "F", 12)
+    assert key.codes == "Q_ALCOHOL,Q_LIVER"
+    assert key.profile == "F-minor"
+
+
+def test_store_roundtrip(tmp_path):
+    store = ExplanationStore(str(tmp_path / "explanations.db"))
+    key = explanation_key("60000001", "RED", ANSWERED, "fr", "F", 35)
+
+    assert store.get(key) is None
+    store.init_schema()
+    assert store.get(key) is None
+
+    store.put(key, "Explication pré-générée")
+    assert store.get(key) == "Explication pré-générée"
+    assert store.existing_keys() == [key]
+
+
+def test_orchestrator_reads_store_before_ai(tmp_path):
+    store = ExplanationStore(str(tmp_path / "explanations.db"))
+    store.init_schema()
+    store.put(explanation_key("60000001", "RED", ANSWERED, "fr", "F", 40), "Depuis le stockage")
+
+    result = EvaluationResponse(score="RED", details=[], answered_questions_context=ANSWERED)
+    orchestrator = AutomedicationOrchestrator(repository=MagicMock(), store=store)
+
+    with patch("backend.services.automedication.orchestrator.evaluate_risk", return_value=result), \
+         patch("backend.services.automedication.orchestrator.get_drug_details", return_value=None), \
+         patch("backend.services.automedication.orchestrator.generate_risk_explanation", new_callable=AsyncMock) as mock_ai:
+        response = asyncio.run(orchestrator.evaluate("60000001", {}, False, "F", 40, "fr"))
+
+    assert response.ai_explanation == "Depuis le stockage"
+    mock_ai.assert_not_called()
+
+
+def test_build_and_run_jobs(tmp_path):
+    store = ExplanationStore(str(tmp_path / "explanations.db"))
+    store.init_schema()
+    orchestrator = MagicMock()
+    orchestrator.prepare.side_effect = lambda cis, answers, meds, gender, age, lang: (
+        EvaluationResponse(score="RED" if answers else "GREEN", details=[]),
+        {"lang": lang, "answered_questions": [{"question_id": code} for code in answers], "user_profile": {"gender": gender, "age": age}},
+    )
+    patterns = [
+        {"cis": "60000001", "answers": {}},
+        {"cis": "60000001", "answers": {"Q_LIVER": True}},
+        {"cis": "60000001", "answers": {"Q_LIVER": True}},
+    ]
+
+    jobs = build_jobs(orchestrator, patterns, [("F", 30), ("F", 40)], ["fr", "es"])
+    assert [(job.key.lang, job.key.profile) for job in jobs] == [("fr", "F-adult"), ("es", "F-adult")]
+    assert all(job.explanation_args["user_profile"] == {"gender": "F", "age_band": "adult"} for job in jobs)
+
+    with patch("backend.services.ai_service.request_risk_explanation", new=AsyncMock(side_effect=["texte fr", RuntimeError("503")])):
+        stats = asyncio.run(run_jobs(jobs, store, concurrency=1, rate=0))
+
+    assert stats == {"generated": 1, "failed": 1}
+    assert store.get(jobs[0].key) == "texte fr"
+
+
+def test_bucket_profile_prompt_has_no_exact_age():
+    profile = bucket_profile({"gender": "M", "age": 67, "substances": ["Ibuprofène"]})
+    assert profile == {"gender": "M", "age_band": "senior", "substances": ["Ibuprofène"]}
+
+    with patch("backend.services.ai_service._call_gemini", new=AsyncMock(return_value=MagicMock(text="ok"))) as mock_call:
+        asyncio.run(ai_service.request_risk_explanation("Ibuprofène", "RED", [], profile, [], "fr"))
+
+    prompt = mock_call.call_args.args[0]
+    assert "65 ans ou plus" in prompt
+    assert "67" not in prompt
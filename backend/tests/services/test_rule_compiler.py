@@ -0,0 +1,87 @@
+"""
+Tests du moteur de règles compilé : équivalence exacte avec le calcul interprété
+(`get_rules_for_brand` + `RiskCalculator.compute_score`) et garde sur la version des données.
+"""
+import os
+import sqlite3
+import pytest
+from unittest.mock import patch
+from backend.core.cache import caching_disabled
+from backend.scripts.build_db import build_database
+from backend.services.automedication.db_repository import AutomedicationRepository
+from backend.services.automedication.risk_calculator import RiskCalculator
+from backend.services.automedication.rule_engine import (
+    CompiledRules, default_rules_path, evaluate_compiled, load_compiled_rules,
+)
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("rules") / "safepills.db")
+    build_database(db_path=db_path)
+    return db_path
+
+
+def _interpreted(repository, identifier, answers, has_other_meds):
+    rules = repository.get_rules_for_brand(identifier)
+    route = repository.get_drug_route(identifier) or "orale"
+    if has_other_meds:
+        for r in rules:
+            if r.filter_polymedication or r.question_code == 'Q_POLYMEDICATION':
+                answers[r.question_code] = True
+    return RiskCalculator.compute_score(rules, answers, route=route)
+
+
+def test_compiled_module_matches_interpreted_scoring(catalog):
+    module = load_compiled_rules(default_rules_path(catalog))
+    repository = AutomedicationRepository(catalog)
+
+    conn = sqlite3.connect(catalog)
+    identifiers = [row[0] for row in conn.execute("SELECT cis FROM brands")]
+    identifiers += [str(row[0]) for row in conn.execute("SELECT id FROM substances")]
+    codes = sorted({row[0] for row in conn.execute("SELECT question_code FROM rules")})
+    conn.close()
+
+    assert set(module.DECISIONS) == set(identifiers)
+    assert module.FUNCTION_COUNT < len(identifiers)
+
+    answer_sets = [{}, {code: True for code in codes}] + [{code: True} for code in codes]
+    with caching_disabled():
+        for identifier in identifiers:
+            decide = module.DECISIONS[identifier]
+            for answers in answer_sets:
+                for has_other_meds in (False, True):
+                    expected = _interpreted(repository, identifier, dict(answers), has_other_meds)
+                    assert decide(dict(answers), has_other_meds).model_dump() == expected.model_dump(), (identifier, answers, has_other_meds)
+
+
+def test_stale_or_missing_module_falls_back(catalog, tmp_path):
+    engine = CompiledRules(default_rules_path(catalog))
+    assert engine.decisions("autre-version") is None
+    assert CompiledRules(str(tmp_path / "absent_rules.py")).decisions(None) is None
+
+    version = load_compiled_rules(default_rules_path(catalog)).DATA_VERSION
+    assert engine.decisions(version)
+
+    cis = next(iter(engine.decisions(version)))
+    with patch("backend.services.automedication.rule_engine.compiled_rules", engine):
+        assert evaluate_compiled(cis, {}, False, version) is not None
+        assert evaluate_compiled("inconnu", {}, False, version) is None
+        with patch("backend.services.automedication.rule_engine.settings.USE_COMPILED_RULES", False):
+            assert evaluate_compiled(cis, {}, False, version) is None
+
+
+def test_engine_retries_when_module_is_rewritten(catalog, tmp_path):
+    source = open(default_rules_path(catalog), encoding="utf-8").read()
+    version = load_compiled_rules(default_rules_path(catalog)).DATA_VERSION
+    path = tmp_path / "safepills_rules.py"
+    path.write_text(source.replace(f"DATA_VERSION = {version!r}", "DATA_VERSION = 'ancienne'"), encoding="utf-8")
+
+    # Version publiée avant la recompilation : l'ancien module est écarté sans être figé
+    engine = CompiledRules(str(path))
+    assert engine.decisions(version) is None
+    assert engine.decisions(version) is None
+
+    path.write_text(source, encoding="utf-8")
+    os.utime(path, (path.stat().st_mtime + 1,) * 2)
+    assert engine.decisions(version)
@@ -0,0 +1,131 @@
+"""
+Tests de la recherche classée et paginée sur une base SQLite temporaire.
+"""
+import sqlite3
+import pytest
+from backend.core.db import capture_statements
+from backend.core.normalization import normalize_text
+from backend.core.pagination import encode_cursor
+from backend.core.phonetic import phonetic_key
+from backend.scripts.build_db import init_db
+from backend.services.search.cache import SearchCache
+from backend.services.search.repository import DrugRepository
+from backend.services.search.service import SearchService
+
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = str(tmp_path / "search.db")
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    init_db(cursor)
+    cursor.executemany(
+        "INSERT INTO substances (name, name_norm) VALUES (?, ?)",
+        [(name, normalize_text(name)) for name in ("PARACETAMOL", "CAFEINE", "IBUPROFÈNE")]
+    )
+    cursor.executemany(
+        "INSERT INTO brands (cis, name, administration_route, is_otc, name_norm) VALUES (?, ?, ?, ?, ?)",
+        [
+            (cis, name, route, is_otc, normalize_text(name))
+            for cis, name, route, is_otc in [
+                ("60000001", "DOLIPRANE (Orale)", "orale", 1),
+                ("60000002", "PARACETAMOL (Orale)", "orale", 0),
+                ("60000003", "PARACETAMOL + CAFEINE (Orale)", "orale", 1),
+                ("60000004", "ANTI-PARACETAMOL (Orale)", "orale", 1),
+            ]
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return SearchService(DrugRepository(db_path))
+
+
+def test_ranking_prefers_prefix_whole_word_and_otc(service):
+    names = [r.name for r in service.search_page("paracetamol").results]
+    assert names == [
+        "PARACETAMOL + CAFEINE (Orale)",
+        "PARACETAMOL",
+        "PARACETAMOL (Orale)",
+        "ANTI-PARACETAMOL (Orale)",
+    ]
+
+
+def test_keyset_pagination_walks_all_results_once(service):
+    seen, cursor = [], None
+    while True:
+        page = service.search_page("paracetamol", limit=1, cursor=cursor)
+        seen += [(r.type, r.id) for r in page.results]
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert len(seen) == 4
+    assert len(set(seen)) == 4
+
+
+def test_invalid_cursor_is_rejected(service):
+    with pytest.raises(ValueError):
+        service.search_page("paracetamol", cursor="not-a-cursor")
+
+    # Curseurs bien formés mais aux types incompatibles avec la clé de tri (rang, nom, type, id)
+    service.cache = SearchCache(max_entries=8)
+    service.search_page("paracetamol")
+    for values in (["a", 1, 2, 3], [None, None, None, None], [{"x": 1}, "a", "b", "c"], [True, "a", "b", "c"]):
+        with pytest.raises(ValueError):
+            service.search_page("paracetamol", cursor=encode_cursor(values))
+
+
+def test_cache_refines_longer_queries_without_database(service):
+    expected = [r.id for r in service.search_page("paracetamol").results]
+    service.cache = SearchCache(max_entries=8)
+
+    service.search_page("para")
+    service.repository = None
+    assert [r.id for r in service.search_page("paracetamol").results] == expected
+    assert service.cache.stats()["refinements"] == 1
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = SearchCache(max_entries=2)
+    cache.put("aaa", [], complete=True)
+    cache.put("bbb", [], complete=True)
+    cache.get("aaa")
+    cache.put("ccc", [], complete=True)
+
+    assert cache.get("bbb") is None
+    assert cache.get("aaa") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_accented_names_match_with_or_without_accents(service):
+    for query in ("ibuprofene", "IBUPROFÈNE", "ibuprofène"):
+        results = service.search_page(query).results
+        assert [r.name for r in results] == ["IBUPROFÈNE"]
+
+
+def test_phonetic_complement_matches_while_typing(service):
+    conn = sqlite3.connect(service.repository.db_path)
+    for table in ("substances", "brands"):
+        for row_id, name in conn.execute(f"SELECT rowid, name FROM {table}").fetchall():
+            conn.execute(f"UPDATE {table} SET phonetic = ? WHERE rowid = ?", (phonetic_key(name), row_id))
+    conn.commit()
+    conn.close()
+
+    for typed in ("parasetam", "parasetamo", "dolipranne"):
+        names = {r.name for r in service.search_medication(typed)}
+        assert names & {"PARACETAMOL", "DOLIPRANE (Orale)"}, typed
+
+
+def test_prefix_matches_fill_the_page_without_substring_scan(service):
+    with capture_statements() as statements:
+        hits = service.repository.search_ranked("paracetamol", 2)
+    assert [hit.name for hit in hits] == ["PARACETAMOL + CAFEINE (Orale)", "PARACETAMOL"]
+    assert len(statements) == 1 and ":contains" not in statements[0][0]
+
+    with capture_statements() as statements:
+        hits = service.repository.search_ranked("paracetamol", 2, after=hits[-1].sort_key)
+    assert [hit.name for hit in hits] == ["PARACETAMOL (Orale)", "ANTI-PARACETAMOL (Orale)"]
+    assert len(statements) == 2
+
+    with capture_statements() as statements:
+        assert service.repository.search_ranked("paracetamol", 2, after=hits[-1].sort_key) == []
+    assert len(statements) == 1 and ":contains" in statements[0][0]
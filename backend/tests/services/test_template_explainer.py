@@ -0,0 +1,65 @@
+"""
+Tests de l'explication locale (sans IA) et du choix de source par l'orchestrateur.
+"""
+from unittest.mock import patch, MagicMock
+from backend.core.resilience import CircuitBreaker, deadline_scope
+from backend.services.automedication.orchestrator import AutomedicationOrchestrator
+from backend.services.template_explainer import generate_template_explanation
+
+ANSWERED = [
+    {"question_id": "GENERAL", "risk_level": 2},
+    {"question_id": "Q_LIVER", "risk_level": 4},
+]
+
+
+def test_template_explanation_fr_uses_substance_advice():
+    text = generate_template_explanation(
+        drug_name="DOLIPRANE",
+        score="RED",
+        details=["Détail brut"],
+        user_profile={"substances": ["PARACÉTAMOL"]},
+        answered_questions=ANSWERED,
+        lang="fr"
+    )
+
+    assert text.startswith("La prise de DOLIPRANE est déconseillée")
+    assert "insuffisance hépatique" in text
+    assert "Détail brut" not in text
+    assert "GENERAL" not in text
+    assert text.endswith("à votre médecin.")
+
+
+def test_template_explanation_es_falls_back_to_generic_text():
+    text = generate_template_explanation(
+        drug_name="",
+        score="ORANGE",
+        details=["Détail brut"],
+        user_profile={"substances": []},
+        answered_questions=[{"question_id": "Q_PREGNANCY", "risk_level": 3}],
+        lang="es"
+    )
+
+    assert "este medicamento" in text
+    assert "¿Está embarazada o amamantando?" in text
+    assert "Détail brut" not in text
+
+
+def test_template_reason():
+    client = MagicMock()
+    open_circuit = CircuitBreaker(failure_threshold=1)
+    open_circuit.record_failure()
+
+    with patch("backend.services.ai_service.client", None):
+        assert AutomedicationOrchestrator._template_reason() == "ai_disabled"
+
+    with patch("backend.services.ai_service.client", client), \
+         patch("backend.services.ai_service.ai_circuit", CircuitBreaker()):
+        assert AutomedicationOrchestrator._template_reason() is None
+        with deadline_scope(0.1):
+            assert AutomedicationOrchestrator._template_reason() == "low_budget"
+        with patch("backend.services.automedication.orchestrator.load_shedder.lag", 0.2):
+            assert AutomedicationOrchestrator._template_reason() == "overload"
+
+    with patch("backend.services.ai_service.client", client), \
+         patch("backend.services.ai_service.ai_circuit", open_circuit):
+        assert AutomedicationOrchestrator._template_reason() == "circuit_open"
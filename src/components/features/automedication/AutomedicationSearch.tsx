@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { API_BASE_URL } from '../../../config';
+import { loadSearchIndex, searchLocal } from '../../../lib/searchIndex';
 import { ui } from '../../../i18n/ui';
 import './AutomedicationSearch.scss';
 
@@ -33,6 +34,14 @@ export const AutomedicationSearch: React.FC<Props> = ({ onSelect, lang }) => {
 
       setIsLoading(true);
       try {
+        // Autocomplétion locale d'abord ; l'API ne sert qu'en repli (index absent ou périmé, aucune correspondance)
+        const index = await loadSearchIndex('/search-index.json', `${API_BASE_URL}/api/search/version`);
+        const localResults = index ? searchLocal(index, query) : [];
+        if (localResults.length > 0) {
+          setResults(localResults);
+          return;
+        }
+
         const response = await fetch(`${API_BASE_URL}/api/search?q=${encodeURIComponent(query)}&lang=${lang}`);
         if (response.ok) {
           const data = await response.json();
@@ -0,0 +1,139 @@
+/**
+ * Index de recherche local (autocomplétion hors-ligne).
+ * Le fichier `public/search-index.json` est généré au build (`npm run build:search-index`,
+ * `backend/scripts/export_search_index.py`) et n'est pas versionné dans le dépôt.
+ */
+
+export interface LocalSearchResult {
+  id: string;
+  type: 'drug' | 'substance';
+  name: string;
+}
+
+export interface IndexEntry {
+  key: string;
+  type: 'drug' | 'substance';
+  isOtc: boolean;
+  id: string;
+  name: string;
+}
+
+type RawEntry = [number, string, number, string, string];
+
+interface RawSearchIndex {
+  version: number;
+  data_version: string | null;
+  block_size: number;
+  entries: RawEntry[];
+}
+
+const SUPPORTED_VERSION = 2;
+const MIN_QUERY_LENGTH = 3;
+
+// Types d'entrée : 0 = substance, 1 = médicament, 2 = médicament OTC
+const TYPE_SUBSTANCE = 0;
+const TYPE_DRUG_OTC = 2;
+
+// Ligatures sans décomposition NFD : même table que `backend/core/normalization.py`
+const LIGATURES: Record<string, string> = { œ: 'oe', æ: 'ae' };
+
+export function normalizeQuery(text: string): string {
+  return text
+    .toLowerCase()
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .replace(/[œæ]/g, (ligature) => LIGATURES[ligature]);
+}
+
+export function decodeSearchIndex(raw: RawSearchIndex): IndexEntry[] {
+  if (raw.version !== SUPPORTED_VERSION) {
+    throw new Error(`Version d'index non supportée : ${raw.version}`);
+  }
+
+  let previous = '';
+  return raw.entries.map(([shared, suffix, type, id, name]) => {
+    const key = previous.slice(0, shared) + suffix;
+    previous = key;
+    return {
+      key,
+      type: type === TYPE_SUBSTANCE ? 'substance' : 'drug',
+      isOtc: type === TYPE_DRUG_OTC,
+      id,
+      name,
+    };
+  });
+}
+
+/**
+ * Même classement que `DrugRepository.search_ranked` côté API :
+ * préfixe (4) + mot entier (2) + OTC (1), puis nom, type et identifiant.
+ */
+export function searchLocal(entries: IndexEntry[], query: string, limit = 20): LocalSearchResult[] {
+  const q = normalizeQuery(query);
+  if (q.length < MIN_QUERY_LENGTH) return [];
+
+  const scored: { score: number; entry: IndexEntry }[] = [];
+  for (const entry of entries) {
+    if (!entry.key.includes(q)) continue;
+    let score = entry.key.startsWith(q) ? 4 : 0;
+    if (` ${entry.key} `.includes(` ${q} `)) score += 2;
+    if (entry.isOtc) score += 1;
+    scored.push({ score, entry });
+  }
+
+  const compare = (a: string, b: string) => (a < b ? -1 : a > b ? 1 : 0);
+  scored.sort(
+    (a, b) =>
+      b.score - a.score ||
+      compare(a.entry.name, b.entry.name) ||
+      compare(a.entry.type, b.entry.type) ||
+      compare(a.entry.id, b.entry.id)
+  );
+
+  return scored.slice(0, limit).map(({ entry }) => ({ id: entry.id, type: entry.type, name: entry.name }));
+}
+
+/**
+ * Version des données servie par l'API (`/api/search/version`), `undefined` si elle n'a pas pu être lue.
+ */
+async function fetchDataVersion(versionUrl: string): Promise<string | null | undefined> {
+  try {
+    const response = await fetch(versionUrl);
+    return response.ok ? (await response.json()).data_version : undefined;
+  } catch {
+    return undefined;
+  }
+}
+
+let indexPromise: Promise<IndexEntry[] | null> | null = null;
+
+/**
+ * Charge l'index une seule fois par page. Retourne `null` si l'index est indisponible ou
+ * s'il a été exporté depuis une autre version des données que celle de l'API :
+ * l'appelant se rabat alors sur l'API `/api/search`.
+ */
+export function loadSearchIndex(url = '/search-index.json', versionUrl?: string): Promise<IndexEntry[] | null> {
+  if (!indexPromise) {
+    const rawPromise = fetch(url).then((response) => (response.ok ? response.json() : null));
+    const versionPromise = versionUrl ? fetchDataVersion(versionUrl) : Promise.resolve(undefined);
+    indexPromise = Promise.all([rawPromise, versionPromise])
+      .then(([raw, serverVersion]: [RawSearchIndex | null, string | null | undefined]) => {
+        if (!raw) return null;
+        if (serverVersion !== undefined && raw.data_version !== serverVersion) {
+          console.warn(`Index de recherche local périmé (${raw.data_version} ≠ ${serverVersion}) : recherche par l'API`);
+          return null;
+        }
+        return decodeSearchIndex(raw);
+      })
+      .catch((error) => {
+        console.error("Index de recherche local indisponible :", error);
+        return null;
+      });
+  }
+  return indexPromise;
+}
+
+/** Oublie l'index chargé (tests). */
+export function resetSearchIndex() {
+  indexPromise = null;
+}
@@ -0,0 +1,94 @@
+/**
+ * Tests unitaires pour l'index de recherche local.
+ * Vérifie le décodage du front coding et le classement des résultats.
+ */
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { decodeSearchIndex, loadSearchIndex, resetSearchIndex, searchLocal, normalizeQuery } from '../lib/searchIndex';
+// Cas partagés avec `normalize_text` côté Python (backend/tests/core/test_normalization.py)
+import normalizationCases from '../../backend/tests/core/normalization_cases.json';
+
+const RAW_INDEX = {
+  version: 2,
+  data_version: 'abc123',
+  block_size: 4,
+  entries: [
+    [0, 'anti-paracetamol (orale)', 2, '60000004', 'ANTI-PARACETAMOL (Orale)'],
+    [0, 'paracetamol', 0, '12', 'PARACÉTAMOL'],
+    [11, ' (orale)', 1, '60000002', 'PARACETAMOL (Orale)'],
+    [0, 'paracetamol + cafeine (orale)', 2, '60000003', 'PARACETAMOL + CAFEINE (Orale)'],
+  ] as [number, string, number, string, string][],
+};
+
+describe('decodeSearchIndex', () => {
+  it('reconstruit les clés à partir des préfixes partagés', () => {
+    const entries = decodeSearchIndex(RAW_INDEX);
+    expect(entries.map((e) => e.key)).toEqual([
+      'anti-paracetamol (orale)',
+      'paracetamol',
+      'paracetamol (orale)',
+      'paracetamol + cafeine (orale)',
+    ]);
+    expect(entries[1].type).toBe('substance');
+    expect(entries[3].isOtc).toBe(true);
+  });
+
+  it('rejette une version inconnue', () => {
+    expect(() => decodeSearchIndex({ ...RAW_INDEX, version: 99 })).toThrow();
+  });
+});
+
+describe('searchLocal', () => {
+  const entries = decodeSearchIndex(RAW_INDEX);
+
+  it('classe préfixe, mot entier et OTC comme l\'API', () => {
+    expect(searchLocal(entries, 'Paracétamol').map((r) => r.name)).toEqual([
+      'PARACETAMOL + CAFEINE (Orale)',
+      'PARACETAMOL (Orale)',
+      'PARACÉTAMOL',
+      'ANTI-PARACETAMOL (Orale)',
+    ]);
+  });
+
+  it('ignore les requêtes trop courtes', () => {
+    expect(searchLocal(entries, 'pa')).toEqual([]);
+  });
+
+  it('normalise les accents et la casse', () => {
+    expect(normalizeQuery('IBUPROFÈNE')).toBe('ibuprofene');
+  });
+
+  it('normalise comme `normalize_text` côté Python', () => {
+    for (const [text, expected] of normalizationCases as [string, string][]) {
+      expect(normalizeQuery(text)).toBe(expected);
+    }
+  });
+});
+
+describe('loadSearchIndex', () => {
+  afterEach(() => {
+    resetSearchIndex();
+    vi.unstubAllGlobals();
+  });
+
+  const stubFetch = (dataVersion: string) =>
+    vi.stubGlobal(
+      'fetch',
+      vi.fn((url: string) =>
+        Promise.resolve({
+          ok: true,
+          json: () => Promise.resolve(url.endsWith('/version') ? { data_version: dataVersion } : RAW_INDEX),
+        })
+      )
+    );
+
+  it("utilise l'index exporté depuis la version servie par l'API", async () => {
+    stubFetch('abc123');
+    const entries = await loadSearchIndex('/search-index.json', '/api/search/version');
+    expect(entries).toHaveLength(4);
+  });
+
+  it("écarte un index d'une autre version des données", async () => {
+    stubFetch('def456');
+    expect(await loadSearchIndex('/search-index.json', '/api/search/version')).toBeNull();
+  });
+});